@@ -13,12 +13,16 @@ from models.order import Order
 from models.delivery import Delivery
 from models.order_item import OrderItem
 from models.category import Category
+from models.category_closure import CategoryClosure
 from models.category_item import CategoryItem
+from models.category_item_count import CategoryItemCount
 from models.item.item import Item
 from models.item.book import Book
 from models.item.album import Album
 from models.item.movie import Movie
 from models.administrator import Administrator
+from models.stock_hold import StockHold
+from models.catalog_version import CatalogVersion
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
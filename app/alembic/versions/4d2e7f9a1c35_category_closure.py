@@ -0,0 +1,53 @@
+"""category closure
+
+Revision ID: 4d2e7f9a1c35
+Revises: 11896081aa93
+Create Date: 2026-10-18 10:12:41.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d2e7f9a1c35'
+down_revision: Union[str, Sequence[str], None] = '11896081aa93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    closure = op.create_table('category_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_category_closure_descendant', 'category_closure', ['descendant_id', 'ancestor_id'], unique=False)
+
+    # 기존 parent_id 트리로부터 closure 행 채우기
+    conn = op.get_bind()
+    parents = dict(conn.execute(sa.text("SELECT id, parent_id FROM categories")).fetchall())
+    rows = []
+    for category_id in parents:
+        depth = 0
+        current = category_id
+        seen = set()
+        while current is not None and current not in seen:
+            seen.add(current)
+            rows.append({"ancestor_id": current, "descendant_id": category_id, "depth": depth})
+            current = parents.get(current)
+            depth += 1
+    if rows:
+        op.bulk_insert(closure, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_category_closure_descendant', table_name='category_closure')
+    op.drop_table('category_closure')
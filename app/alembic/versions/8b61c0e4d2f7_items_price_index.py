@@ -0,0 +1,28 @@
+"""items price index
+
+Revision ID: 8b61c0e4d2f7
+Revises: 4d2e7f9a1c35
+Create Date: 2026-10-18 11:03:27.914452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b61c0e4d2f7'
+down_revision: Union[str, Sequence[str], None] = '4d2e7f9a1c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_items_price_id', 'items', ['price', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_items_price_id', table_name='items')
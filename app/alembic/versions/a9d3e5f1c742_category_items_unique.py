@@ -0,0 +1,43 @@
+"""category items unique
+
+Revision ID: a9d3e5f1c742
+Revises: e27b4d9c6f10
+Create Date: 2026-10-18 15:22:09.471830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3e5f1c742'
+down_revision: Union[str, Sequence[str], None] = 'e27b4d9c6f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 중복 연결은 가장 먼저 만든 행만 남긴다 (상품 수 facet 은 서로 다른 상품 수라 그대로)
+    conn = op.get_bind()
+    seen = set()
+    duplicates = []
+    for row_id, item_id, category_id in conn.execute(
+        sa.text("SELECT id, item_id, category_id FROM category_items ORDER BY id")
+    ):
+        if (item_id, category_id) in seen:
+            duplicates.append(row_id)
+        seen.add((item_id, category_id))
+    for start in range(0, len(duplicates), 1000):
+        conn.execute(
+            sa.text("DELETE FROM category_items WHERE id IN :ids").bindparams(sa.bindparam("ids", expanding=True)),
+            {"ids": duplicates[start:start + 1000]},
+        )
+    op.create_unique_constraint('uq_category_items_item_category', 'category_items', ['item_id', 'category_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_category_items_item_category', 'category_items', type_='unique')
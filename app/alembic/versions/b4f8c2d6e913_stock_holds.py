@@ -0,0 +1,45 @@
+"""stock holds
+
+Revision ID: b4f8c2d6e913
+Revises: a9d3e5f1c742
+Create Date: 2026-10-18 16:48:53.102947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4f8c2d6e913'
+down_revision: Union[str, Sequence[str], None] = 'a9d3e5f1c742'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('items', sa.Column('reserved', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('stock_holds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('checkout_id', sa.String(length=32), nullable=False),
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['item_id'], ['items.id'], ),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stock_holds_checkout_id'), 'stock_holds', ['checkout_id'], unique=False)
+    op.create_index('ix_stock_holds_expires_at', 'stock_holds', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stock_holds_expires_at', table_name='stock_holds')
+    op.drop_index(op.f('ix_stock_holds_checkout_id'), table_name='stock_holds')
+    op.drop_table('stock_holds')
+    op.drop_column('items', 'reserved')
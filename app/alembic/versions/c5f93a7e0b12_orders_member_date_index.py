@@ -0,0 +1,28 @@
+"""orders member date index
+
+Revision ID: c5f93a7e0b12
+Revises: 8b61c0e4d2f7
+Create Date: 2026-10-18 11:41:05.227630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f93a7e0b12'
+down_revision: Union[str, Sequence[str], None] = '8b61c0e4d2f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_orders_member_id_order_date', 'orders', ['member_id', 'order_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_member_id_order_date', table_name='orders')
@@ -0,0 +1,38 @@
+"""catalog versions
+
+Revision ID: d1a7c3e8f254
+Revises: b4f8c2d6e913
+Create Date: 2026-10-18 19:12:40.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1a7c3e8f254'
+down_revision: Union[str, Sequence[str], None] = 'b4f8c2d6e913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table = op.create_table('catalog_versions',
+    sa.Column('name', sa.String(length=40), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # 쓰기 때는 UPDATE 만 하므로 테이블 행 / 버킷 행을 미리 넣어 둔다
+    op.bulk_insert(table, [
+        {'name': name, 'version': 0}
+        for tablename in ('items', 'categories', 'category_items')
+        for name in (tablename, *(f'{tablename}#{b}' for b in range(64)))
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalog_versions')
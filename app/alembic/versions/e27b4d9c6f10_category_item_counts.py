@@ -0,0 +1,53 @@
+"""category item counts
+
+Revision ID: e27b4d9c6f10
+Revises: c5f93a7e0b12
+Create Date: 2026-10-18 14:05:37.918264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e27b4d9c6f10'
+down_revision: Union[str, Sequence[str], None] = 'c5f93a7e0b12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ITEM_TYPES = ('ITEM', 'BOOK', 'ALBUM', 'MOVIE')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('category_item_counts',
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=20), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('category_id', 'item_type')
+    )
+
+    # closure 로 한번에 집계 (조상마다 서로 다른 상품 수) + 상품이 없는 타입은 0 행
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "INSERT INTO category_item_counts (category_id, item_type, item_count) "
+        "SELECT cc.ancestor_id, i.type, COUNT(DISTINCT i.id) FROM category_closure cc "
+        "JOIN category_items ci ON ci.category_id = cc.descendant_id "
+        "JOIN items i ON i.id = ci.item_id "
+        "WHERE i.type IS NOT NULL "
+        "GROUP BY cc.ancestor_id, i.type"
+    ))
+    for item_type in ITEM_TYPES:
+        conn.execute(sa.text(
+            "INSERT INTO category_item_counts (category_id, item_type, item_count) "
+            "SELECT c.id, :item_type, 0 FROM categories c WHERE NOT EXISTS ("
+            "SELECT 1 FROM category_item_counts x WHERE x.category_id = c.id AND x.item_type = :item_type)"
+        ), {"item_type": item_type})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('category_item_counts')
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.member_api import (
+    security, SECRET_KEY, ALGORITHM, create_access_token, get_password_hash, verify_password,
+)
+from api.serializers import member_to_dict, json_response
+from crud.async_member import AsyncMemberRepository
+from db.async_session import get_async_db
+from models.administrator import Administrator
+from models.member import Member
+from schemas.dto import MemberBaseModel, MemberLogin
+from schemas.views import MemberView
+
+# DB_ASYNC=true 일 때 api/member_api.py 대신 쓰이는 같은 경로의 회원 API
+router = APIRouter(prefix="/member", tags=["Member"])
+
+amr = AsyncMemberRepository()
+db_ = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+@router.post("/signup")
+async def member_create(input_info: MemberBaseModel, db: db_):
+    if await amr.find_by_email(db, input_info.email):
+        raise HTTPException(status_code=400, detail="이메일 중복임")
+    await db.close()        # bcrypt 를 기다리는 동안 커넥션을 풀에 돌려준다
+
+    input_info.password = await get_password_hash(input_info.password)
+    db_user = await amr.create(db, Member(**input_info.model_dump()))
+    return member_to_dict(db_user)
+
+
+@router.post("/login")
+async def login(user_credentials: MemberLogin, db: db_):
+    admin = (await db.scalars(
+        select(Administrator).where(Administrator.email == user_credentials.email).limit(1)
+    )).first()
+    user = await amr.find_by_email(db, user_credentials.email)
+    await db.close()        # bcrypt 를 기다리는 동안 커넥션을 풀에 돌려준다
+
+    if admin and await verify_password(user_credentials.password, admin.password):
+        access_token = create_access_token(
+            data={"sub": admin.email, "user_type": "admin", "user_id": admin.id},
+            expires_delta=timedelta(minutes=30)
+        )
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "user_type": "admin",
+            "user": {"id": admin.id, "name": admin.name, "email": admin.email},
+        }
+
+    if user and await verify_password(user_credentials.password, user.password):
+        access_token = create_access_token(
+            data={"sub": user.email, "user_type": "member", "user_id": user.id},
+            expires_delta=timedelta(minutes=30)
+        )
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "user_type": "member",
+            "user": member_to_dict(user),
+        }
+
+    raise HTTPException(
+        status_code=404,
+        detail="이메일 또는 비밀번호가 올바르지 않습니다."
+    )
+
+
+@router.get("/me")
+async def get_current_user(db: db_, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    try:
+        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="유효하지 않은 토큰입니다.")
+    email = payload.get("sub")
+    user_type = payload.get("user_type")
+    user_id = payload.get("user_id")
+    if email is None or user_type is None:
+        raise HTTPException(status_code=401, detail="유효하지 않은 토큰입니다.")
+
+    if user_type == "admin":
+        admin = await db.get(Administrator, user_id)
+        if admin:
+            return {"user_type": "admin", "user": {"id": admin.id, "name": admin.name, "email": admin.email}}
+    else:
+        user = await amr.find_by_id(db, user_id)
+        if user:
+            return {"user_type": "member", "user": member_to_dict(user)}
+
+    raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+
+
+@router.get("/show/all", response_model=list[MemberView])
+async def show_member(db: db_):
+    return json_response([member_to_dict(member) for member in await amr.find_all(db)])
+
+
+@router.get("/show/{id}", response_model=MemberView)
+async def show_member_by_id(id: int, db: db_):
+    member = await amr.find_by_id(db, id)
+    if member:
+        return json_response(member_to_dict(member))
+    raise HTTPException(status_code=404, detail="회원이 존재하지 않습니다.")
+
+
+@router.delete("/delete/{id}")
+async def delete_member(id: int, db: db_):
+    member = await amr.delete(db, id)
+    if member:
+        return member_to_dict(member)
+    raise HTTPException(status_code=404, detail="회원이 존재하지 않습니다.")
+
+
+@router.patch("/update/{id}")
+async def update_member(id: int, payload: dict, db: db_):
+    member = await amr.update(db, id, payload)
+    if member:
+        return member_to_dict(member)
+    raise HTTPException(status_code=404, detail="회원이 존재하지 않습니다.")
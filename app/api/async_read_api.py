@@ -0,0 +1,170 @@
+from datetime import datetime
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.category_api import category_to_dict, category_list_etag
+from api.serializers import dumps, json_response
+from api.item_api import item_to_dict, item_list_etag, item_etag, encode_cursor as encode_item_cursor, decode_cursor as decode_item_cursor
+from api.order_api import order_to_dict, encode_cursor as encode_order_cursor, decode_cursor as decode_order_cursor
+from core.item_cache import item_cache
+from core.search_index import item_search, category_search, CATEGORY_SEARCH_LIMIT
+from schemas.views import AnyItemView, ItemPageView, ItemSearchView, CategoryView, OrderView, OrderHistoryView
+from core.versions import versions, conditional, CATEGORIES
+from crud.async_category import AsyncCategoryRepository
+from crud.async_item import AsyncItemRepository
+from crud.async_order import AsyncOrderRepository
+from db.async_session import get_async_db
+
+# DB_ASYNC=true 일 때 기존 sync 라우터보다 먼저 등록되어 같은 경로의 조회 API 를 대신 처리한다
+# (생성/수정/삭제는 기존 sync 라우터 그대로)
+
+
+async def fresh_versions():
+    # ETag / 상품 캐시가 쓰는 버전 카운터를 스레드풀에서 미리 읽어 둔다 (라우트 안에서는 메모리 값만 본다)
+    await versions.refresh()
+
+
+item_router = APIRouter(prefix="/item", tags=["Item"], dependencies=[Depends(fresh_versions)])
+category_router = APIRouter(prefix="/category", tags=["Category"], dependencies=[Depends(fresh_versions)])
+order_router = APIRouter(prefix="/order", tags=["order"])
+
+air = AsyncItemRepository()
+acr = AsyncCategoryRepository()
+aor = AsyncOrderRepository()
+db_ = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+@item_router.get("/show/all", response_model=list[AnyItemView])
+async def show_all(request: Request, response: Response, db: db_):
+    if (not_modified := conditional(request, response, item_list_etag())) is not None:
+        return not_modified
+    return json_response([item_to_dict(item, include_categories=True) for item in await air.find_all(db)], response)
+
+
+@item_router.get("/show/page", response_model=ItemPageView)
+async def show_page(
+    request: Request,
+    response: Response,
+    db: db_,
+    limit: int = Query(20, ge=1, le=200),
+    cursor: str = None,
+    sort: Literal["id", "price"] = "id",
+    type: str = None,
+    min_price: int = None,
+    max_price: int = None,
+    category_id: int = None,
+):
+    if (not_modified := conditional(request, response, item_list_etag())) is not None:
+        return not_modified
+    after = decode_item_cursor(cursor, sort) if cursor else None
+    items = await air.find_page(db, limit, sort=sort, after=after, item_type=type,
+                                min_price=min_price, max_price=max_price, category_id=category_id)
+    categories = await air.find_categories_by_item_ids(db, [item.id for item in items])
+    return json_response({
+        "items": [item_to_dict(item, categories=categories[item.id]) for item in items],
+        "next_cursor": encode_item_cursor(items[-1], sort) if len(items) == limit else None,
+    }, response)
+
+
+@item_router.get("/show/by-category/{category_id}", response_model=list[AnyItemView])
+async def show_by_category(category_id: int, request: Request, response: Response, db: db_, item_type: str = None):
+    if (not_modified := conditional(request, response, item_list_etag())) is not None:
+        return not_modified
+    items = await air.find_by_category(db, category_id, item_type)
+    return json_response([item_to_dict(item, include_categories=True) for item in items], response)
+
+
+@item_router.get("/search", response_model=ItemSearchView)
+async def search_items(db: db_, q: str = Query(..., min_length=1, max_length=100), limit: int = Query(20, ge=1, le=100)):
+    # 색인 검색은 메모리에서 ms 단위라 이벤트 루프에서 바로 한다 (색인 생성은 백그라운드 스레드)
+    found = item_search.search(q, limit)
+    if found is None:
+        items, total = await air.search_like(db, q, limit), None
+    else:
+        ids, total = found
+        by_id = await air.find_by_ids(db, ids)
+        items = [by_id[item_id] for item_id in ids if item_id in by_id]
+    categories = await air.find_categories_by_item_ids(db, [item.id for item in items])
+    return json_response({
+        "items": [item_to_dict(item, categories=categories[item.id]) for item in items],
+        "total": total,
+    })
+
+
+@item_router.get("/show/{id}", response_model=AnyItemView)
+async def show_by_id(id: int, request: Request, response: Response, db: db_):
+    if (not_modified := conditional(request, response, item_etag(id))) is not None:
+        return not_modified
+
+    async def load():
+        item = await air.find_by_id(db, id)
+        return dumps(item_to_dict(item, include_categories=True)) if item else None
+
+    view = await item_cache.aget_or_load(id, load)
+    if view:
+        return json_response(view, response)
+    raise HTTPException(status_code=404, detail="상품이 존재하지 않습니다.")
+
+
+@category_router.get("/show/all")
+async def show_all_categories(request: Request, response: Response, db: db_):
+    etag = versions.etag((CATEGORIES,))
+    if (not_modified := conditional(request, response, etag)) is not None:
+        return not_modified
+    tree = await acr.find_tree(db)
+    return Response(content=tree.json, media_type="application/json", headers={"ETag": etag})
+
+
+@category_router.get("/show/all/flat", response_model=list[CategoryView])
+async def show_all_categories_flat(request: Request, response: Response, db: db_):
+    if (not_modified := conditional(request, response, category_list_etag())) is not None:
+        return not_modified
+    return json_response([category_to_dict(cat) for cat in await acr.find_all(db)], response)
+
+
+@category_router.get("/search", response_model=list[CategoryView])
+async def search_categories(keyword: str, db: db_):
+    found = category_search.search(keyword, CATEGORY_SEARCH_LIMIT)
+    if found is None:
+        categories = await acr.search_by_name(db, keyword)
+    else:
+        by_id = await acr.find_by_ids(db, found[0])
+        categories = [by_id[category_id] for category_id in found[0] if category_id in by_id]
+    return json_response([category_to_dict(cat) for cat in categories])
+
+
+@category_router.get("/show/by-item/{item_id}", response_model=list[CategoryView])
+async def show_categories_by_item(item_id: int, db: db_):
+    return json_response([category_to_dict(cat) for cat in await acr.find_by_item(db, item_id)])
+
+
+@category_router.get("/show/{id}", response_model=CategoryView)
+async def show_category(id: int, db: db_):
+    category = await acr.find_by_id(db, id)
+    if category is None:
+        raise HTTPException(status_code=404, detail="카테고리를 찾을 수 없습니다.")
+    return json_response(category_to_dict(category))
+
+
+@order_router.get("/show/member/{member_id}", response_model=list[OrderView])
+async def get_orders_by_member_id(member_id: int, db: db_):
+    return json_response([order_to_dict(order) for order in await aor.find_by_member_id(db, member_id)])
+
+
+@order_router.get("/history/member/{member_id}", response_model=OrderHistoryView)
+async def get_order_history(
+    member_id: int,
+    db: db_,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = None,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    before = decode_order_cursor(cursor) if cursor else None
+    orders = await aor.find_history(db, member_id, limit, before=before, date_from=date_from, date_to=date_to)
+    return json_response({
+        "orders": [order_to_dict(order) for order in orders],
+        "next_cursor": encode_order_cursor(orders[-1]) if len(orders) == limit else None,
+    })
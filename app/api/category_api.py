@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.params import Body
 from sqlalchemy.orm import Session
+from collections import Counter
 from typing import Annotated
 
-from core.category_service import CategoryService
+from api.serializers import serialize_category, json_response
+from core.category_service import CategoryService, CATEGORY_LINK_MAX_PAIRS
+from core.versions import versions, conditional, CATEGORIES, CATEGORY_ITEMS
 from db.session import get_db
+from db.routing import get_read_db, replica_lag_seconds
+from schemas.dto import CategoryLinkModel
+from schemas.views import CategoryView, CategoryFacetView, CategoryLinkReportView
 
 
 router = APIRouter(prefix="/category", tags=['Category'])
@@ -14,23 +20,17 @@ def get_category_service(db: Session = Depends(get_db)):
     return CategoryService(db)
 
 
+def get_category_read_service(db: Session = Depends(get_read_db)):
+    return CategoryService(db)
+
+
 depends = Annotated[CategoryService, Depends(get_category_service)]
+read_depends = Annotated[CategoryService, Depends(get_category_read_service)]
 strBody = Annotated[str | None, Body()]
 intBody = Annotated[int | None, Body()]
 
 
-def category_to_dict(category, include_children=False):
-    if category is None:
-        return None
-    result = {
-        "id": category.id,
-        "name": category.name,
-        "description": category.description,
-        "parent_id": category.parent_id,
-    }
-    if include_children and category.children:
-        result["children"] = [category_to_dict(child, include_children=True) for child in category.children]
-    return result
+category_to_dict = serialize_category
 
 
 @router.post("/create")
@@ -61,6 +61,27 @@ def connect_ca_it(item_id: intBody, ca_name: strBody, service: depends):
     return result  # boolean
 
 
+def link_report(results):
+    return {"counts": dict(Counter(result["status"] for result in results)), "results": results}
+
+
+def link_pairs(links: list[CategoryLinkModel]):
+    if len(links) > CATEGORY_LINK_MAX_PAIRS:
+        raise HTTPException(status_code=413, detail=f"한번에 최대 {CATEGORY_LINK_MAX_PAIRS}쌍까지 보낼 수 있습니다.")
+    return [(link.item_id, link.ca_name) for link in links]
+
+
+@router.patch("/connect/bulk", response_model=CategoryLinkReportView)
+def connect_ca_it_bulk(links: list[CategoryLinkModel], service: depends):
+    # 여러 (상품, 카테고리) 쌍을 트랜잭션 하나로 연결. 이미 있는 연결은 exists
+    return json_response(link_report(service.connect_category_items(link_pairs(links))))
+
+
+@router.patch("/disconnect/bulk", response_model=CategoryLinkReportView)
+def disconnect_ca_it_bulk(links: list[CategoryLinkModel], service: depends):
+    return json_response(link_report(service.disconnect_category_items(link_pairs(links))))
+
+
 @router.delete("/delete/{ca_name}")
 def remove_category(ca_name: str, service: depends):
     result = service.remove_category(ca_name=ca_name)
@@ -76,35 +97,60 @@ def update_category(ca_name: strBody, name: strBody, des: strBody, service: depe
 
 
 @router.get("/show/all")
-def show_all_categories(service: depends):
-    categories = service.get_all_categories()
-    return [category_to_dict(cat, include_children=True) for cat in categories]
+def show_all_categories(request: Request, response: Response, service: depends):
+    # 트리는 스냅샷 캐시에서 미리 직렬화된 json 을 그대로 내려준다
+    # 스냅샷은 버전이 바뀔 때만 다시 만들고 계속 재사용되므로 replica 지연이 섞이지 않게 primary 에서 만든다
+    etag = versions.etag((CATEGORIES,))
+    if (not_modified := conditional(request, response, etag)) is not None:
+        return not_modified
+    tree = service.get_category_tree()
+    return Response(content=tree.json, media_type="application/json", headers={"ETag": etag})
+
+
+def category_list_etag():
+    return versions.etag((CATEGORIES,), settle=replica_lag_seconds())
 
 
-@router.get("/show/all/flat")
-def show_all_categories_flat(service: depends):
+@router.get("/show/all/flat", response_model=list[CategoryView])
+def show_all_categories_flat(request: Request, response: Response, service: read_depends):
+    if (not_modified := conditional(request, response, category_list_etag())) is not None:
+        return not_modified
     categories = service.get_all_categories_flat()
-    return [category_to_dict(cat) for cat in categories]
+    return json_response([category_to_dict(cat) for cat in categories], response)
 
 
-@router.get("/search")
-def search_categories(keyword: str, service: depends):
+@router.get("/facets", response_model=list[CategoryFacetView])
+def show_category_facets(request: Request, response: Response, service: read_depends):
+    # 카테고리별 상품 수 (하위 포함, 타입별). 미리 세어 둔 표를 한번에 읽는다
+    etag = versions.etag((CATEGORIES, CATEGORY_ITEMS), settle=replica_lag_seconds())
+    if (not_modified := conditional(request, response, etag)) is not None:
+        return not_modified
+    return json_response(service.get_category_facets(), response)
+
+
+@router.post("/facets/rebuild")
+def rebuild_category_facets(service: depends):
+    return {"categories": service.rebuild_category_facets()}
+
+
+@router.get("/search", response_model=list[CategoryView])
+def search_categories(keyword: str, service: read_depends):
     categories = service.search_categories(keyword)
-    return [category_to_dict(cat) for cat in categories]
+    return json_response([category_to_dict(cat) for cat in categories])
 
 
-@router.get("/show/by-item/{item_id}")
-def show_categories_by_item(item_id: int, service: depends):
+@router.get("/show/by-item/{item_id}", response_model=list[CategoryView])
+def show_categories_by_item(item_id: int, service: read_depends):
     categories = service.get_categories_by_item(item_id)
-    return [category_to_dict(cat) for cat in categories]
+    return json_response([category_to_dict(cat) for cat in categories])
 
 
-@router.get("/show/{id}")
-def show_category(id: int, service: depends):
+@router.get("/show/{id}", response_model=CategoryView)
+def show_category(id: int, service: read_depends):
     category = service.show_category(id=id)
     if category is None:
         raise HTTPException(status_code=404, detail="카테고리를 찾을 수 없습니다.")
-    return category_to_dict(category)
+    return json_response(category_to_dict(category))
 
 
 @router.patch("/disconnect")
@@ -1,20 +1,33 @@
-import os
-import uuid
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+import base64
+from typing import Literal
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from db.session import get_db
+from db.routing import get_read_db, replica_lag_seconds
 from core.item_service import ItemService
+from core.item_import_service import ItemImportService, IMPORT_BATCH_SIZE, iter_csv_rows, iter_ndjson_rows
+from core.export_service import export_items
+from core.item_cache import item_cache
+from core.suggest import SUGGEST_TOP_K
+from core.versions import versions, conditional, ITEMS, CATEGORIES, CATEGORY_ITEMS
+from core.image_store import image_store, ImageTooLarge
+from core.image_variants import (image_variants, VariantSourceNotFound, VariantError,
+                                 VARIANT_WIDTHS, VARIANT_FORMATS, VARIANT_CACHE_CONTROL)
 from schemas.dto import ItemBaseModel,BookBaseModel, AlbumBaseModel,MovieBaseModel
+from schemas.views import AnyItemView, ItemPageView, ItemSearchView, SuggestView
+from api.serializers import serialize_item, serialize_item_categories, dumps, json_response
 
 router = APIRouter(prefix="/item", tags=["Item"])
 
-# 이미지 저장 경로
-UPLOAD_DIR = "static/images/items"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 def get_item_service(db: Session = Depends(get_db)):
     return ItemService(db)
 
+# 조회 전용 (replica 로 라우팅, 최근에 쓰기를 한 클라이언트는 primary)
+def get_item_read_service(db: Session = Depends(get_read_db)):
+    return ItemService(db)
+
 #생성
 @router.post("/create/book")
 def item_create_book(input_info: BookBaseModel, service: ItemService = Depends(get_item_service)):
@@ -60,55 +73,159 @@ def item_create_movie(input_info: MovieBaseModel, service: ItemService = Depends
     }
 
 
-# Helper function to convert item to dict
-def item_to_dict(item, include_categories=False):
-    item_dict = {
-        "id": item.id,
-        "name": item.name,
-        "price": item.price,
-        "stock": item.stock,
-        "type": item.type,
-        "image_url": item.image_url,
-    }
-    # Add type-specific fields
-    if hasattr(item, 'author'):
-        item_dict["author"] = item.author
-    if hasattr(item, 'isbn'):
-        item_dict["isbn"] = item.isbn
-    if hasattr(item, 'artist'):
-        item_dict["artist"] = item.artist
-    if hasattr(item, 'etc'):
-        item_dict["etc"] = item.etc
-    if hasattr(item, 'director'):
-        item_dict["director"] = item.director
-    if hasattr(item, 'actor'):
-        item_dict["actor"] = item.actor
-    # Add categories if requested
-    if include_categories and hasattr(item, 'category_items'):
-        item_dict["categories"] = [
-            {"id": ci.category.id, "name": ci.category.name}
-            for ci in item.category_items if ci.category
-        ]
+def item_to_dict(item, include_categories=False, categories=None):
+    # 타입별로 미리 만들어 둔 serializer (api/serializers.py)
+    item_dict = serialize_item(item)
+    if categories is not None:
+        item_dict["categories"] = categories
+    elif include_categories:
+        item_dict["categories"] = serialize_item_categories(item)
     return item_dict
 
 
+# 대량 등록: CSV / NDJSON 파일을 한 줄씩 읽어서 batch 단위 bulk insert
+# 컬럼: type(book|album|movie), name, price, stock, image_url, author, isbn, artist, etc, director, actor,
+#       categories (카테고리 이름, 여러개면 "|" 로 구분. NDJSON 은 리스트도 가능)
+@router.post("/import")
+def import_items(
+    file: UploadFile = File(...),
+    format: Literal["csv", "ndjson"] = None,
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db),
+):
+    if format is None:
+        format = "ndjson" if (file.filename or "").endswith((".ndjson", ".jsonl")) else "csv"
+    rows = iter_ndjson_rows(file.file) if format == "ndjson" else iter_csv_rows(file.file)
+    return ItemImportService(db).import_rows(rows, batch_size)
+
+
+# 전체 내보내기: server-side cursor 로 읽으면서 바로 흘려보낸다 (메모리 일정)
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def export_response(chunks, name: str, format: str, gzip: bool):
+    filename = f"{name}-{date.today():%Y%m%d}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        chunks,
+        media_type="application/gzip" if gzip else EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/export")
+def export_all_items(format: Literal["ndjson", "csv"] = "ndjson", gzip: bool = False):
+    return export_response(export_items(format, gzip), "items", format, gzip)
+
+
+# 조건부 GET: ETag 는 테이블/행 버전 카운터로만 만든다 -> 304 면 DB 조회도 직렬화도 하지 않는다
+# 상품 응답에 카테고리 이름이 들어가므로 카테고리 쪽 버전도 같이
+ITEM_LIST_TABLES = (ITEMS, CATEGORIES, CATEGORY_ITEMS)
+
+
+def item_list_etag():
+    return versions.etag(ITEM_LIST_TABLES, settle=replica_lag_seconds())
+
+
+def item_etag(id: int):
+    return versions.etag((CATEGORIES,), rows=((ITEMS, id),), settle=replica_lag_seconds())
+
+
 #조회
-@router.get("/show/all")
-def show_all(service: ItemService = Depends(get_item_service)):
+@router.get("/show/all", response_model=list[AnyItemView])
+def show_all(request: Request, response: Response, service: ItemService = Depends(get_item_read_service)):
+    if (not_modified := conditional(request, response, item_list_etag())) is not None:
+        return not_modified
     read_all = service.read_all()
-    return [item_to_dict(item, include_categories=True) for item in read_all]
+    return json_response([item_to_dict(item, include_categories=True) for item in read_all], response)
+
+# 페이지 커서: 마지막 상품의 (id) 또는 (price, id) 를 base64 로 감싼 문자열
+def encode_cursor(item, sort):
+    raw = f"{item.price}:{item.id}" if sort == "price" else f"{item.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, sort):
+    try:
+        values = tuple(int(v) for v in base64.urlsafe_b64decode(cursor.encode()).decode().split(":"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+    if len(values) != (2 if sort == "price" else 1):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+    return values
+
+
+@router.get("/show/page", response_model=ItemPageView)
+def show_page(
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=200),
+    cursor: str = None,
+    sort: Literal["id", "price"] = "id",
+    type: str = None,
+    min_price: int = None,
+    max_price: int = None,
+    category_id: int = None,
+    service: ItemService = Depends(get_item_read_service),
+):
+    if (not_modified := conditional(request, response, item_list_etag())) is not None:
+        return not_modified
+    after = decode_cursor(cursor, sort) if cursor else None
+    items, categories = service.read_page(
+        limit, sort=sort, after=after, item_type=type,
+        min_price=min_price, max_price=max_price, category_id=category_id,
+    )
+    next_cursor = encode_cursor(items[-1], sort) if len(items) == limit else None
+    return json_response({
+        "items": [item_to_dict(item, categories=categories[item.id]) for item in items],
+        "next_cursor": next_cursor,
+    }, response)
+
 
-@router.get("/show/by-category/{category_id}")
-def show_by_category(category_id: int, item_type: str = None, service: ItemService = Depends(get_item_service)):
+@router.get("/show/by-category/{category_id}", response_model=list[AnyItemView])
+def show_by_category(category_id: int, request: Request, response: Response, item_type: str = None,
+                     service: ItemService = Depends(get_item_read_service)):
+    if (not_modified := conditional(request, response, item_list_etag())) is not None:
+        return not_modified
     items = service.read_by_category(category_id, item_type)
-    return [item_to_dict(item, include_categories=True) for item in items]
+    return json_response([item_to_dict(item, include_categories=True) for item in items], response)
+
+
+# 이름 / 저자 / 가수 / 감독 / 배우 부분 일치 검색 (n-gram 색인, core/search_index.py). 점수순
+@router.get("/search", response_model=ItemSearchView)
+def search_items(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(20, ge=1, le=100),
+                 service: ItemService = Depends(get_item_read_service)):
+    items, categories, total = service.search(q, limit)
+    return json_response({
+        "items": [item_to_dict(item, categories=categories[item.id]) for item in items],
+        "total": total,
+    })
+
+
+# 검색창 자동완성 (키 입력마다). 상품 / 카테고리 이름 접두어, 판매 수량순. 메모리 색인만 본다
+@router.get("/suggest", response_model=SuggestView)
+def suggest(prefix: str = Query(..., min_length=1, max_length=50),
+            limit: int = Query(SUGGEST_TOP_K, ge=1, le=SUGGEST_TOP_K),
+            service: ItemService = Depends(get_item_read_service)):
+    items, categories = service.suggest(prefix, limit)
+    return json_response({
+        "items": [{"id": item_id, "name": name} for item_id, name in items],
+        "categories": [{"id": category_id, "name": name} for category_id, name in categories],
+    })
+
+
+@router.get("/show/{id}", response_model=AnyItemView)
+def show_by_id(id:int, request: Request, response: Response, service: ItemService = Depends(get_item_read_service)):
+    if (not_modified := conditional(request, response, item_etag(id))) is not None:
+        return not_modified
 
+    def load():
+        by_id = service.read_item_by_id(id)
+        return dumps(item_to_dict(by_id, include_categories=True)) if by_id else None
 
-@router.get("/show/{id}")
-def show_by_id(id:int, service: ItemService = Depends(get_item_service)):
-    by_id = service.read_item_by_id(id)
-    if by_id:
-        return item_to_dict(by_id, include_categories=True)
+    # 인코딩된 응답 bytes 를 캐시 (수정/삭제/카테고리 연결/재고 변경이 커밋되면 무효화, core/item_cache.py)
+    view = item_cache.get_or_load(id, load)
+    if view:
+        return json_response(view, response)
 
     raise HTTPException(
         status_code=404,
@@ -130,7 +247,10 @@ def update_by_id(id: int, payload: ItemBaseModel, service: ItemService = Depends
 #삭제
 @router.delete("/delete/{id}")
 def delete_by_id(id: int, service: ItemService = Depends(get_item_service)):
-    result = service.delete_item(id)
+    try:
+        result = service.delete_item(id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if result:
         return result
 
@@ -142,13 +262,29 @@ def delete_by_id(id: int, service: ItemService = Depends(get_item_service)):
 
 @router.post("/upload/image")
 async def upload_image(file: UploadFile = File(...)):
-    # 파일 확장자 추출
-    ext = os.path.splitext(file.filename)[1]
-    # UUID로 고유 파일명 생성
-    unique_filename = f"{uuid.uuid4()}{ext}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
+    # 청크 단위로 스트리밍 저장, 파일명은 내용 해시 -> 같은 이미지는 한번만 저장된다
+    try:
+        url, created = await image_store.save(file)
+    except ImageTooLarge:
+        raise HTTPException(status_code=413, detail="이미지 파일이 너무 큽니다.")
+    return {"url": url, "created": created}
 
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
 
-    return {"url": f"/static/images/items/{unique_filename}"}
+# 목록 썸네일용 리사이즈 이미지: /item/image/{업로드 파일명}?w=200&fmt=webp
+@router.get("/image/{name}")
+async def image_variant(name: str, request: Request, w: int, fmt: Literal["webp", "jpeg", "png"] = "webp"):
+    if w not in VARIANT_WIDTHS:
+        raise HTTPException(status_code=400, detail=f"w 는 {', '.join(map(str, VARIANT_WIDTHS))} 중 하나여야 합니다.")
+    etag = image_variants.etag(image_variants.variant_name(name, w, fmt))
+    headers = {"ETag": etag, "Cache-Control": VARIANT_CACHE_CONTROL}
+    try:
+        # 원본이 지워졌으면 ETag 가 맞아도 404 (304 로 옛 이미지를 계속 쓰게 하지 않는다)
+        image_variants.source_path(name)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        path = await image_variants.get(name, w, fmt)
+    except VariantSourceNotFound:
+        raise HTTPException(status_code=404, detail="이미지가 존재하지 않습니다.")
+    except VariantError:
+        raise HTTPException(status_code=422, detail="이미지를 변환할 수 없습니다.")
+    return image_variants.response(path, VARIANT_FORMATS[fmt][1], headers)
@@ -3,15 +3,17 @@ from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-import bcrypt
 from schemas.dto import MemberLogin
 from typing import Annotated, Optional
 from jose import JWTError, jwt
-from db.session import get_db
+from db.session import get_db, unit_of_work
 from core.member_service import MemberService
+from core.password_hasher import password_hasher, HasherBusy
 from models.member import Member
 from models.administrator import Administrator
 from schemas.dto import MemberBaseModel
+from schemas.views import MemberView
+from api.serializers import member_to_dict, json_response
 from datetime import datetime, timedelta, timezone
 
 load_dotenv()
@@ -19,12 +21,18 @@ load_dotenv()
 router = APIRouter(prefix="/member", tags=["Member"])
 security = HTTPBearer()
 
-# 해시 함수 (bcrypt 직접 사용)
-def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+# 해시 함수 (bcrypt 는 전용 스레드풀에서 -> 이벤트 루프를 막지 않음)
+async def get_password_hash(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="요청이 많습니다. 잠시 후 다시 시도해주세요.", headers={"Retry-After": "1"})
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="요청이 많습니다. 잠시 후 다시 시도해주세요.", headers={"Retry-After": "1"})
 
 SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-key")
 ALGORITHM = "HS256"
@@ -56,30 +64,26 @@ async def member_create(input_info: MemberBaseModel,  db: db_):
     db_user = db.query(Member).filter(Member.email==input_info.email).first()
     if db_user:
         raise HTTPException(status_code=400, detail="이메일 중복임")
+    db.close()      # bcrypt 를 기다리는 동안 커넥션을 풀에 돌려준다
 
-    hashed_password = get_password_hash(input_info.password)
+    hashed_password = await get_password_hash(input_info.password)
     input_info.password = hashed_password
     db_user = Member(
         **input_info.model_dump()
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return {
-        "id": db_user.id,
-        "name": db_user.name,
-        "email": db_user.email,
-        "zip": db_user.zip,
-        "addr1": db_user.addr1,
-        "addr2": db_user.addr2,
-    }
+    with unit_of_work(db):
+        db.add(db_user)
+    return member_to_dict(db_user)
 
 #1-2 로그인 (관리자/회원 통합)
 @router.post("/login")
 async def login(user_credentials: MemberLogin, db: db_):
-    # 먼저 관리자 테이블에서 확인
     admin = db.query(Administrator).filter(Administrator.email == user_credentials.email).first()
-    if admin and verify_password(user_credentials.password, admin.password):
+    user = db.query(Member).filter(Member.email == user_credentials.email).first()
+    db.close()      # bcrypt 를 기다리는 동안 커넥션을 풀에 돌려준다 (조회한 객체는 그대로 사용 가능)
+
+    # 먼저 관리자 테이블에서 확인
+    if admin and await verify_password(user_credentials.password, admin.password):
         access_token = create_access_token(
             data={"sub": admin.email, "user_type": "admin", "user_id": admin.id},
             expires_delta=timedelta(minutes=30)
@@ -96,8 +100,7 @@ async def login(user_credentials: MemberLogin, db: db_):
         }
 
     # 회원 테이블에서 확인
-    user = db.query(Member).filter(Member.email == user_credentials.email).first()
-    if user and verify_password(user_credentials.password, user.password):
+    if user and await verify_password(user_credentials.password, user.password):
         access_token = create_access_token(
             data={"sub": user.email, "user_type": "member", "user_id": user.id},
             expires_delta=timedelta(minutes=30)
@@ -106,14 +109,7 @@ async def login(user_credentials: MemberLogin, db: db_):
             "access_token": access_token,
             "token_type": "bearer",
             "user_type": "member",
-            "user": {
-                "id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "zip": user.zip,
-                "addr1": user.addr1,
-                "addr2": user.addr2
-            }
+            "user": member_to_dict(user)
         }
 
     raise HTTPException(
@@ -151,14 +147,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             if user:
                 return {
                     "user_type": "member",
-                    "user": {
-                        "id": user.id,
-                        "name": user.name,
-                        "email": user.email,
-                        "zip": user.zip,
-                        "addr1": user.addr1,
-                        "addr2": user.addr2
-                    }
+                    "user": member_to_dict(user)
                 }
 
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
@@ -170,34 +159,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 
 
 # 2. 회원 목록 조회
-@router.get("/show/all")
+@router.get("/show/all", response_model=list[MemberView])
 async def show_member(service: service_):
     members = service.find_all()
-    result = []
-    for member in members:
-        result.append({
-            "id": member.id,
-            "name": member.name,
-            "email": member.email,
-            "zip": member.zip,
-            "addr1": member.addr1,
-            "addr2": member.addr2,
-        })
-    return result
-
-
-@router.get("/show/{id}")
+    return json_response([member_to_dict(member) for member in members])
+
+
+@router.get("/show/{id}", response_model=MemberView)
 async def show_member_by_id(id: int, service: service_):
     find_by_id = service.find_by_id(id)
     if find_by_id:
-        return {
-            "id": find_by_id.id,
-            "name": find_by_id.name,
-            "email": find_by_id.email,
-            "zip": find_by_id.zip,
-            "addr1": find_by_id.addr1,
-            "addr2": find_by_id.addr2,
-        }
+        return json_response(member_to_dict(find_by_id))
     else:
         raise HTTPException(
             status_code=404,
@@ -210,14 +182,7 @@ async def show_member_by_id(id: int, service: service_):
 async def delete_member(id: int, service: service_):
     member = service.delete_member(id)
     if member:
-        return {
-            "id": member.id,
-            "name": member.name,
-            "email": member.email,
-            "zip": member.zip,
-            "addr1": member.addr1,
-            "addr2": member.addr2,
-        }
+        return member_to_dict(member)
     raise HTTPException(
         status_code=404,
         detail="회원이 존재하지 않습니다."
@@ -229,14 +194,7 @@ async def delete_member(id: int, service: service_):
 async def update_member(id: int, payload: dict, service: service_):
     member = service.update_member(id, payload)
     if member:
-        return {
-            "id": member.id,
-            "name": member.name,
-            "email": member.email,
-            "zip": member.zip,
-            "addr1": member.addr1,
-            "addr2": member.addr2,
-        }
+        return member_to_dict(member)
     raise HTTPException(
         status_code=404,
         detail="회원이 존재하지 않습니다."
@@ -0,0 +1,54 @@
+from fastapi import APIRouter
+
+from core.image_variants import image_variants
+from core.item_cache import item_cache
+from core.password_hasher import password_hasher
+from core.search_index import item_search, category_search
+from core.stock_holds import hold_sweeper
+from core.suggest import item_suggest, category_suggest
+from db.pool_metrics import pool_stats
+from db.query_stats import query_metrics
+
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("/password-hasher")
+def password_hasher_metrics():
+    return password_hasher.stats()
+
+
+@router.get("/db-pool")
+def db_pool_metrics():
+    return pool_stats()
+
+
+@router.get("/queries")
+def query_metrics_by_route():
+    # 라우트별 요청 수 / 쿼리 수(평균, 최대) / DB 시간 / N+1 로 보이는 요청 수
+    return query_metrics.snapshot()
+
+
+@router.get("/image-variants")
+def image_variant_metrics():
+    return image_variants.stats()
+
+
+@router.get("/item-cache")
+def item_cache_metrics():
+    return item_cache.stats()
+
+
+@router.get("/search-index")
+def search_index_metrics():
+    return {
+        "items": item_search.stats(),
+        "categories": category_search.stats(),
+        "item_suggest": item_suggest.stats(),
+        "category_suggest": category_suggest.stats(),
+    }
+
+
+@router.get("/stock-holds")
+def stock_hold_metrics():
+    return hold_sweeper.stats()
@@ -1,9 +1,17 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+from datetime import datetime
+from operator import attrgetter
+from typing import Annotated, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from core.order_service import OrderService
+from core.export_service import export_orders
+from api.item_api import export_response
+from api.serializers import json_response
 from db.session import get_db
-from schemas.dto import OrderBaseModel
+from db.routing import get_read_db
+from schemas.dto import OrderBaseModel, CheckoutBaseModel, CheckoutConfirmModel
+from schemas.views import OrderView, OrderHistoryView, CheckoutView
 
 
 router = APIRouter(prefix="/order", tags=["order"])
@@ -13,7 +21,12 @@ def get_order_service(db: Session = Depends(get_db)):
     return OrderService(db)
 
 
+def get_order_read_service(db: Session = Depends(get_read_db)):
+    return OrderService(db)
+
+
 order_service = Annotated[OrderService, Depends(get_order_service)]
+order_read_service = Annotated[OrderService, Depends(get_order_read_service)]
 
 
 @router.post("/create/{member_id}")
@@ -22,43 +35,128 @@ def create_order(dto:OrderBaseModel, member_id:int, service:order_service):
     zip = dto.zip
     addr1 = dto.addr1
     addr2 = dto.addr2
-    temp = service.create_order(member_id,zip, addr1, addr2, item_count_list)
+    try:
+        temp = service.create_order(member_id,zip, addr1, addr2, item_count_list)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if temp:
-        return temp
+        return order_summary(temp)
     raise HTTPException(
         status_code=404,
         detail="주문이 취소 되었습니다."
     )
 
-@router.get("/show/member/{member_id}")
-def get_orders_by_member_id(member_id: int, service: order_service):
+
+def order_summary(order):
+    # 커밋 후에도 관계(member, order_items)가 로드된 채라 ORM 객체를 그대로 내보내면 순환참조가 생김
+    return {
+        "id": order.id,
+        "total_price": order.total_price,
+        "status": order.status,
+        "order_date": order.order_date,
+        "member_id": order.member_id,
+    }
+
+
+# 결제 시작 -> 재고를 잠시 잡아 두고 (STOCK_HOLD_TTL_SECONDS) confirm 하면 주문, 아니면 풀린다
+@router.post("/checkout/{member_id}", response_model=CheckoutView)
+def start_checkout(dto: CheckoutBaseModel, member_id: int, service: order_service):
+    try:
+        checkout = service.start_checkout(member_id, dto.items)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if checkout is None:
+        raise HTTPException(status_code=404, detail="회원을 찾을 수 없습니다.")
+    return json_response(checkout)
+
+
+@router.post("/checkout/{checkout_id}/confirm")
+def confirm_checkout(checkout_id: str, dto: CheckoutConfirmModel, service: order_service):
+    try:
+        order = service.confirm_checkout(checkout_id, dto.zip, dto.addr1, dto.addr2)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if order is None:
+        raise HTTPException(status_code=410, detail="결제 시간이 만료되었거나 없는 checkout 입니다.")
+    return order_summary(order)
+
+
+@router.delete("/checkout/{checkout_id}")
+def release_checkout(checkout_id: str, service: order_service):
+    if not service.release_checkout(checkout_id):
+        raise HTTPException(status_code=404, detail="없거나 이미 끝난 checkout 입니다.")
+    return True
+
+_order_fields = attrgetter("id", "total_price", "order_date", "status", "member_id", "order_items")
+_order_item_fields = attrgetter("item_id", "count", "item")
+
+
+def order_to_dict(order):
+    order_id, total_price, order_date, status, member_id, order_items = _order_fields(order)
+    return {
+        "id": order_id,
+        "total_price": total_price,
+        "order_date": order_date.isoformat(),
+        "status": status.name,
+        "member_id": member_id,
+        "order_items": [
+            {"item_id": item_id, "count": count, "item_name": item.name if item else "Unknown Item"}
+            for item_id, count, item in map(_order_item_fields, order_items)
+        ],
+    }
+
+
+@router.get("/show/member/{member_id}", response_model=list[OrderView])
+def get_orders_by_member_id(member_id: int, service: order_read_service):
     orders = service.get_orders_by_member_id(member_id)
-    if not orders:
-        return []
-    
-    result = []
-    for order in orders:
-        order_dict = {
-            "id": order.id,
-            "total_price": order.total_price,
-            "order_date": order.order_date.isoformat(), # Convert datetime to ISO format string
-            "status": order.status.name, # Assuming status is an Enum
-            "member_id": order.member_id,
-            "order_items": [] # Initialize order_items
-        }
-        if order.order_items: # Check if order_items exist and iterate
-            for order_item in order.order_items:
-                order_dict["order_items"].append({
-                    "item_id": order_item.item_id,
-                    "count": order_item.count,
-                    "item_name": order_item.item.name if order_item.item else "Unknown Item" # Include item name
-                })
-        result.append(order_dict)
-    return result
+    return json_response([order_to_dict(order) for order in orders])
+
+
+# 페이지 커서: 마지막 주문의 (order_date, id)
+def encode_cursor(order):
+    raw = f"{order.order_date.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        order_date, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(order_date), int(order_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+
+
+@router.get("/history/member/{member_id}", response_model=OrderHistoryView)
+def get_order_history(
+    member_id: int,
+    service: order_read_service,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = None,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    before = decode_cursor(cursor) if cursor else None
+    orders = service.get_order_history(member_id, limit, before=before, date_from=date_from, date_to=date_to)
+    return json_response({
+        "orders": [order_to_dict(order) for order in orders],
+        "next_cursor": encode_cursor(orders[-1]) if len(orders) == limit else None,
+    })
+
+@router.get("/export")
+def export_all_orders(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    date_from: datetime = None,
+    date_to: datetime = None,
+):
+    # NDJSON 은 주문 하나에 order_items 리스트, CSV 는 주문상품 한 줄에 한 행
+    return export_response(export_orders(format, gzip, date_from, date_to), "orders", format, gzip)
+
 
 @router.delete("/delete/{order_id}")
 def delete_order(order_id:int, service:order_service):
-    res=service.cancel_order(order_id)
-    return res
+    if not service.cancel_order(order_id):
+        raise HTTPException(status_code=404, detail="주문을 찾을 수 없습니다.")
+    return True
 
 
@@ -0,0 +1,90 @@
+"""조회 응답 직렬화.
+
+모델 클래스마다 필드 목록과 attrgetter 를 한번만 만들어 두고 (hasattr 체크 없이) dict 를 만든다.
+JSON 인코딩은 orjson 으로 하고, 라우트는 FastJSONResponse 로 bytes 를 바로 돌려준다
+(FastAPI 의 jsonable_encoder 를 거치지 않는다). 미리 인코딩해 둔 bytes 도 그대로 보낼 수 있다.
+"""
+from operator import attrgetter
+
+import orjson
+from starlette.responses import JSONResponse
+
+from models.item.item import Item
+from models.item.album import Album
+from models.item.book import Book
+from models.item.movie import Movie
+
+ITEM_FIELDS = ("id", "name", "price", "stock", "available", "type", "image_url")
+# 하위 타입별로 붙는 필드 (items 테이블 하나에 같이 있음)
+ITEM_TYPE_FIELDS = {
+    Book: ("author", "isbn"),
+    Album: ("artist", "etc"),
+    Movie: ("director", "actor"),
+}
+CATEGORY_FIELDS = ("id", "name", "description", "parent_id")
+MEMBER_FIELDS = ("id", "name", "email", "zip", "addr1", "addr2")
+
+
+def compile_serializer(fields: tuple):
+    # obj -> {field: obj.field, ...}. 필드 목록은 고정이라 getter 를 미리 만든다
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        return lambda obj: {fields[0]: getter(obj)}
+    return lambda obj: dict(zip(fields, getter(obj)))
+
+
+ITEM_SERIALIZERS = {Item: compile_serializer(ITEM_FIELDS)}
+ITEM_SERIALIZERS.update((cls, compile_serializer(ITEM_FIELDS + extra)) for cls, extra in ITEM_TYPE_FIELDS.items())
+
+category_fields = compile_serializer(CATEGORY_FIELDS)
+member_to_dict = compile_serializer(MEMBER_FIELDS)
+_category_ref = attrgetter("id", "name")
+
+
+def item_serializer(cls):
+    serializer = ITEM_SERIALIZERS.get(cls)
+    if serializer is None:
+        # 등록 안 된 하위 클래스면 가장 가까운 부모 것을 쓰고 기억해 둔다
+        parent = next(base for base in cls.__mro__ if base in ITEM_SERIALIZERS)
+        serializer = ITEM_SERIALIZERS[cls] = ITEM_SERIALIZERS[parent]
+    return serializer
+
+
+def serialize_item(item) -> dict:
+    return item_serializer(type(item))(item)
+
+
+def serialize_item_categories(item) -> list:
+    result = []
+    for ci in item.category_items:
+        if ci.category:
+            category_id, name = _category_ref(ci.category)
+            result.append({"id": category_id, "name": name})
+    return result
+
+
+def serialize_category(category, include_children=False):
+    if category is None:
+        return None
+    result = category_fields(category)
+    if include_children and category.children:
+        result["children"] = [serialize_category(child, include_children=True) for child in category.children]
+    return result
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 으로 인코딩하는 JSONResponse. content 가 bytes 면 이미 인코딩된 것으로 보고 그대로 보낸다."""
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+def json_response(content, response=None) -> FastJSONResponse:
+    # response: 라우트가 받은 Response 파라미터 (ETag 같은 헤더를 옮겨 담는다)
+    return FastJSONResponse(content, headers=dict(response.headers) if response is not None else None)
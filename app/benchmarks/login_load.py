@@ -0,0 +1,115 @@
+"""로그인이 몰릴 때 `/` 지연시간이 유지되는지 확인하는 부하 테스트.
+
+앱을 같은 프로세스/이벤트 루프에서 띄우고(httpx ASGITransport), 로그인 요청을
+동시에 계속 보내면서 `/` 응답시간을 잰다. bcrypt 가 이벤트 루프를 막으면
+`/` 의 p99 가 bcrypt 1회 시간만큼 튀고, 전용 풀에서 돌면 평소와 비슷하게 유지된다.
+
+    cd app
+    python -m benchmarks.login_load --concurrency 50 --duration 10
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.session import Base, get_db
+from main import app
+from models.member import Member
+from core.password_hasher import hash_password, password_hasher
+
+EMAIL = "load@test.com"
+PASSWORD = "load-test-pw"
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def setup_db(url: str):
+    engine = create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Session()
+    if db.query(Member).filter(Member.email == EMAIL).first() is None:
+        db.add(Member(name="load", email=EMAIL, password=hash_password(PASSWORD), zip="1", addr1="a", addr2="b"))
+        db.commit()
+    db.close()
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+
+async def probe_root(client, stop: asyncio.Event, interval: float):
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def login_worker(client, stop: asyncio.Event, statuses: dict):
+    body = {"email": EMAIL, "password": PASSWORD}
+    while not stop.is_set():
+        res = await client.post("/member/login", json=body)
+        statuses[res.status_code] = statuses.get(res.status_code, 0) + 1
+        if res.status_code == 503:
+            await asyncio.sleep(float(res.headers.get("Retry-After", 1)))
+
+
+async def run(concurrency: int, duration: float, interval: float):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        baseline_task = asyncio.create_task(probe_root(client, stop, interval))
+        await asyncio.sleep(min(duration, 3))
+        stop.set()
+        baseline = await baseline_task
+
+        stop = asyncio.Event()
+        statuses = {}
+        probe_task = asyncio.create_task(probe_root(client, stop, interval))
+        workers = [asyncio.create_task(login_worker(client, stop, statuses)) for _ in range(concurrency)]
+        started = time.perf_counter()
+        await asyncio.sleep(duration)
+        stop.set()
+        loaded = await probe_task
+        await asyncio.gather(*workers)
+        elapsed = time.perf_counter() - started
+
+    print(f"{'':>14} {'n':>6} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, values in (("/ idle", baseline), ("/ under login", loaded)):
+        print(f"{name:>14} {len(values):>6} {statistics.median(values):>8.2f} "
+              f"{percentile(values, 99):>8.2f} {max(values):>8.2f}")
+    logins = sum(statuses.values())
+    print(f"logins: {logins} ({logins / elapsed:.1f}/s) statuses={statuses}")
+    print(f"hasher: {password_hasher.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=None, help="기본값: 임시 sqlite 파일")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--interval", type=float, default=0.01)
+    args = parser.parse_args()
+
+    url = args.db or f"sqlite:///{tempfile.mkdtemp()}/login_load.db"
+    setup_db(url)
+    asyncio.run(run(args.concurrency, args.duration, args.interval))
@@ -0,0 +1,101 @@
+"""벤치마크 시나리오. 실제 사용자 흐름 하나를 요청 여러개로 흉내낸다.
+
+각 시나리오는 `async def scenario(session)` 형태이고 session.get / session.post 로 요청을 보낸다.
+요청마다 이름(라우트 템플릿)을 붙여서 러너가 엔드포인트별로 지연시간을 모은다.
+"""
+import time
+
+from benchmarks.seed import PASSWORD
+
+
+class BenchSession:
+    """워커 하나가 쓰는 클라이언트 + 난수 + 결과 기록기"""
+
+    def __init__(self, client, info, rng, record):
+        self.client = client
+        self.info = info
+        self.rng = rng
+        self.record = record        # record(name, status_code, elapsed_seconds)
+
+    async def request(self, method: str, name: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except Exception:       # 연결 실패 / 타임아웃은 599 로 센다
+            self.record(name, 599, time.perf_counter() - start)
+            return None
+        self.record(name, response.status_code, time.perf_counter() - start)
+        return response
+
+    async def get(self, name: str, url: str, **kwargs):
+        return await self.request("GET", name, url, **kwargs)
+
+    async def post(self, name: str, url: str, **kwargs):
+        return await self.request("POST", name, url, **kwargs)
+
+    def member_id(self) -> int:
+        return self.rng.randint(1, self.info.members)
+
+    def item_id(self) -> int:
+        return self.rng.randint(1, self.info.items)
+
+
+async def browse_catalog(s: BenchSession):
+    # 상품 목록 2~3 페이지 넘기고 그 중 하나 상세 보기
+    params = {"limit": 20, "sort": s.rng.choice(("id", "price"))}
+    items = []
+    for _ in range(s.rng.randint(2, 3)):
+        response = await s.get("GET /item/show/page", "/item/show/page", params=params)
+        if response is None or response.status_code != 200:
+            return
+        body = response.json()
+        items = body["items"] or items
+        if body["next_cursor"] is None:
+            break
+        params = dict(params, cursor=body["next_cursor"])
+    if items:
+        await s.get("GET /item/show/{id}", f"/item/show/{s.rng.choice(items)['id']}")
+
+
+async def category_drilldown(s: BenchSession):
+    # 트리 -> 루트 카테고리 -> 리프 카테고리 상품 목록
+    await s.get("GET /category/show/all", "/category/show/all")
+    root_id = s.rng.choice(s.info.root_ids)
+    await s.get("GET /category/show/{id}", f"/category/show/{root_id}")
+    leaf_id = s.rng.choice(s.info.leaf_ids)
+    await s.get("GET /item/show/by-category/{category_id}", f"/item/show/by-category/{leaf_id}")
+    await s.get("GET /item/show/page?category_id", "/item/show/page",
+                params={"limit": 20, "category_id": s.rng.choice(s.info.root_ids)})
+
+
+async def login(s: BenchSession):
+    member_id = s.member_id()
+    await s.post("POST /member/login", "/member/login",
+                 json={"email": s.info.member_email(member_id), "password": PASSWORD})
+
+
+async def checkout(s: BenchSession):
+    # 상품 1~3 개 주문. 시드 재고가 넉넉해서 실패하면 그 자체가 회귀
+    lines = [{"item_id": s.item_id(), "count": 1} for _ in range(s.rng.randint(1, 3))]
+    await s.post("POST /order/create/{member_id}", f"/order/create/{s.member_id()}",
+                 json={"zip": "12345", "addr1": "서울시", "addr2": "강남구", "items": lines})
+
+
+async def order_history(s: BenchSession):
+    member_id = s.member_id()
+    response = await s.get("GET /order/history/member/{member_id}", f"/order/history/member/{member_id}",
+                           params={"limit": 20})
+    if response is not None and response.status_code == 200 and response.json()["next_cursor"]:
+        await s.get("GET /order/history/member/{member_id}", f"/order/history/member/{member_id}",
+                    params={"limit": 20, "cursor": response.json()["next_cursor"]})
+    await s.get("GET /order/show/member/{member_id}", f"/order/show/member/{member_id}")
+
+
+# 이름: (시나리오, 기본 비중)
+SCENARIOS = {
+    "browse": (browse_catalog, 50),
+    "drilldown": (category_drilldown, 25),
+    "history": (order_history, 10),
+    "checkout": (checkout, 10),
+    "login": (login, 5),
+}
@@ -0,0 +1,147 @@
+"""상품 검색 벤치마크: LIKE '%키워드%' vs n-gram 색인 (core/search_index.py).
+
+무작위로 만든 한글/영문 단어(자주 쓰이는 단어가 있게 멱법칙 분포)로 상품 이름과 저자/가수/감독/배우를 SQLite 에 넣고
+  - 색인 생성 시간 / 메모리(RSS 증가분)
+  - 같은 검색어들로 LIKE 검색과 색인 검색(id 찾기 + IN 으로 읽기)의 지연 p50 / p95
+를 잰다. 검색어는 실제 이름의 단어에서 잘라낸 조각 (한글 1~3글자, 영문 2~6글자, 가끔 두 단어).
+
+    cd app
+    python -m benchmarks.search_bench --items 200000 --queries 300
+    python -m benchmarks.search_bench --items 1000000      # 1M SKU (생성에 몇 분 걸린다)
+"""
+import argparse
+import os
+import random
+import resource
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from core.search_index import SearchIndex, item_rows
+from crud.item import ItemRepository
+from db.session import Base
+from models.item.item import Item
+
+SYLLABLES = ("가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후"
+             "기니디리미비시이지치키티피히강남동문민박선성영원인정진천한현화환희")
+LETTERS = "abcdefghiklmnoprstuvwy"
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+
+
+def vocabulary(rng, korean: int, english: int):
+    # 실제 카탈로그처럼 단어 종류가 많게 (한글 2~4음절, 영문 4~9글자)
+    words = {"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(korean)}
+    words |= {"".join(rng.choice(LETTERS) for _ in range(rng.randint(4, 9))) for _ in range(english)}
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def pick(rng, words):
+    # 앞쪽 단어가 훨씬 자주 나오게 (멱법칙, 가장 흔한 단어가 몇 % 정도)
+    return words[int(len(words) * rng.random() ** 3)]
+
+
+def person(rng):
+    return rng.choice(SURNAMES) + "".join(rng.choice(SYLLABLES) for _ in range(2))
+
+
+def item_row(rng, words, i):
+    kind = ("BOOK", "ALBUM", "MOVIE")[i % 3]
+    return {
+        "type": kind, "name": " ".join(pick(rng, words) for _ in range(rng.randint(2, 4))),
+        "price": 1000 + i % 50000, "stock": 100, "image_url": None,
+        "author": person(rng) if kind == "BOOK" else None, "isbn": i if kind == "BOOK" else None,
+        "artist": person(rng) if kind == "ALBUM" else None, "etc": None,
+        "director": person(rng) if kind == "MOVIE" else None, "actor": person(rng) if kind == "MOVIE" else None,
+    }
+
+
+def queries(rng, names, count):
+    # 실제 이름의 한 단어에서 잘라낸 조각 (한글 1~3글자, 영문 2~6글자). 20% 는 두 단어
+    result = []
+    for _ in range(count):
+        words = rng.choice(names).split()
+        parts = []
+        for word in rng.sample(words, 2 if rng.random() < 0.2 else 1):
+            size = rng.randint(1, 3) if word[0] >= "가" else rng.randint(2, 6)
+            start = rng.randint(0, max(len(word) - size, 0))
+            parts.append(word[start:start + size])
+        result.append(" ".join(parts))
+    return result
+
+
+def percentiles(runs) -> dict:
+    runs = sorted(runs)
+    return {
+        "p50_ms": round(statistics.median(runs), 2),
+        "p95_ms": round(runs[int(len(runs) * 0.95) - 1], 2),
+    }
+
+
+def measure(fn, qs) -> dict:
+    runs = []
+    for q in qs:
+        started = time.perf_counter()
+        fn(q)
+        runs.append((time.perf_counter() - started) * 1000)
+    return percentiles(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary(rng, korean=max(args.items // 5, 100), english=max(args.items // 10, 50))
+    path = os.path.join(tempfile.mkdtemp(), "search.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    names = []
+    with engine.begin() as conn:
+        for start in range(0, args.items, 10000):
+            rows = [item_row(rng, words, i) for i in range(start, min(start + 10000, args.items))]
+            names.extend(rng.choice(rows)["name"] for _ in range(10))
+            conn.execute(insert(Item.__table__), rows)
+    Session = sessionmaker(bind=engine)
+
+    index = SearchIndex("bench", item_rows)
+    index.session_factory = Session
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    index.rebuild()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    stats = index.stats()
+
+    repo = ItemRepository()
+    qs = queries(rng, names, args.queries)
+    with Session() as db:
+        def like(q):
+            return repo.search_like(db, q, args.limit)
+
+        def ngram(q):
+            ids, _ = index.search(q, args.limit)
+            return repo.find_by_ids(db, ids)
+
+        def ngram_only(q):
+            return index.search(q, args.limit)
+
+        results = {name: measure(fn, qs) for name, fn in (("like", like), ("ngram", ngram), ("ngram_only", ngram_only))}
+    engine.dispose()
+
+    print(f"items={args.items} grams={stats['grams']} build={stats['last_build_seconds']}s "
+          f"rss+={(rss_after - rss_before) / 1024:.0f}MB queries={len(qs)}")
+    print(f"{'path':<12} {'p50(ms)':>10} {'p95(ms)':>10}")
+    for name, result in results.items():
+        print(f"{name:<12} {result['p50_ms']:>10} {result['p95_ms']:>10}")
+    print(f"p50 speedup x{results['like']['p50_ms'] / results['ngram']['p50_ms']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
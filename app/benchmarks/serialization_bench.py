@@ -0,0 +1,108 @@
+"""상품 목록 직렬화 마이크로 벤치마크: 예전 경로 vs 타입별 serializer + orjson.
+
+합성 데이터(상품 + 카테고리 연결)를 SQLite 에 넣고 /item/show/all 과 같은 쿼리로 한번 읽은 뒤,
+같은 ORM 객체들로 두 경로를 반복해서 잰다 (DB 시간은 빼고 직렬화만).
+
+  - legacy: hasattr 체인으로 dict 를 만들고 jsonable_encoder + JSONResponse 로 인코딩
+  - fast:   api/serializers.py 의 타입별 serializer + FastJSONResponse(orjson)
+
+    cd app
+    python -m benchmarks.serialization_bench --items 10000 --repeat 10
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.responses import JSONResponse
+
+from api.item_api import item_to_dict
+from api.serializers import FastJSONResponse
+from benchmarks.seed import seed
+from crud.item import ItemRepository
+
+
+def legacy_item_to_dict(item):
+    # 바뀌기 전 api/item_api.py 의 item_to_dict (include_categories=True)
+    item_dict = {
+        "id": item.id,
+        "name": item.name,
+        "price": item.price,
+        "stock": item.stock,
+        "type": item.type,
+        "image_url": item.image_url,
+    }
+    if hasattr(item, 'author'):
+        item_dict["author"] = item.author
+    if hasattr(item, 'isbn'):
+        item_dict["isbn"] = item.isbn
+    if hasattr(item, 'artist'):
+        item_dict["artist"] = item.artist
+    if hasattr(item, 'etc'):
+        item_dict["etc"] = item.etc
+    if hasattr(item, 'director'):
+        item_dict["director"] = item.director
+    if hasattr(item, 'actor'):
+        item_dict["actor"] = item.actor
+    if hasattr(item, 'category_items'):
+        item_dict["categories"] = [
+            {"id": ci.category.id, "name": ci.category.name}
+            for ci in item.category_items if ci.category
+        ]
+    return item_dict
+
+
+def legacy(items) -> bytes:
+    return JSONResponse(jsonable_encoder([legacy_item_to_dict(item) for item in items])).body
+
+
+def fast(items) -> bytes:
+    return FastJSONResponse([item_to_dict(item, include_categories=True) for item in items]).body
+
+
+def measure(fn, items, repeat: int) -> dict:
+    fn(items)       # 워밍업
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(items)
+        runs.append((time.perf_counter() - started) * 1000)
+    return {"best_ms": round(min(runs), 1), "median_ms": round(statistics.median(runs), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "serialization.db")
+    url = f"sqlite:///{path}"
+    seed(url, members=1, items=args.items, orders_per_member=0)
+    engine = create_engine(url)
+    with sessionmaker(bind=engine)() as db:
+        items = ItemRepository().find_all(db)
+
+        # 두 경로의 결과가 같은지 먼저 확인
+        assert json.loads(legacy(items)) == json.loads(fast(items)), "직렬화 결과가 다릅니다"
+
+        results = {"items": len(items)}
+        results["legacy"] = measure(legacy, items, args.repeat)
+        results["fast"] = measure(fast, items, args.repeat)
+        results["speedup"] = round(results["legacy"]["median_ms"] / results["fast"]["median_ms"], 2)
+        results["bytes"] = len(fast(items))
+    engine.dispose()
+
+    print(f"{'path':<8} {'best(ms)':>10} {'median(ms)':>12}")
+    for name in ("legacy", "fast"):
+        print(f"{name:<8} {results[name]['best_ms']:>10} {results[name]['median_ms']:>12}")
+    print(f"items={results['items']} bytes={results['bytes']} speedup x{results['speedup']}")
+
+
+if __name__ == "__main__":
+    main()
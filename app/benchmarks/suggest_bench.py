@@ -0,0 +1,80 @@
+"""자동완성 벤치마크: 접두어 색인(core/suggest.py) 생성 시간 / 메모리와 조회 지연.
+
+search_bench 와 같은 합성 이름으로 색인만 메모리에서 만들고 (DB 없음), 실제 이름의 단어 앞부분
+(1~4글자, 한글은 가끔 초성만)으로 조회한다. 판매 수량은 절반 정도의 상품에만 무작위로.
+
+    cd app
+    python -m benchmarks.suggest_bench --items 200000
+    python -m benchmarks.suggest_bench --items 1000000
+"""
+import argparse
+import random
+import resource
+import time
+
+from benchmarks.search_bench import vocabulary, item_row, percentiles
+from core.suggest import PrefixIndex, SOLD, SUGGEST_TOP_K
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+
+
+def prefixes(rng, names, count):
+    result = []
+    for _ in range(count):
+        word = rng.choice(rng.choice(names).split())
+        prefix = word[:rng.randint(1, 4)]
+        if "가" <= prefix[-1] <= "힣" and rng.random() < 0.3:
+            prefix = prefix[:-1] + CHOSEONG[(ord(prefix[-1]) - 0xAC00) // 588]
+        result.append(prefix)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary(rng, korean=max(args.items // 5, 100), english=max(args.items // 10, 50))
+    rows = [(i, item_row(rng, words, i)["name"], rng.randint(1, 500) if rng.random() < 0.5 else 0)
+            for i in range(1, args.items + 1)]
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    index = PrefixIndex()
+    for row in rows:
+        index.add(*row)
+    index.finish()
+    build = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    names = [row[1] for row in rng.sample(rows, min(len(rows), 10000))]
+    del rows
+
+    runs = []
+    for prefix in prefixes(rng, names, args.queries):
+        started = time.perf_counter()
+        index.search(prefix, SUGGEST_TOP_K)
+        runs.append((time.perf_counter() - started) * 1000)
+    lookup = percentiles(runs)
+    lookup["p99_ms"] = round(sorted(runs)[int(len(runs) * 0.99) - 1], 3)
+
+    # 커밋된 변경 반영 (주문 -> 판매 수량, 새 상품)
+    started = time.perf_counter()
+    for i in range(args.updates):
+        if i % 4:
+            index.apply((SOLD, rng.randint(1, args.items)), rng.randint(1, 5))
+        else:
+            index.apply(args.items + i + 1, (" ".join(rng.sample(words, 2)),))
+    update_ms = (time.perf_counter() - started) * 1000 / args.updates
+
+    print(f"items={args.items} entries={len(index.entries)} cached_prefixes={len(index.top)} "
+          f"build={build:.1f}s rss+={(rss_after - rss_before) / 1024:.0f}MB")
+    print(f"lookup p50={lookup['p50_ms'] * 1000:.0f}us p95={lookup['p95_ms'] * 1000:.0f}us "
+          f"p99={lookup['p99_ms'] * 1000:.0f}us  update avg={update_ms * 1000:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 
 from crud.administrator import AdministratorRepository
+from db.session import unit_of_work
 from models.administrator import Administrator
 
 ar = AdministratorRepository()
@@ -12,11 +13,13 @@ class AdministratorService:
 
     def create_admin(self, name: str, email: str, password: str):
         new_admin = Administrator(name=name, email=email, password=password)
-        admin = ar.create(self.db, new_admin)
+        with unit_of_work(self.db):
+            admin = ar.create(self.db, new_admin)
         return admin
 
     def delete_admin(self, admin_id: int):
-        tmp = ar.delete(self.db, admin_id)
+        with unit_of_work(self.db):
+            tmp = ar.delete(self.db, admin_id)
         return tmp
 
     def find_all(self):
@@ -30,5 +33,6 @@ class AdministratorService:
         return ar.find_by_email(self.db, email)
 
     def update_admin(self, admin_id: int, payload: dict):
-        tmp = ar.update(self.db, admin_id, payload)
+        with unit_of_work(self.db):
+            tmp = ar.update(self.db, admin_id, payload)
         return tmp
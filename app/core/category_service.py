@@ -1,13 +1,20 @@
-from sphinx.util.cfamily import NoOldIdError
+import os
 
+from core.category_tree import category_tree_cache
+from core.search_index import category_search, CATEGORY_SEARCH_LIMIT
+from core.versions import versions, CATEGORIES
 from crud.category import CategoryRepository
 from crud.item import ItemRepository
+from db.session import unit_of_work
 from models.category import Category
 from models.category_item import CategoryItem
+from models.category_item_count import CategoryItemCount
 
 cr = CategoryRepository()
 ir = ItemRepository()
 
+CATEGORY_LINK_MAX_PAIRS = int(os.getenv("CATEGORY_LINK_MAX_PAIRS", "10000"))     # 일괄 연결/해제 요청 하나의 최대 쌍 수
+
 
 
 
@@ -19,7 +26,8 @@ class CategoryService:
 
     def createCategory(self,name:str, description:str):
         category = Category(name=name, description=description)
-        create = cr.create(self.db, category=category)
+        with unit_of_work(self.db):
+            create = cr.create(self.db, category=category)
         return create
 
 
@@ -33,9 +41,10 @@ class CategoryService:
         if category is None or child is None:
             return None
 
-        child.add_parent(category)
-        self.db.add(category)
-        self.db.commit()
+        with unit_of_work(self.db):
+            child.add_parent(category)
+            self.db.add(category)
+            versions.touch(self.db, CATEGORIES)
         return category
 
     def add_parent(self,ca_name:str, parent_name:str):
@@ -44,40 +53,120 @@ class CategoryService:
         if category is None or parent is None:
             return None
 
-        category.add_parent(parent)
-        self.db.add(category)
-        self.db.commit()
+        with unit_of_work(self.db):
+            category.add_parent(parent)
+            self.db.add(category)
+            versions.touch(self.db, CATEGORIES)
         return category
 
     def connect_category_item(self, item_id:int, ca_name:str):
-        item=ir.find_by_id(self.db,item_id)
-        category = cr.find_by_name(self.db,ca_name)
-        if item is None or category is None:
-            return False
-
-        category_item = CategoryItem.createCategoryItem(item=item, category=category)
-        self.db.add(category_item)
-        self.db.add(category)
-        self.db.commit()
-
-        return True
+        result, = self.connect_category_items([(item_id, ca_name)])
+        return result["status"] in ("linked", "exists")
+
+    def connect_category_items(self, pairs):
+        # [(item_id, ca_name), ...] -> 쌍마다 {"item_id", "ca_name", "status"}
+        # status: linked / exists / item_not_found / category_not_found
+        with unit_of_work(self.db):
+            results, keys, linked, types = self._resolve_links(pairs)
+            links = []
+            for result, key in zip(results, keys):
+                if key is None:
+                    continue
+                if key in linked:
+                    result["status"] = "exists"
+                else:
+                    result["status"] = "linked"
+                    linked.add(key)
+                    links.append({"item_id": key[0], "category_id": key[1]})
+            ir.bulk_link_categories(self.db, links, types)
+        return results
+
+    def disconnect_category_items(self, pairs):
+        # status: unlinked / not_linked / item_not_found / category_not_found
+        with unit_of_work(self.db):
+            results, keys, linked, types = self._resolve_links(pairs)
+            unlinks = []
+            for result, key in zip(results, keys):
+                if key is None:
+                    continue
+                if key in linked:
+                    result["status"] = "unlinked"
+                    linked.discard(key)
+                    unlinks.append(key)
+                else:
+                    result["status"] = "not_linked"
+            ir.bulk_unlink_categories(self.db, unlinks, types)
+        return results
+
+    def _resolve_links(self, pairs):
+        # 카테고리 이름 / 상품 id / 기존 연결을 쌍 수와 상관없이 쿼리 몇번으로 확인
+        # 상품 잠금이 트랜잭션의 첫 문장이어야 한다. 그 전에 평범한 SELECT 를 하면 mysql(REPEATABLE READ)에서
+        # 그 시점 스냅샷으로 기존 연결을 읽어서, 같은 쌍을 동시에 연결할 때 둘 다 linked 로 세게 된다
+        types = ir.find_types_for_update(self.db, {item_id for item_id, _ in pairs})
+        category_ids = cr.find_ids_by_names(self.db, {ca_name for _, ca_name in pairs})
+        linked = {
+            (item_id, category_id)
+            for item_id, category_ids_ in CategoryItemCount.links_of(self.db, types).items()
+            for category_id in category_ids_
+        }
+        results, keys = [], []
+        for item_id, ca_name in pairs:
+            result = {"item_id": item_id, "ca_name": ca_name, "status": None}
+            key = None
+            if item_id not in types:
+                result["status"] = "item_not_found"
+            elif ca_name not in category_ids:
+                result["status"] = "category_not_found"
+            else:
+                key = (item_id, category_ids[ca_name])
+            results.append(result)
+            keys.append(key)
+        return results, keys, linked, types
 
     def remove_category(self, ca_name:str):
-        delete = cr.delete(self.db, ca_name)
+        with unit_of_work(self.db):
+            delete = cr.delete(self.db, ca_name)
         return delete
 
     def update_category(self, ca_name:str, name:str, des:str):
-        category= cr.update(self.db, ca_name=ca_name,name=name, des=des)
+        with unit_of_work(self.db):
+            category= cr.update(self.db, ca_name=ca_name,name=name, des=des)
         return category
 
     def get_all_categories(self):
         return cr.find_all_root(self.db)
 
+    def get_category_tree(self):
+        return category_tree_cache.get(self.db)
+
     def get_all_categories_flat(self):
         return cr.find_all(self.db)
 
+    def get_category_facets(self):
+        facets = {}
+        for category_id, name, parent_id, item_type, count in cr.find_facets(self.db):
+            facet = facets.get(category_id)
+            if facet is None:
+                facet = facets[category_id] = {"id": category_id, "name": name, "parent_id": parent_id,
+                                               "total": 0, "types": {}}
+            if item_type is not None:
+                facet["types"][item_type] = count
+                facet["total"] += count
+        return list(facets.values())
+
+    def rebuild_category_facets(self):
+        with unit_of_work(self.db):
+            count = cr.rebuild_facets(self.db)
+        return count
+
     def search_categories(self, keyword: str):
-        return cr.search_by_name(self.db, keyword)
+        # 이름 n-gram 색인으로 점수순 (색인이 아직 없으면 LIKE)
+        found = category_search.search(keyword, CATEGORY_SEARCH_LIMIT)
+        if found is None:
+            return cr.search_by_name(self.db, keyword)
+        ids, _ = found
+        by_id = cr.find_by_ids(self.db, ids)
+        return [by_id[category_id] for category_id in ids if category_id in by_id]
 
     def get_categories_by_item(self, item_id: int):
         from models.category_item import CategoryItem
@@ -85,19 +174,8 @@ class CategoryService:
         return [ci.category for ci in category_items]
 
     def disconnect_category_item(self, item_id: int, ca_name: str):
-        from models.category_item import CategoryItem
-        category = cr.find_by_name(self.db, ca_name)
-        if category is None:
-            return False
-        category_item = self.db.query(CategoryItem).filter(
-            CategoryItem.item_id == item_id,
-            CategoryItem.category_id == category.id
-        ).first()
-        if category_item is None:
-            return False
-        self.db.delete(category_item)
-        self.db.commit()
-        return True
+        result, = self.disconnect_category_items([(item_id, ca_name)])
+        return result["status"] == "unlinked"
 
 
         
@@ -0,0 +1,98 @@
+import json
+import threading
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from core.versions import versions, CATEGORIES
+from models.category import Category
+
+
+@dataclass(frozen=True)
+class CategoryTreeSnapshot:
+    """카테고리 전체 트리의 불변 스냅샷. json 은 /category/show/all 응답 그대로."""
+    version: int
+    roots: tuple
+    json: bytes
+
+
+def build_snapshot(db: Session, version: int) -> CategoryTreeSnapshot:
+    rows = db.execute(
+        select(Category.id, Category.name, Category.description, Category.parent_id).order_by(Category.id)
+    ).all()
+
+    nodes = {}
+    for row in rows:
+        nodes[row.id] = {
+            "id": row.id,
+            "name": row.name,
+            "description": row.description,
+            "parent_id": row.parent_id,
+        }
+
+    roots = []
+    for row in rows:
+        node = nodes[row.id]
+        parent = nodes.get(row.parent_id)
+        if parent is None:
+            roots.append(node)
+        else:
+            parent.setdefault("children", []).append(node)
+
+    body = json.dumps(roots, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return CategoryTreeSnapshot(version=version, roots=tuple(roots), json=body)
+
+
+class CategoryTreeCache:
+    """프로세스 내 카테고리 트리 캐시.
+
+    버전은 categories 테이블 버전(core/versions.py)이다. DB 의 공유 카운터라 어느 워커에서 카테고리 쓰기가
+    커밋돼도 올라가고, 이 워커는 VERSION_CACHE_SECONDS 안에 그걸 본다.
+    읽을 때 버전이 다르면 한번의 SELECT 로 스냅샷을 다시 만들어 통째로 교체한다.
+    (스냅샷은 uvicorn 워커마다 따로 가진다)
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return versions.table(CATEGORIES)
+
+    def bump(self):
+        versions.bump(CATEGORIES)
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+    def current(self):
+        # 최신 스냅샷이면 반환, 다시 만들어야 하면 None
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.version:
+            return snapshot
+        return None
+
+    def store(self, snapshot: CategoryTreeSnapshot):
+        with self._lock:
+            if self._snapshot is None or snapshot.version >= self._snapshot.version:
+                self._snapshot = snapshot
+
+    def get(self, db: Session) -> CategoryTreeSnapshot:
+        snapshot = self.current()
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            version = self.version
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+            snapshot = build_snapshot(db, version)
+            self._snapshot = snapshot
+            return snapshot
+
+
+category_tree_cache = CategoryTreeCache()
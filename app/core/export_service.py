@@ -0,0 +1,173 @@
+"""상품 / 주문 전체 내보내기 (NDJSON, CSV, 선택적으로 gzip).
+
+server-side cursor(stream_results + yield_per)로 읽고 64KB 단위로 바로 내보내서
+행 수와 상관없이 메모리는 일정하다. 전용 세션을 generator 안에서 열고 닫으므로
+StreamingResponse 가 끝날 때까지 요청 스코프 세션에 기대지 않는다.
+
+    cd app
+    python -m core.export_service items --format csv --gzip -o items.csv.gz
+    python -m core.export_service orders -o orders.ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import zlib
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from db.routing import ReadSessionLocal
+from models.item.item import Item
+from models.item.album import Album  # noqa: F401  items 테이블의 타입별 컬럼
+from models.item.book import Book  # noqa: F401
+from models.item.movie import Movie  # noqa: F401
+from models.order import Order
+from models.order_item import OrderItem
+
+load_dotenv()
+
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))     # 커서에서 한번에 가져오는 행 수
+CHUNK_BYTES = 64 * 1024
+
+ITEM_COLUMNS = ("id", "type", "name", "price", "stock", "image_url",
+                "author", "isbn", "artist", "etc", "director", "actor")
+# NDJSON 에서는 타입에 맞는 필드만
+TYPE_FIELDS = {
+    "BOOK": ("author", "isbn"),
+    "ALBUM": ("artist", "etc"),
+    "MOVIE": ("director", "actor"),
+}
+ORDER_CSV_COLUMNS = ("order_id", "member_id", "order_date", "status", "total_price", "item_id", "item_name", "count")
+
+
+def _stream(db, stmt):
+    return db.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_YIELD_PER))
+
+
+def item_rows(db):
+    items = Item.__table__
+    stmt = select(*(items.c[name] for name in ITEM_COLUMNS)).order_by(items.c.id)
+    for row in _stream(db, stmt):
+        yield row._asdict()
+
+
+def item_documents(db):
+    base = ITEM_COLUMNS[:6]
+    for row in item_rows(db):
+        doc = {name: row[name] for name in base}
+        doc.update((name, row[name]) for name in TYPE_FIELDS.get(row["type"], ()))
+        yield doc
+
+
+def order_line_rows(db, date_from=None, date_to=None):
+    # 주문 + 주문상품 + 상품명을 join 한 평평한 행 (주문 id, 주문상품 id 순)
+    items = Item.__table__
+    stmt = (
+        select(Order.id.label("order_id"), Order.member_id, Order.order_date, Order.status, Order.total_price,
+               OrderItem.item_id, items.c.name.label("item_name"), OrderItem.count)
+        .select_from(Order)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(items, items.c.id == OrderItem.item_id)
+        .order_by(Order.id, OrderItem.id)
+    )
+    if date_from is not None:
+        stmt = stmt.where(Order.order_date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(Order.order_date < date_to)
+    for row in _stream(db, stmt):
+        row = row._asdict()
+        row["order_date"] = row["order_date"].isoformat() if row["order_date"] else None
+        row["status"] = row["status"].name if row["status"] else None
+        yield row
+
+
+def order_documents(db, date_from=None, date_to=None):
+    # 같은 주문의 연속된 행을 order_items 리스트 하나로 묶는다 (한번에 주문 하나만 메모리에)
+    current = None
+    for row in order_line_rows(db, date_from, date_to):
+        if current is None or current["id"] != row["order_id"]:
+            if current is not None:
+                yield current
+            current = {
+                "id": row["order_id"], "member_id": row["member_id"], "order_date": row["order_date"],
+                "status": row["status"], "total_price": row["total_price"], "order_items": [],
+            }
+        if row["item_id"] is not None:
+            current["order_items"].append({"item_id": row["item_id"], "item_name": row["item_name"], "count": row["count"]})
+    if current is not None:
+        yield current
+
+
+def ndjson_lines(docs):
+    for doc in docs:
+        yield json.dumps(doc, ensure_ascii=False) + "\n"
+
+
+def csv_lines(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([row[name] for name in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def chunked(lines, gzip: bool = False):
+    # 줄들을 CHUNK_BYTES 단위로 묶어서(필요하면 gzip 압축해서) bytes 로
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= CHUNK_BYTES:
+            chunk = b"".join(buffer)
+            buffer, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    tail = b"".join(buffer)
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
+
+
+def export_items(format: str = "ndjson", gzip: bool = False):
+    db = ReadSessionLocal()
+    try:
+        lines = csv_lines(item_rows(db), ITEM_COLUMNS) if format == "csv" else ndjson_lines(item_documents(db))
+        yield from chunked(lines, gzip)
+    finally:
+        db.close()
+
+
+def export_orders(format: str = "ndjson", gzip: bool = False, date_from=None, date_to=None):
+    db = ReadSessionLocal()
+    try:
+        if format == "csv":     # CSV 는 주문상품 한 줄에 한 행
+            lines = csv_lines(order_line_rows(db, date_from, date_to), ORDER_CSV_COLUMNS)
+        else:
+            lines = ndjson_lines(order_documents(db, date_from, date_to))
+        yield from chunked(lines, gzip)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("target", choices=("items", "orders"))
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args()
+
+    export = export_items if args.target == "items" else export_orders
+    with open(args.output, "wb") as f:
+        for chunk in export(args.format, args.gzip):
+            f.write(chunk)
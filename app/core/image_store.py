@@ -0,0 +1,68 @@
+import hashlib
+import os
+import uuid
+
+from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+
+load_dotenv()
+
+UPLOAD_DIR = "static/images/items"
+UPLOAD_URL = "/static/images/items"
+CHUNK_BYTES = 256 * 1024
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+
+
+class ImageTooLarge(Exception):
+    pass
+
+
+class ImageStore:
+    """업로드 이미지를 내용 해시(sha256) 이름으로 저장
+
+    청크 단위로 읽으면서 해시를 계산하고 임시 파일에 쓴다(파일 쓰기는 스레드풀).
+    같은 내용이 이미 있으면 임시 파일을 지우고 기존 URL 을 그대로 돌려준다.
+    """
+
+    def __init__(self, directory: str = UPLOAD_DIR, url_prefix: str = UPLOAD_URL, max_bytes: int = IMAGE_MAX_BYTES):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    async def save(self, upload) -> tuple[str, bool]:
+        # (url, 새로 저장했는지)
+        if upload.size is not None and upload.size > self.max_bytes:     # 크기를 이미 알면 읽기 전에 거절
+            raise ImageTooLarge()
+        ext = os.path.splitext(upload.filename or "")[1].lower()
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = os.path.join(self.directory, f".upload-{uuid.uuid4().hex}")
+        f = await run_in_threadpool(open, tmp_path, "wb")
+        try:
+            while chunk := await upload.read(CHUNK_BYTES):
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise ImageTooLarge()
+                digest.update(chunk)
+                await run_in_threadpool(f.write, chunk)
+        except BaseException:
+            await run_in_threadpool(f.close)
+            await run_in_threadpool(os.remove, tmp_path)
+            raise
+        await run_in_threadpool(f.close)
+
+        filename = f"{digest.hexdigest()}{ext}"
+        created = await run_in_threadpool(self._commit, tmp_path, os.path.join(self.directory, filename))
+        return f"{self.url_prefix}/{filename}", created
+
+    @staticmethod
+    def _commit(tmp_path: str, path: str) -> bool:
+        if os.path.exists(path):
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        return True
+
+
+image_store = ImageStore()
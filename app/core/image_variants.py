@@ -0,0 +1,283 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+from PIL import Image, ImageOps
+from starlette.responses import FileResponse
+
+from core.image_store import UPLOAD_DIR, UPLOAD_URL
+
+load_dotenv()
+
+
+def _widths(value: str) -> tuple:
+    return tuple(sorted({int(w) for w in value.split(",") if w.strip()}))
+
+
+def _presets(value: str) -> tuple:
+    # "200:webp,400:webp" -> ((200, "webp"), (400, "webp"))
+    result = []
+    for preset in value.split(","):
+        if preset.strip():
+            width, _, fmt = preset.strip().partition(":")
+            result.append((int(width), fmt or "webp"))
+    return tuple(result)
+
+
+VARIANT_DIR = os.getenv("IMAGE_VARIANT_DIR", "cache/images")
+VARIANT_CACHE_BYTES = int(os.getenv("IMAGE_VARIANT_CACHE_BYTES", str(512 * 1024 * 1024)))
+VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+# 아무 폭이나 받으면 캐시가 폭별로 끝없이 늘어나니까 정해진 폭만
+VARIANT_WIDTHS = _widths(os.getenv("IMAGE_VARIANT_WIDTHS", "100,200,400,800"))
+# image_url 이 저장될 때 미리 만들어 두는 변형 (비우면 안 만든다)
+VARIANT_PREGENERATE = _presets(os.getenv("IMAGE_VARIANT_PREGENERATE", "200:webp,400:webp"))
+
+# fmt 파라미터 -> (Pillow 포맷, media type)
+VARIANT_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+VARIANT_QUALITY = 80
+VARIANT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class VariantSourceNotFound(Exception):
+    pass
+
+
+class VariantError(Exception):
+    """원본을 이미지로 읽을 수 없을 때"""
+
+
+def render_variant(source: str, target: str, width: int, fmt: str) -> int:
+    # 워커 프로세스에서 실행. 임시 파일에 쓰고 rename -> 반쯤 쓴 파일이 서빙되지 않는다
+    pil_format, _ = VARIANT_FORMATS[fmt]
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:     # 원본보다 크게 늘리지는 않는다
+            image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        tmp = f"{target}.{uuid.uuid4().hex}.tmp"
+        try:
+            image.save(tmp, pil_format, quality=VARIANT_QUALITY, optimize=True)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    return os.path.getsize(target)
+
+
+class ImageVariants:
+    """상품 이미지의 리사이즈/재인코딩 변형을 만들고 디스크에 LRU 로 캐시
+
+    변환은 CPU 를 쓰는 작업이라 프로세스풀에서 돌린다 (이벤트 루프, GIL 과 무관).
+    같은 변형을 동시에 요청하면 한번만 만든다. 원본 파일명이 내용 해시라
+    변형도 바뀌지 않으므로 ETag 는 변형 이름 그대로 쓴다.
+    캐시가 max_bytes 를 넘으면 가장 오래 안 쓴 변형부터 지운다. 응답으로 나가는 중인 변형(get() 으로 잡은 것)은
+    release() 할 때까지 지우지 않는다. 캐시 hit 때 파일 수정 시각을 갱신해서 재시작 후에도 LRU 순서가 남는다.
+    """
+
+    def __init__(self, source_dir: str = UPLOAD_DIR, cache_dir: str = VARIANT_DIR,
+                 max_bytes: int = VARIANT_CACHE_BYTES, workers: int = VARIANT_WORKERS):
+        self.source_dir = source_dir
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()       # 변형 파일명 -> 크기 (앞쪽이 오래 안 쓴 것)
+        self._bytes = 0
+        self._inflight = {}                 # 변형 파일명 -> concurrent.futures.Future
+        self._pinned = Counter()            # 변형 파일명 -> 서빙 중인 요청 수 (0 보다 크면 지우지 않는다)
+        self._hits = 0
+        self._misses = 0
+        self._generated = 0
+        self._evicted = 0
+        self._failed = 0
+        self._load_index()
+
+    def _load_index(self):
+        # 재시작해도 캐시는 남아있다. 순서는 수정 시각(hit 때마다 갱신)으로 대신한다
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self._bytes += size
+
+    def _pool(self):
+        # 처음 쓸 때 띄운다 (import 만 하는 마이그레이션/테스트에서 프로세스를 만들지 않게)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    @staticmethod
+    def variant_name(name: str, width: int, fmt: str) -> str:
+        return f"{os.path.splitext(name)[0]}-w{width}.{fmt}"
+
+    @staticmethod
+    def etag(variant: str) -> str:
+        return f'"{variant}"'
+
+    def source_path(self, name: str) -> str:
+        # 경로 조작 방지: 업로드 디렉터리 바로 아래 파일만
+        if not name or os.path.basename(name) != name or name.startswith("."):
+            raise VariantSourceNotFound()
+        path = os.path.join(self.source_dir, name)
+        if not os.path.isfile(path):
+            raise VariantSourceNotFound()
+        return path
+
+    def _submit(self, name: str, width: int, fmt: str, pin: bool = False):
+        # 캐시에 있으면 None, 없으면 (진행 중이면 그걸, 아니면 새로 제출한) Future
+        # pin 이면 돌려주기 전에 잡아 둔다 (release 전까지 지워지지 않게)
+        variant = self.variant_name(name, width, fmt)
+        path = os.path.join(self.cache_dir, variant)
+        with self._lock:
+            if variant in self._entries and not os.path.exists(path):
+                self._bytes -= self._entries.pop(variant)       # 밖에서 지워진 파일
+            if variant in self._entries:
+                self._entries.move_to_end(variant)
+                self._hits += 1
+                self._pin(variant, pin)
+                hit = True
+            else:
+                hit = False
+                future = self._inflight.get(variant)
+                if future is not None:
+                    self._hits += 1
+                    self._pin(variant, pin)
+                    return variant, future
+                self._misses += 1
+        if hit:
+            try:
+                os.utime(path)      # 재시작 후 _load_index 가 쓰는 LRU 순서
+            except FileNotFoundError:
+                pass
+            return variant, None
+        source = self.source_path(name)
+        future = self._pool().submit(render_variant, source, path, width, fmt)
+        with self._lock:
+            # 락을 놓은 사이에 다른 요청이 먼저 제출했으면 그쪽을 쓴다
+            self._pin(variant, pin)
+            if variant in self._inflight:
+                future.cancel()
+                return variant, self._inflight[variant]
+            self._inflight[variant] = future
+        future.add_done_callback(lambda f: self._done(variant, f))
+        return variant, future
+
+    def _pin(self, variant: str, pin: bool):
+        if pin:
+            self._pinned[variant] += 1
+
+    def release(self, variant: str):
+        # get() 으로 잡은 변형을 놓는다 (응답을 다 보냈거나 실패했을 때)
+        with self._lock:
+            self._pinned[variant] -= 1
+            if self._pinned[variant] <= 0:
+                del self._pinned[variant]
+
+    def _done(self, variant: str, future):
+        with self._lock:
+            self._inflight.pop(variant, None)
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+                return
+            size = future.result()
+            self._bytes -= self._entries.pop(variant, 0)
+            self._entries[variant] = size
+            self._bytes += size
+            self._generated += 1
+            evict = []
+            # 오래 안 쓴 것부터. 서빙 중인 변형과 방금 만든 변형은 건너뛴다
+            for old in list(self._entries):
+                if self._bytes <= self.max_bytes:
+                    break
+                if old == variant or self._pinned[old]:
+                    continue
+                self._bytes -= self._entries.pop(old)
+                self._evicted += 1
+                evict.append(old)
+        for old in evict:
+            try:
+                os.remove(os.path.join(self.cache_dir, old))
+            except FileNotFoundError:
+                pass
+
+    async def get(self, name: str, width: int, fmt: str) -> str:
+        # 변형 파일 경로. 없으면 프로세스풀에서 만들고 기다린다
+        # 돌려준 변형은 잡혀 있으니 다 쓰면 release(variant) 해야 한다 (response() 가 대신 한다)
+        variant, future = self._submit(name, width, fmt, pin=True)
+        if future is not None:
+            try:
+                await asyncio.wrap_future(future)
+            except (OSError, Image.DecompressionBombError) as e:    # PIL.UnidentifiedImageError 포함
+                self.release(variant)
+                raise VariantError() from e
+            except BaseException:
+                self.release(variant)
+                raise
+        return os.path.join(self.cache_dir, variant)
+
+    def response(self, path: str, media_type: str, headers: dict):
+        # get() 으로 받은 파일을 보내고 (실패해도) 놓는 응답
+        return _PinnedFileResponse(path, media_type=media_type, headers=headers,
+                                   release=lambda: self.release(os.path.basename(path)))
+
+    def pregenerate(self, image_url: str):
+        # 업로드 이미지 URL 이면 자주 쓰는 변형을 백그라운드로 만들어 둔다 (기다리지 않음)
+        if not image_url or not image_url.startswith(UPLOAD_URL + "/"):
+            return
+        name = image_url[len(UPLOAD_URL) + 1:]
+        for width, fmt in VARIANT_PREGENERATE:
+            try:
+                self._submit(name, width, fmt)
+            except VariantSourceNotFound:
+                return
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "in_flight": len(self._inflight),
+                "pinned": len(self._pinned),
+                "hits": self._hits,
+                "misses": self._misses,
+                "generated": self._generated,
+                "evicted": self._evicted,
+                "failed": self._failed,
+                "workers": self.workers,
+            }
+
+
+class _PinnedFileResponse(FileResponse):
+    def __init__(self, *args, release, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+image_variants = ImageVariants()
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from dotenv import load_dotenv
+
+from core.versions import versions, ITEMS, CATEGORIES
+from db.routing import replica_lag_seconds
+
+load_dotenv()
+
+ITEM_CACHE_SIZE = int(os.getenv("ITEM_CACHE_SIZE", "10000"))
+ITEM_CACHE_TTL_SECONDS = float(os.getenv("ITEM_CACHE_TTL_SECONDS", "60"))
+
+
+class ItemCache:
+    """상품 상세 응답(dict)을 id 로 캐시하는 LRU + TTL 캐시
+
+    항목마다 읽기 시작할 때의 상품 행 버전 / categories 테이블 버전(core/versions.py)을 같이 저장하고,
+    꺼낼 때 버전이 다르면 버린다. 그래서 수정/삭제/카테고리 연결/재고 변경이 커밋되는 순간 무효화된다.
+    (다른 워커의 커밋은 VERSION_CACHE_SECONDS 안에) TTL 은 DB 를 직접 고친 경우의 상한.
+    같은 id 가 동시에 miss 나면 한 요청만 DB 에서 읽고 나머지는 그 결과를 기다린다 (single-flight).
+    """
+
+    def __init__(self, max_entries: int = ITEM_CACHE_SIZE, ttl: float = ITEM_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()       # id -> (응답 dict, 버전, 만료 시각)
+        self._inflight = {}                 # id -> Future (sync / async 요청이 같이 기다린다)
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+        self._expired = 0
+        self._invalidated = 0
+        self._loads = 0
+
+    @staticmethod
+    def _version(item_id: int) -> tuple:
+        return versions.row(ITEMS, item_id), versions.table(CATEGORIES)
+
+    def get(self, item_id: int):
+        # 버전 조회는 DB 를 다시 읽을 수도 있어서 락 밖에서 한다
+        current = self._version(item_id)
+        with self._lock:
+            entry = self._entries.get(item_id)
+            if entry is None:
+                return None
+            view, version, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[item_id]
+                self._expired += 1
+                return None
+            if version != current:
+                # 락 밖에서 버전을 잡은 뒤에 더 새 버전으로 저장된 항목이면 지우지 않고 miss 로만 친다
+                if any(old < new for old, new in zip(version, current)):
+                    del self._entries[item_id]
+                    self._invalidated += 1
+                return None
+            self._entries.move_to_end(item_id)
+            self._hits += 1
+            return view
+
+    def _store(self, item_id: int, view, version: tuple):
+        # replica 가 아직 못 따라왔을 수 있는 최근 변경이면 캐시하지 않는다
+        if view is None or versions.changed_within(replica_lag_seconds(), (CATEGORIES,), ((ITEMS, item_id),)):
+            return
+        with self._lock:
+            self._entries[item_id] = (view, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(item_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _join(self, item_id: int):
+        # (Future, 내가 읽어야 하는지). 버전은 읽기 전에 잡는다 -> 읽는 도중 커밋된 쓰기가 있으면 다음 조회에서 버려진다
+        version = self._version(item_id)
+        with self._lock:
+            self._misses += 1
+            future = self._inflight.get(item_id)
+            # 진행 중인 읽기가 그 뒤의 쓰기보다 먼저 시작했으면 기다리지 않고 새로 읽는다
+            if future is not None and future.version == version:
+                self._coalesced += 1
+                return future, False
+            future = self._inflight[item_id] = Future()
+            future.version = version
+            self._loads += 1
+            return future, True
+
+    def _finish(self, item_id: int, future: Future, view=None, error=None):
+        if error is None:
+            self._store(item_id, view, future.version)
+        with self._lock:
+            if self._inflight.get(item_id) is future:
+                del self._inflight[item_id]
+        if error is None:
+            future.set_result(view)
+        else:
+            future.set_exception(error)
+
+    def get_or_load(self, item_id: int, load):
+        # load() -> 응답 dict 또는 None(없는 상품, 캐시하지 않음)
+        view = self.get(item_id)
+        if view is not None:
+            return view
+        future, leader = self._join(item_id)
+        if not leader:
+            return future.result()
+        try:
+            view = load()
+        except BaseException as e:      # 취소돼도 기다리는 요청이 멈춰 있지 않게
+            self._finish(item_id, future, error=e)
+            raise
+        self._finish(item_id, future, view)
+        return view
+
+    async def aget_or_load(self, item_id: int, load):
+        # load 가 coroutine 함수인 버전 (DB_ASYNC 라우터). 버전 카운터는 스레드풀에서 미리 읽어 둔다
+        await versions.refresh()
+        view = self.get(item_id)
+        if view is not None:
+            return view
+        future, leader = self._join(item_id)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            view = await load()
+        except BaseException as e:      # 취소돼도 기다리는 요청이 멈춰 있지 않게
+            self._finish(item_id, future, error=e)
+            raise
+        self._finish(item_id, future, view)
+        return view
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "loads": self._loads,
+                "coalesced": self._coalesced,
+                "evictions": self._evictions,
+                "expired": self._expired,
+                "invalidated": self._invalidated,
+                "in_flight": len(self._inflight),
+            }
+
+
+item_cache = ItemCache()
@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+import os
+import time
+
+from dotenv import load_dotenv
+from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from crud.category import CategoryRepository
+from crud.item import ItemRepository
+from db.session import unit_of_work
+from models.item.album import Album
+from models.item.book import Book
+from models.item.movie import Movie
+from schemas.dto import BookBaseModel, AlbumBaseModel, MovieBaseModel
+
+load_dotenv()
+
+IMPORT_BATCH_SIZE = int(os.getenv("ITEM_IMPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("ITEM_IMPORT_MAX_ERRORS", "100"))     # 응답에 담을 행 에러 최대 개수
+
+# type 컬럼 값 -> (검증 모델, ORM 클래스)
+ITEM_TYPES = {
+    "BOOK": (BookBaseModel, Book),
+    "ALBUM": (AlbumBaseModel, Album),
+    "MOVIE": (MovieBaseModel, Movie),
+}
+TYPE_COLUMNS = ("author", "isbn", "artist", "etc", "director", "actor")
+CATEGORY_SEPARATOR = "|"
+
+ir = ItemRepository()
+cr = CategoryRepository()
+
+
+def iter_csv_rows(binary_file):
+    # 한 줄씩 읽어서 (줄 번호, dict) 로. 빈 칸은 None
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {k.strip(): (v if v != "" else None) for k, v in row.items() if k}
+    finally:
+        text.detach()       # 업로드 파일은 닫지 않는다
+
+
+def iter_ndjson_rows(binary_file):
+    for line_no, line in enumerate(binary_file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, ValueError(f"JSON 파싱 실패: {e}")
+            continue
+        yield line_no, row if isinstance(row, dict) else ValueError("한 줄에 객체 하나여야 합니다.")
+
+
+def _category_names(value) -> list:
+    if value is None:
+        return []
+    names = value if isinstance(value, list) else str(value).split(CATEGORY_SEPARATOR)
+    return [name.strip() for name in names if name and name.strip()]
+
+
+class ItemImportService:
+    """CSV / NDJSON 상품 목록을 batch 단위 bulk insert 로 넣는다
+
+    행은 스트리밍으로 읽고 batch 크기만큼만 메모리에 들고 있는다. batch 하나가 트랜잭션 하나.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.category_ids = {}      # 이름 -> id (import 하는 동안만)
+        self.report = {"inserted": 0, "failed": 0, "linked": 0, "batches": 0, "errors": [], "errors_truncated": False}
+
+    def import_rows(self, rows, batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+        started = time.perf_counter()
+        returning = ir.supports_bulk_returning(self.db)
+        batch = []
+        for line_no, raw in rows:
+            parsed = self._validate(line_no, raw)
+            if parsed is not None:
+                batch.append(parsed)
+            if len(batch) >= batch_size:
+                self._flush(batch, returning)
+                batch = []
+        if batch:
+            self._flush(batch, returning)
+
+        seconds = time.perf_counter() - started
+        self.report["seconds"] = round(seconds, 3)
+        self.report["rows_per_sec"] = round(self.report["inserted"] / seconds, 1) if seconds else None
+        return self.report
+
+    def _error(self, line_no: int, messages: list):
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < IMPORT_MAX_ERRORS:
+            self.report["errors"].append({"row": line_no, "errors": messages})
+        else:
+            self.report["errors_truncated"] = True
+
+    def _validate(self, line_no: int, raw):
+        # (줄 번호, items 행 dict, 카테고리 이름들) 또는 에러 기록 후 None
+        if isinstance(raw, Exception):
+            self._error(line_no, [str(raw)])
+            return None
+        item_type = str(raw.get("type") or "").upper()
+        if item_type not in ITEM_TYPES:
+            self._error(line_no, ["type: book / album / movie 중 하나여야 합니다."])
+            return None
+        model, _ = ITEM_TYPES[item_type]
+        try:
+            data = model.model_validate(raw).model_dump(exclude={"id"})
+        except ValidationError as e:
+            self._error(line_no, [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()])
+            return None
+        row = {column: None for column in TYPE_COLUMNS}
+        row.update(data, type=item_type)
+        return line_no, row, _category_names(raw.get("categories"))
+
+    def _resolve_categories(self, batch):
+        missing = {name for _, _, names in batch for name in names if name not in self.category_ids}
+        if missing:
+            found = cr.find_ids_by_names(self.db, missing)
+            self.category_ids.update(found)
+        valid = []
+        for line_no, row, names in batch:
+            unknown = [name for name in names if name not in self.category_ids]
+            if unknown:
+                self._error(line_no, [f"categories: 없는 카테고리 {', '.join(unknown)}"])
+            else:
+                valid.append((line_no, row, names))
+        return valid
+
+    def _insert(self, batch, returning: bool):
+        links = []
+        if returning:
+            # INSERT ... RETURNING id 한번으로 새 id 를 받아서 카테고리 연결
+            ids = ir.bulk_insert(self.db, [row for _, row, _ in batch], returning=True)
+            for item_id, (_, _, names) in zip(ids, batch):
+                links.extend({"item_id": item_id, "category_id": self.category_ids[n]} for n in names)
+        else:
+            # RETURNING 이 없는 DB(mysql): 카테고리가 없는 행은 그냥 executemany,
+            # 있는 행도 executemany 로 넣고 id 는 SELECT 한번으로 다시 찾는다
+            plain = [row for _, row, names in batch if not names]
+            if plain:
+                ir.bulk_insert(self.db, plain)
+            linked = [(row, names) for _, row, names in batch if names]
+            if linked:
+                ids = ir.bulk_insert_with_ids(self.db, [row for row, _ in linked])
+                for item_id, (_, names) in zip(ids, linked):
+                    links.extend({"item_id": item_id, "category_id": self.category_ids[n]} for n in names)
+        ir.bulk_link_categories(self.db, links)
+        return len(links)
+
+    def _flush(self, batch, returning: bool):
+        self.report["batches"] += 1
+        batch = self._resolve_categories(batch)
+        if not batch:
+            return
+        try:
+            with unit_of_work(self.db):
+                self.report["linked"] += self._insert(batch, returning)
+            self.report["inserted"] += len(batch)
+            return
+        except DBAPIError:
+            pass
+        finally:
+            self.db.expunge_all()       # 카테고리 조회 등으로 읽은 객체가 파일 크기만큼 세션에 쌓이지 않게
+        # batch 안에 DB 가 거부하는 행(길이 초과 등)이 있으면 한 행씩 다시 넣어서 그 행만 에러로
+        for entry in batch:
+            try:
+                with unit_of_work(self.db):
+                    self.report["linked"] += self._insert([entry], returning)
+                self.report["inserted"] += 1
+            except DBAPIError as e:
+                self._error(entry[0], [str(e.orig)[:200]])
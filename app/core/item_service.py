@@ -1,6 +1,14 @@
+from datetime import datetime
+
 from sqlalchemy.orm import Session
 
+from core.image_variants import image_variants
+from core.search_index import item_search
+from core.stock_holds import STOCK_HOLD_SWEEP_BATCH, release_holds, hr
+from core.suggest import item_suggest, category_suggest
+from crud.category import CategoryRepository
 from crud.item import ItemRepository
+from db.session import unit_of_work
 from models.item.album import Album
 from models.item.book import Book
 from schemas.dto import ItemBaseModel, BookBaseModel, AlbumBaseModel, MovieBaseModel
@@ -8,6 +16,7 @@ from models.item.movie import Movie
 
 
 ir = ItemRepository()
+cr = CategoryRepository()
 
 class ItemService:
     def __init__(self,db:Session):
@@ -15,17 +24,23 @@ class ItemService:
 
     def create_book(self,book:BookBaseModel):
         new_book = Book(**book.model_dump(exclude={'id'}))
-        temp = ir.create(self.db, new_book)
+        with unit_of_work(self.db):
+            temp = ir.create(self.db, new_book)
+        image_variants.pregenerate(temp.image_url)
         return temp
 
     def create_album(self, album:AlbumBaseModel):
         album = Album(**album.model_dump(exclude={'id'}))
-        temp = ir.create(self.db,album)
+        with unit_of_work(self.db):
+            temp = ir.create(self.db,album)
+        image_variants.pregenerate(temp.image_url)
         return temp
 
     def create_movie(self, movie:MovieBaseModel):
         movie = Movie(**movie.model_dump(exclude={'id'}))
-        temp = ir.create(self.db,movie)
+        with unit_of_work(self.db):
+            temp = ir.create(self.db,movie)
+        image_variants.pregenerate(temp.image_url)
         return temp
 
     def read_item_by_id(self, id:int):
@@ -35,12 +50,48 @@ class ItemService:
     def read_all(self):
         return ir.find_all(self.db)
 
+    def read_page(self, limit:int, sort:str="id", after:tuple=None, item_type:str=None,
+                  min_price:int=None, max_price:int=None, category_id:int=None):
+        items = ir.find_page(self.db, limit, sort=sort, after=after, item_type=item_type,
+                             min_price=min_price, max_price=max_price, category_id=category_id)
+        categories = ir.find_categories_by_item_ids(self.db, [item.id for item in items])
+        return items, categories
+
+    def search(self, keyword:str, limit:int):
+        # n-gram 색인(core/search_index.py)으로 id 를 점수순으로 찾고 한번에 읽는다. 색인이 아직 없으면 LIKE
+        found = item_search.search(keyword, limit)
+        if found is None:
+            items = ir.search_like(self.db, keyword, limit)
+            total = None
+        else:
+            ids, total = found
+            by_id = ir.find_by_ids(self.db, ids)
+            items = [by_id[item_id] for item_id in ids if item_id in by_id]
+        categories = ir.find_categories_by_item_ids(self.db, [item.id for item in items])
+        return items, categories, total
+
+    def suggest(self, prefix:str, limit:int):
+        # 자동완성: 상품 / 카테고리 이름 접두어, 판매 수량순 (core/suggest.py). 색인이 아직 없으면 LIKE 'prefix%'
+        items = item_suggest.search(prefix, limit)
+        if items is None:
+            items = ir.find_names_by_prefix(self.db, prefix, limit)
+        categories = category_suggest.search(prefix, limit)
+        if categories is None:
+            categories = cr.find_names_by_prefix(self.db, prefix, limit)
+        return items, categories
+
     def update_item(self, id:int, payload:ItemBaseModel):
-        update = ir.update(self.db, id, payload)
+        with unit_of_work(self.db):
+            update = ir.update(self.db, id, payload)
+        if update and payload.image_url is not None:
+            image_variants.pregenerate(update.image_url)     # 썸네일을 첫 조회 전에 미리 만들어 둔다
         return update
 
     def delete_item(self, id:int):
-        delete = ir.delete(self.db, id)
+        # 결제 대기(hold) 중인 수량이 있으면 ValueError. 만료됐는데 아직 정리 안 된 hold 는 먼저 푼다
+        with unit_of_work(self.db):
+            release_holds(self.db, hr.find_expired_for_update(self.db, datetime.now(), STOCK_HOLD_SWEEP_BATCH, item_id=id))
+            delete = ir.delete(self.db, id)
         return delete
 
     def read_by_category(self, category_id: int, item_type: str = None):
@@ -3,6 +3,7 @@
 from sqlalchemy.orm import Session
 
 from crud.member import MemberRepository
+from db.session import unit_of_work
 from models.member import Member
 from schemas.dto import MemberBaseModel
 
@@ -14,12 +15,13 @@ class MemberService:
     def create_member(self, data: MemberBaseModel):
         # 자바의 memberRepository.save() 로직
         new_member = Member(**data.model_dump())
-        mb = mr.create(self.db,new_member)  #memberBasemodel
+        with unit_of_work(self.db):
+            mb = mr.create(self.db,new_member)  #memberBasemodel
         return mb
 
     def delete_member(self, member_id):
-
-        tmp = mr.delete(self.db, member_id)
+        with unit_of_work(self.db):
+            tmp = mr.delete(self.db, member_id)
         return tmp
 
     def find_all(self):
@@ -30,5 +32,6 @@ class MemberService:
         return mr.find_by_id(self.db, member_id)
 
     def update_member(self, member_id:int, payload:dict):
-        tmp = mr.update(self.db, member_id, payload)
+        with unit_of_work(self.db):
+            tmp = mr.update(self.db, member_id, payload)
         return tmp
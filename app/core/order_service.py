@@ -1,3 +1,6 @@
+import uuid
+from datetime import datetime, timedelta
+
 from sqlalchemy.orm import Session
 from crud.order import OrderRepository
 from models.order import Order
@@ -6,6 +9,8 @@ from crud.item import ItemRepository
 from crud.member import MemberRepository
 from schemas.dto import Item_count
 from models.delivery import Delivery
+from db.session import unit_of_work
+from core.stock_holds import STOCK_HOLD_TTL_SECONDS, STOCK_HOLD_SWEEP_BATCH, release_holds, hr
 
 orderRepo = OrderRepository()
 mr = MemberRepository()
@@ -22,37 +27,106 @@ class OrderService:
         delivery = Delivery(zip=zip, addr1=addr1, addr2 =addr2)
 
 
-        for item_count in item_count_list:     # 주문 아이템이 재고보다 더많으면 주문 자체를 생성하면 안되기에 일단 체크먼저 하는것
-            i = item_count.item_id
-            c= item_count.count
-            item=ir.find_by_id(self.db,i)
+        # 같은 상품이 여러 줄로 들어오면 합쳐서 한 줄로
+        counts = {}
+        for item_count in item_count_list:
+            counts[item_count.item_id] = counts.get(item_count.item_id, 0) + item_count.count
+        if not counts or min(counts.values()) <= 0:      # 0 / 음수면 차감이 오히려 재고를 늘린다
+            raise ValueError("수량은 1개 이상이어야 합니다.")
+
+        items = ir.find_by_ids(self.db, list(counts))    # 상품 조회는 IN 쿼리 한번
+        for i, c in counts.items():     # 주문 아이템이 재고보다 더많으면 주문 자체를 생성하면 안되기에 일단 체크먼저 하는것
+            item = items.get(i)
             if item is None:
                 return None
-            if item.stock < c:
+            if item.stock < c:      # 만료된 hold 는 아래에서 풀 수 있으니 여기서는 전체 재고만 본다
                 return None
 
         order = Order(member=member, delivery=delivery, total_price=0)  #테스트
 
-        for item_count in item_count_list:
-            i = item_count.item_id
-            c= item_count.count
-            item=ir.find_by_id(self.db,i)
-            OrderItem.create_order_item(order=order, item=item, count=c)             #order부분수정함
+        # 재고 차감은 항상 item_id 순서로 -> 동시 주문끼리 row lock 순서가 같아서 데드락 방지
+        for i in sorted(counts):
+            c = counts[i]
+            if not ir.decrease_stock(self.db, i, c):
+                # 모자라면 start_checkout 처럼 이 상품의 만료된 hold 를 먼저 풀고 한번 더
+                release_holds(self.db, hr.find_expired_for_update(self.db, datetime.now(), STOCK_HOLD_SWEEP_BATCH, item_id=i))
+                if not ir.decrease_stock(self.db, i, c):      # 그 사이 다른 주문이 재고를 가져간 경우
+                    self.db.rollback()
+                    return None
+            OrderItem.create_order_item(order=order, item=items[i], count=c)             #order부분수정함
 
-        orderRepo.create(self.db,order) # Use orderRepo here
+        with unit_of_work(self.db):
+            orderRepo.create(self.db,order) # Use orderRepo here  (재고 차감 + 주문 생성이 한 트랜잭션)
 
         return order
 
+    def start_checkout(self, member_id:int, item_count_list:list[Item_count]):
+        # 결제 시작: 상품마다 판매 가능 수량 안에서 재고를 잡아 둔다 (만료 전에 confirm 하면 주문)
+        # 하나라도 모자라면 전부 롤백하고 ValueError
+        if mr.find_by_id(self.db, member_id) is None:
+            return None
+        counts = {}
+        for item_count in item_count_list:
+            counts[item_count.item_id] = counts.get(item_count.item_id, 0) + item_count.count
+        if not counts or min(counts.values()) <= 0:
+            raise ValueError("수량은 1개 이상이어야 합니다.")
+
+        now = datetime.now()
+        checkout_id = uuid.uuid4().hex
+        expires_at = now + timedelta(seconds=STOCK_HOLD_TTL_SECONDS)
+        with unit_of_work(self.db):
+            for i in sorted(counts):        # create_order 와 같은 item_id 순서로 잠근다
+                if ir.reserve_stock(self.db, i, counts[i]):
+                    continue
+                # 모자라면 이 상품의 만료된 hold 를 먼저 풀고 한번 더
+                release_holds(self.db, hr.find_expired_for_update(self.db, now, STOCK_HOLD_SWEEP_BATCH, item_id=i))
+                if not ir.reserve_stock(self.db, i, counts[i]):
+                    raise ValueError(f"재고가 부족합니다. (item_id={i})")
+            hr.create_many(self.db, [
+                {"checkout_id": checkout_id, "member_id": member_id, "item_id": i, "count": c,
+                 "created_at": now, "expires_at": expires_at}
+                for i, c in sorted(counts.items())
+            ])
+        return {"checkout_id": checkout_id, "expires_at": expires_at,
+                "items": [{"item_id": i, "count": c} for i, c in sorted(counts.items())]}
+
+    def confirm_checkout(self, checkout_id:str, zip:str, addr1:str, addr2:str):
+        # 잡아 둔 재고를 주문으로. 없거나 만료됐으면 None (만료된 것은 그 자리에서 푼다)
+        with unit_of_work(self.db):
+            holds = hr.find_by_checkout_for_update(self.db, checkout_id)
+            if not holds:
+                return None
+            if holds[0].expires_at <= datetime.now():
+                release_holds(self.db, holds)
+                return None
+            member = mr.find_by_id(self.db, holds[0].member_id)
+            items = ir.find_by_ids(self.db, [hold.item_id for hold in holds])
+            order = Order(member=member, delivery=Delivery(zip=zip, addr1=addr1, addr2=addr2), total_price=0)
+            for hold in holds:
+                if not ir.commit_reserved(self.db, hold.item_id, hold.count):
+                    raise ValueError(f"재고가 부족합니다. (item_id={hold.item_id})")
+                OrderItem.create_order_item(order=order, item=items[hold.item_id], count=hold.count)
+            hr.delete(self.db, holds)
+            orderRepo.create(self.db, order)
+        return order
+
+    def release_checkout(self, checkout_id:str):
+        with unit_of_work(self.db):
+            holds = hr.find_by_checkout_for_update(self.db, checkout_id)
+            release_holds(self.db, holds)
+        return bool(holds)
+
     def cancel_order(self, order_id:int):
-        order = orderRepo.find_by_id(self.db, order_id)
-        for order_item in order.order_items:
-            item = order_item.item
-            count = order_item.count
-            item.stock+=count
-            # order.total_price-= item.price * count      지울건데 차피 필요없겟네
-
-        #cascade라 order지우면 orderitem도 날라갈듯?
-        orderRepo.delete(self.db, order_id)
+        with unit_of_work(self.db):      # 재고 복구 + 주문 삭제를 한 트랜잭션으로
+            order = orderRepo.find_by_id(self.db, order_id)
+            if order is None:
+                return False
+            for order_item in order.order_items:
+                ir.increase_stock(self.db, order_item.item_id, order_item.count)
+                # order.total_price-= item.price * count      지울건데 차피 필요없겟네
+
+            #cascade라 order지우면 orderitem도 날라갈듯?
+            orderRepo.delete(self.db, order_id)
         return True
 
 
@@ -61,6 +135,9 @@ class OrderService:
     def get_orders_by_member_id(self, member_id: int):
         return orderRepo.find_by_member_id(self.db, member_id)
 
+    def get_order_history(self, member_id: int, limit: int, before: tuple = None, date_from=None, date_to=None):
+        return orderRepo.find_history(self.db, member_id, limit, before=before, date_from=date_from, date_to=date_to)
+
 
 
 
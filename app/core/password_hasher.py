@@ -0,0 +1,115 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 대기시간 히스토그램 구간 (ms, 누적 아님)
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class HasherBusy(Exception):
+    """대기열이 가득 차서 해시 작업을 받을 수 없을 때"""
+
+
+def hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+class PasswordHasher:
+    """bcrypt 전용 스레드풀.
+
+    bcrypt 한번이 수백 ms 동안 CPU 를 쓰기 때문에 이벤트 루프에서 직접 부르면
+    그동안 다른 요청이 전부 멈춘다. 정해진 개수의 스레드에서만 돌리고,
+    대기열이 max_pending 을 넘으면 HasherBusy 를 던져서 바로 503 으로 돌려보낸다.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0       # 대기 + 실행중
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def _observe_wait(self, seconds: float):
+        ms = seconds * 1000
+        index = len(WAIT_BUCKETS_MS)
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self._running += 1
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+            self._wait_buckets[index] += 1
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HasherBusy()
+            self._pending += 1
+
+        enqueued = time.perf_counter()
+
+        def job():
+            self._observe_wait(time.perf_counter() - enqueued)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        try:
+            return await asyncio.wrap_future(self._executor.submit(job))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(check_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = sum(self._wait_buckets)
+            buckets = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self._wait_buckets)}
+            buckets["inf"] = self._wait_buckets[-1]
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "queue_depth": self._pending - self._running,
+                "running": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_avg_ms": round(self._wait_total / started * 1000, 3) if started else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+                "wait_histogram": buckets,
+            }
+
+
+# 기본값은 코어의 절반 -> 나머지 코어는 이벤트 루프/다른 요청 몫
+# 대기열은 워커당 8개 (bcrypt 1회 ~300ms 기준 최대 2~3초 대기)
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", BCRYPT_WORKERS * 8))
+
+password_hasher = PasswordHasher(workers=BCRYPT_WORKERS, max_pending=BCRYPT_MAX_PENDING)
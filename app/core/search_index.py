@@ -0,0 +1,478 @@
+"""상품 / 카테고리 이름 검색용 n-gram 역색인 (프로세스 내).
+
+LIKE '%키워드%' 는 인덱스를 못 타서 매번 테이블 전체를 읽는다. 여기서는 이름(상품은 저자/가수/감독/배우 포함)을
+글자 n-gram 으로 쪼개서 gram -> 문서 id 집합으로 들고 있다가, 검색어의 gram 들의 교집합으로 후보를 좁히고
+실제로 포함하는지 확인한 뒤 점수순으로 돌려준다.
+
+- 한글은 단어가 짧아서 2-gram, 그 외(영문/숫자)는 3-gram. 한 단어 안에서도 한글/그 외가 바뀌는 곳에서 끊는다
+  ("아이폰15" -> "아이폰", "15")
+- gram 보다 짧은 검색어 조각("폰", "15")은 그 조각을 포함하는 gram 들의 합집합으로 찾는다
+- ORM 으로 만들기/수정/삭제하면 mapper 이벤트가 세션에 표시해 두고, 커밋된 뒤에(after_commit) 색인에 반영한다.
+  롤백되면 버린다 (core/versions.py 와 같은 방식)
+- 처음 검색할 때 백그라운드로 만들고, 그 전까지는 None 을 돌려줘서 호출하는 쪽이 LIKE 로 대신한다.
+  다른 워커의 쓰기는 SEARCH_INDEX_REFRESH_SECONDS 마다 다시 만들면서 따라잡는다
+"""
+import heapq
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from db.session import SessionLocal
+from models.category import Category
+from models.item.item import Item
+from models.item.album import Album  # noqa: F401  items 테이블의 타입별 컬럼
+from models.item.book import Book  # noqa: F401
+from models.item.movie import Movie  # noqa: F401
+
+load_dotenv()
+
+SEARCH_INDEX_REFRESH_SECONDS = float(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", "300"))
+# 자주 들어오는 검색어의 결과 (색인이 바뀌면 전부 버린다). 결과가 수만 개인 짧은 검색어가 비싸다
+SEARCH_RESULT_CACHE_SIZE = int(os.getenv("SEARCH_RESULT_CACHE_SIZE", "1024"))
+SEARCH_LIMIT = 20
+CATEGORY_SEARCH_LIMIT = 100     # 카테고리는 수가 적어서 /category/search 가 거의 전부 돌려준다
+BUILD_YIELD_PER = 5000
+BUILD_RETRY_SECONDS = 30        # 만들다 실패하면 (DB 장애 등) 이만큼은 LIKE 로만
+
+# 상품은 이름 외에 사람 이름 필드도 같이 (이름에 맞으면 점수가 더 높다)
+ITEM_SEARCH_FIELDS = ("author", "artist", "director", "actor")
+
+HANGUL = "가-힣ㄱ-ㆎ"       # 완성형 + 호환 자모
+TOKEN = re.compile(rf"[{HANGUL}]+|[^\W{HANGUL}]+")
+HANGUL_START = re.compile(rf"[{HANGUL}]")
+
+# 검색어 조각의 최소 길이 (gram 크기별). 한글은 한 글자도 된다
+MIN_TOKEN_LENGTH = {3: 2}
+
+PENDING_KEY = "pending_search"
+
+
+def normalize(text) -> str:
+    return unicodedata.normalize("NFKC", text).lower() if text else ""
+
+
+def gram_size(token: str) -> int:
+    return 2 if HANGUL_START.match(token) else 3
+
+
+def token_grams(token: str) -> set:
+    n = gram_size(token)
+    if len(token) <= n:
+        return {token}
+    return {token[i:i + n] for i in range(len(token) - n + 1)}
+
+
+def text_grams(text: str) -> set:
+    grams = set()
+    for token in TOKEN.findall(text):
+        grams |= token_grams(token)
+    return grams
+
+
+def _short_keys(gram: str):
+    # gram 이 포함하는, gram 크기보다 짧은 조각들 (짧은 검색어용)
+    n = gram_size(gram)
+    for size in range(1, min(len(gram), n - 1) + 1):
+        for i in range(len(gram) - size + 1):
+            yield gram[i:i + size]
+
+
+class NgramIndex:
+    """gram -> 문서 id 집합. 락 없음 (SearchIndex 가 감싼다)"""
+
+    def __init__(self):
+        self.names = {}         # id -> 정규화한 이름
+        self.extras = {}        # id -> 정규화한 나머지 필드 (없으면 빈 문자열)
+        self.postings = {}      # gram -> {id}
+        self.short = {}         # gram 보다 짧은 조각 -> {gram}
+
+    def add(self, doc_id: int, name, extras=()):
+        if doc_id in self.names:
+            self.remove(doc_id)
+        name = self.names[doc_id] = normalize(name)
+        extra = self.extras[doc_id] = "\n".join(normalize(value) for value in extras if value)
+        for gram in text_grams(name) | text_grams(extra):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = set()
+                for key in _short_keys(gram):
+                    self.short.setdefault(key, set()).add(gram)
+            posting.add(doc_id)
+
+    def apply(self, doc_id: int, doc):
+        # 커밋된 변경 하나. doc 이 None 이면 삭제
+        if doc is None:
+            self.remove(doc_id)
+        else:
+            self.add(doc_id, *doc)
+
+    def finish(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"documents": len(self.names), "grams": len(self.postings)}
+
+    def remove(self, doc_id: int):
+        name = self.names.pop(doc_id, None)
+        if name is None:
+            return
+        extra = self.extras.pop(doc_id)
+        for gram in text_grams(name) | text_grams(extra):
+            posting = self.postings.get(gram)
+            if posting is None:
+                continue
+            posting.discard(doc_id)
+            if not posting:
+                del self.postings[gram]
+                for key in _short_keys(gram):
+                    grams = self.short.get(key)
+                    if grams is not None:
+                        grams.discard(gram)
+                        if not grams:
+                            del self.short[key]
+
+    def _token_candidates(self, token: str):
+        if len(token) < gram_size(token):
+            grams = self.short.get(token, ())
+            if len(grams) == 1:
+                return self.postings[next(iter(grams))]
+            result = set()
+            for gram in grams:
+                result |= self.postings[gram]
+            return result
+        sets = [self.postings.get(gram) for gram in token_grams(token)]
+        if not all(sets):
+            return set()
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:]) if len(sets) > 1 else sets[0]
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT):
+        # ([id, ...] 순위순, 전체 일치 수)
+        words = normalize(query).split()
+        # 영문/숫자 한 글자는 거의 모든 gram 에 들어 있어서 후보를 좁히지 못한다 (확인 단계에서만 본다)
+        tokens = [token for word in words for token in TOKEN.findall(word)
+                  if len(token) >= MIN_TOKEN_LENGTH.get(gram_size(token), 1)]
+        if not tokens:
+            return [], 0
+        sets = sorted((self._token_candidates(token) for token in tokens), key=len)
+        candidates = sets[0].intersection(*sets[1:]) if len(sets) > 1 else sets[0]
+        if not candidates:
+            return [], 0
+
+        phrase = " ".join(words)
+        if tokens == [phrase] and len(phrase) <= gram_size(phrase):
+            # gram 하나(또는 그보다 짧은 조각)로 찾은 후보는 전부 실제로 포함한다 -> 확인 없이 개수를 안다
+            tiers = self._tiers(candidates, words, phrase, None)
+            total = len(candidates)
+        else:
+            # 여러 gram 의 교집합이라 실제로는 포함하지 않는 후보가 섞여 있을 수 있다
+            in_name = self._in_name(candidates, words)
+            names, extras = self.names, self.extras
+            others = [doc_id for doc_id in candidates.difference(in_name)
+                      if all(word in names[doc_id] or word in extras[doc_id] for word in words)]
+            tiers = self._tiers(candidates, words, phrase, (in_name, others))
+            total = len(in_name) + len(others)
+
+        names = self.names
+        result, seen = [], set()
+        for tier in tiers:
+            # (이름 길이, id) 튜플을 C 레벨에서 만든다 (key 함수 호출보다 훨씬 싸다)
+            for _, doc_id in heapq.nsmallest(limit, zip(map(len, map(names.__getitem__, tier)), tier)):
+                if len(result) == limit:
+                    break
+                if doc_id not in seen:
+                    seen.add(doc_id)
+                    result.append(doc_id)
+            if len(result) == limit:
+                break
+        return result, total
+
+    def _in_name(self, candidates, words):
+        names = self.names
+        if len(words) == 1:
+            word = words[0]
+            return [doc_id for doc_id in candidates if word in names[doc_id]]
+        return [doc_id for doc_id in candidates if all(word in names[doc_id] for word in words)]
+
+    def _tiers(self, candidates, words, phrase, verified):
+        # 순위 등급: 이름이 검색어와 같음 > 이름이 검색어로 시작 > 이름에 검색어가 그대로 > 이름에 단어가 다 있음
+        #           > 저자 등 다른 필드까지 봐서 다 있음. 같은 등급 안에서는 이름이 짧은 순, id 순.
+        # 앞 등급은 뒤 등급에 포함되고, 앞에서 limit 개가 차면 뒤 등급은 만들지도 않는다
+        names = self.names
+        if len(words) == 1 and verified is None:
+            starts = [doc_id for doc_id in candidates if names[doc_id].startswith(phrase)]
+        else:
+            in_name = verified[0] if verified else self._in_name(candidates, words)
+            with_phrase = in_name if len(words) == 1 else [doc_id for doc_id in in_name if phrase in names[doc_id]]
+            starts = [doc_id for doc_id in with_phrase if names[doc_id].startswith(phrase)]
+        yield [doc_id for doc_id in starts if len(names[doc_id]) == len(phrase)]
+        yield starts
+        if verified is None:
+            in_name = self._in_name(candidates, words)
+            yield in_name
+            yield candidates.difference(in_name)
+        else:
+            if len(words) > 1:
+                yield with_phrase
+            yield in_name
+            yield verified[1]
+
+
+class ReadWriteLock:
+    """읽기는 여러 스레드가 같이, 쓰기는 혼자. 쓰기가 기다리고 있으면 새 읽기는 그 뒤에 선다"""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+class SearchIndex:
+    """메모리 색인 하나를 DB 와 맞춰서 관리 (만들기, 커밋 반영, 주기적 재생성, 결과 캐시, 지표)
+
+    index_class 는 add(id, ...) / finish() / apply(key, value) / search(query, limit) / stats() 를 가진 클래스
+    (NgramIndex, core/suggest.py 의 PrefixIndex). load_rows(db) 가 돌려주는 행이 그대로 add 의 인자가 된다.
+    """
+
+    def __init__(self, name: str, load_rows, index_class=NgramIndex,
+                 refresh_seconds: float = SEARCH_INDEX_REFRESH_SECONDS):
+        self.name = name
+        self.load_rows = load_rows
+        self.index_class = index_class
+        self.refresh_seconds = refresh_seconds
+        self.session_factory = SessionLocal     # 색인은 primary 에서 만든다 (replica 지연이 섞이지 않게)
+        self._index = None
+        self._lock = threading.RLock()      # 상태 / 결과 캐시 / 지표 (잠깐씩만)
+        self._rw = ReadWriteLock()          # 색인 자체: 검색은 같이, 변경 반영은 혼자
+        self._replay = None         # 만드는 동안 커밋된 변경 (다 만든 뒤 다시 적용)
+        self._built_at = 0.0
+        self._stale = False
+        self._stale_generation = 0  # mark_stale 마다 +1 (만드는 도중에 표시된 건 지우지 않게)
+        self._changes = 0           # apply 마다 +1 (검색 도중 바뀐 결과는 캐시하지 않게)
+        self._retry_at = 0.0
+        self._failures = 0
+        self._build_seconds = None
+        self._builds = 0
+        self._results = OrderedDict()   # (검색어, limit) -> 결과
+        self._result_hits = 0
+        self._searches = 0
+        self._search_seconds = 0.0
+
+    def rebuild(self):
+        # DB 를 끝까지 읽어서 새 색인을 만들고 통째로 교체. 그동안 검색은 이전 색인으로
+        with self._lock:
+            if self._replay is not None:
+                return
+            self._replay = []
+            generation = self._stale_generation
+        started = time.perf_counter()
+        index = self.index_class()
+        try:
+            with self.session_factory() as db:
+                for row in self.load_rows(db):
+                    index.add(*row)
+            index.finish()
+        except BaseException:
+            with self._lock:
+                self._replay = None
+                self._retry_at = time.monotonic() + BUILD_RETRY_SECONDS
+                self._failures += 1
+            raise
+        with self._lock:
+            for key, value in self._replay:
+                index.apply(key, value)
+            self._index = index
+            self._results.clear()
+            self._replay = None
+            self._built_at = time.monotonic()
+            # 만드는 동안 mark_stale 이 왔으면 그 쓰기는 이번 색인에 없을 수 있다 -> 한번 더 만든다
+            if generation == self._stale_generation:
+                self._stale = False
+            self._build_seconds = time.perf_counter() - started
+            self._builds += 1
+
+    def _rebuild_in_background(self):
+        with self._lock:
+            if self._replay is not None or time.monotonic() < self._retry_at:
+                return
+        threading.Thread(target=self.rebuild, name=f"search-index-{self.name}", daemon=True).start()
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT):
+        # ([id, ...], 전체 수). 색인이 아직 없으면 None -> 호출하는 쪽이 LIKE 로
+        index = self._index
+        if index is None or self._stale or time.monotonic() - self._built_at > self.refresh_seconds:
+            self._rebuild_in_background()
+            if index is None:
+                return None
+        key = (query, limit)
+        started = time.perf_counter()
+        with self._lock:
+            self._searches += 1
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self._result_hits += 1
+                return result
+        # 검색은 락 밖에서 (읽기끼리는 같이 돈다). 읽는 동안에는 apply 가 색인을 못 바꾼다
+        with self._rw.read():
+            index, changes = self._index, self._changes
+            if index is None:
+                return None
+            result = index.search(query, limit)
+        with self._lock:
+            self._search_seconds += time.perf_counter() - started
+            if index is self._index and changes == self._changes:
+                self._results[key] = result
+                if len(self._results) > SEARCH_RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+        return result
+
+    def apply(self, changes):
+        with self._rw.write(), self._lock:
+            if self._replay is not None:
+                self._replay.extend(changes)
+            if self._index is not None:
+                for key, value in changes:
+                    self._index.apply(key, value)
+                self._results.clear()
+            self._changes += 1
+
+    def pending(self, db: Session) -> dict:
+        # 이 세션에서 커밋을 기다리는 변경 {key: value}. 커밋되면 apply(key, value) 로 반영, 롤백되면 버린다
+        return db.info.setdefault(PENDING_KEY, {}).setdefault(self, {})
+
+    def stage(self, db: Session, doc_id: int, doc):
+        # doc: add 의 나머지 인자 튜플, 삭제면 None
+        self.pending(db)[doc_id] = doc
+
+    def invalidate(self, db: Session):
+        # ORM 을 거치지 않은 대량 쓰기: 커밋되면 다음 검색 때 다시 만든다
+        self.pending(db)
+        db.info.setdefault(PENDING_KEY + "_stale", set()).add(self)
+
+    def mark_stale(self):
+        with self._lock:
+            self._stale = True
+            self._stale_generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._index = None
+            self._results.clear()
+            self._stale = False
+            self._retry_at = 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            index = self._index
+            misses = self._searches - self._result_hits
+            return {
+                "ready": index is not None,
+                "building": self._replay is not None,
+                "stale": self._stale,
+                **(index.stats() if index else {}),
+                "builds": self._builds,
+                "build_failures": self._failures,
+                "last_build_seconds": round(self._build_seconds, 3) if self._build_seconds is not None else None,
+                "age_seconds": round(time.monotonic() - self._built_at, 1) if index else None,
+                "searches": self._searches,
+                "result_cache_hits": self._result_hits,
+                "avg_search_ms": round(self._search_seconds / misses * 1000, 3) if misses else 0.0,
+            }
+
+
+def item_rows(db):
+    items = Item.__table__
+    stmt = select(items.c.id, items.c.name, *(items.c[field] for field in ITEM_SEARCH_FIELDS))
+    for row in db.execute(stmt.execution_options(stream_results=True, yield_per=BUILD_YIELD_PER)):
+        yield row[0], row[1], row[2:]
+
+
+def category_rows(db):
+    stmt = select(Category.id, Category.name)
+    for row in db.execute(stmt.execution_options(stream_results=True, yield_per=BUILD_YIELD_PER)):
+        yield row[0], row[1], ()
+
+
+item_search = SearchIndex("items", item_rows)
+category_search = SearchIndex("categories", category_rows)
+
+
+@event.listens_for(Item, "after_insert", propagate=True)
+@event.listens_for(Item, "after_update", propagate=True)
+def _stage_item(mapper, connection, target):
+    extras = tuple(getattr(target, field, None) for field in ITEM_SEARCH_FIELDS)
+    item_search.stage(object_session(target), target.id, (target.name, extras))
+
+
+@event.listens_for(Item, "after_delete", propagate=True)
+def _stage_item_delete(mapper, connection, target):
+    item_search.stage(object_session(target), target.id, None)
+
+
+@event.listens_for(Category, "after_insert")
+@event.listens_for(Category, "after_update")
+def _stage_category(mapper, connection, target):
+    category_search.stage(object_session(target), target.id, (target.name, ()))
+
+
+@event.listens_for(Category, "after_delete")
+def _stage_category_delete(mapper, connection, target):
+    category_search.stage(object_session(target), target.id, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    stale = session.info.pop(PENDING_KEY + "_stale", None)
+    if pending:
+        for index, changes in pending.items():
+            if changes:
+                index.apply(list(changes.items()))
+    for index in stale or ():
+        index.mark_stale()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(PENDING_KEY, None)
+        session.info.pop(PENDING_KEY + "_stale", None)
@@ -0,0 +1,112 @@
+"""결제 대기 재고(hold) 설정 / 해제 / 만료 정리.
+
+checkout 을 시작하면 상품마다 items.reserved 를 조건부 UPDATE 로 올리고 stock_holds 에 만료 시각과 함께 남긴다.
+확정(confirm)하면 stock 과 reserved 를 같이 줄이고 주문을 만든다. 해제하거나 만료되면 reserved 만 돌려준다.
+
+만료된 hold 는 워커마다 도는 백그라운드 스레드가 expires_at 인덱스로 조금씩 (SKIP LOCKED) 지운다.
+정리가 늦어도 만료된 hold 는 확정되지 않고, 재고가 모자란 상품은 checkout 때 그 상품의 만료 hold 를 먼저 푼다.
+"""
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from crud.item import ItemRepository
+from crud.stock_hold import StockHoldRepository
+from db.session import SessionLocal, unit_of_work
+
+load_dotenv()
+
+STOCK_HOLD_TTL_SECONDS = float(os.getenv("STOCK_HOLD_TTL_SECONDS", "600"))
+STOCK_HOLD_SWEEP_SECONDS = float(os.getenv("STOCK_HOLD_SWEEP_SECONDS", "15"))     # 0 이면 정리 스레드를 안 띄운다
+STOCK_HOLD_SWEEP_BATCH = int(os.getenv("STOCK_HOLD_SWEEP_BATCH", "500"))          # 트랜잭션 하나에서 지우는 hold 수
+
+ir = ItemRepository()
+hr = StockHoldRepository()
+
+
+def release_holds(db, holds):
+    # hold 들을 지우고 상품별로 합친 수량만큼 reserved 를 돌려준다
+    if not holds:
+        return
+    counts = Counter()
+    for hold in holds:
+        counts[hold.item_id] += hold.count
+    ir.release_reserved(db, counts)
+    hr.delete(db, holds)
+
+
+class HoldSweeper:
+    """만료된 hold 를 주기적으로 풀어 주는 스레드 (프로세스마다 하나)"""
+
+    def __init__(self, interval: float = STOCK_HOLD_SWEEP_SECONDS, batch: int = STOCK_HOLD_SWEEP_BATCH):
+        self.interval = interval
+        self.batch = batch
+        self.session_factory = SessionLocal
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._sweeps = 0
+        self._released = 0
+        self._failures = 0
+        self._last_sweep_seconds = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None or self.interval <= 0:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="stock-hold-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception:
+                with self._lock:
+                    self._failures += 1
+
+    def sweep(self, now: datetime | None = None) -> int:
+        # 만료된 hold 를 batch 개씩 (각각 짧은 트랜잭션으로) 풀고 푼 개수를 돌려준다
+        now = now or datetime.now()
+        started = time.perf_counter()
+        released = 0
+        while True:
+            with self.session_factory() as db:
+                with unit_of_work(db):
+                    holds = hr.find_expired_for_update(db, now, self.batch)
+                    release_holds(db, holds)
+            released += len(holds)
+            if len(holds) < self.batch:
+                break
+        with self._lock:
+            self._sweeps += 1
+            self._released += released
+            self._last_sweep_seconds = time.perf_counter() - started
+        return released
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "interval_seconds": self.interval,
+                "ttl_seconds": STOCK_HOLD_TTL_SECONDS,
+                "sweeps": self._sweeps,
+                "released": self._released,
+                "failures": self._failures,
+                "last_sweep_ms": round(self._last_sweep_seconds * 1000, 3) if self._last_sweep_seconds is not None else None,
+            }
+
+
+hold_sweeper = HoldSweeper()
@@ -0,0 +1,324 @@
+"""검색창 자동완성용 접두어 색인 (프로세스 내).
+
+키를 누를 때마다 들어오는 요청이라 DB 를 보지 않고 메모리에서 바로 답한다.
+
+- 이름(정규화)과 이름 안의 단어 시작 위치들을 (id << 8 | 위치) 정수 하나로 array 에 넣고, 그 위치부터의 문자열 순으로
+  정렬해 둔다. 접두어 하나가 이 배열의 연속 구간이 되는 평평한 trie 라서 노드 객체 없이 항목당 8 byte 다
+- 구간이 작으면 그때 훑어서 인기순(판매 수량) top-k, 구간이 크면 미리 만들어 둔 top-k 를 쓴다.
+  top-k 목록은 다시 만들 때 아래(긴 접두어)부터 올라오면서 합치고, 커밋된 변경으로 바로 고친다
+- 한글은 치는 중인 글자도 찾는다: 초성만("해리ㅍ"), 받침 전("해리포" -> "해리폿...")도 음절 코드의 연속 구간이라 같은 방식
+- 변경 반영 / 주기적 재생성 / 결과 캐시는 core/search_index.py 의 SearchIndex 가 맡는다
+"""
+import heapq
+import os
+from array import array
+from bisect import bisect_left, insort
+
+from dotenv import load_dotenv
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import object_session
+
+from core.search_index import SearchIndex, normalize, BUILD_YIELD_PER
+from models.category import Category
+from models.category_item import CategoryItem
+from models.item.item import Item
+from models.order_item import OrderItem
+
+load_dotenv()
+
+SUGGEST_TOP_K = int(os.getenv("SUGGEST_TOP_K", "10"))
+SUGGEST_SCAN_LIMIT = 64         # 구간이 이보다 작으면 미리 만든 top-k 없이 그때 훑는다
+TOP_KEEP = SUGGEST_TOP_K * 2    # 여유분: 순위가 내려가거나 지워져도 다시 훑지 않고 버틸 수 있게
+MAX_WORD_KEYS = 4               # 이름의 단어 시작 몇 군데까지 키로 (첫 단어 포함)
+OFFSET_BITS = 8
+OFFSET_MASK = (1 << OFFSET_BITS) - 1
+MAX_CHAR = chr(0x10FFFF)
+
+HANGUL_FIRST, HANGUL_LAST = 0xAC00, 0xD7A3
+CHOSEONG_FIRST, CHOSEONG_LAST = 0x1100, 0x1112      # NFKC 가 호환 자모(ㄱ)를 이쪽으로 바꾼다
+SYLLABLES_PER_CHOSEONG = 588
+JONGSEONG_COUNT = 28
+
+SOLD = "sold"       # apply 키: (SOLD, 상품 id) -> 판매 수량 증감
+
+
+def prefix_range(prefix: str) -> tuple:
+    # 정규화한 접두어 -> 키 구간 [low, high)
+    base, last = prefix[:-1], ord(prefix[-1])
+    if CHOSEONG_FIRST <= last <= CHOSEONG_LAST:
+        # 초성만 친 상태: 그 초성으로 시작하는 음절 전부
+        first = HANGUL_FIRST + (last - CHOSEONG_FIRST) * SYLLABLES_PER_CHOSEONG
+        return base + chr(first), base + chr(first + SYLLABLES_PER_CHOSEONG)
+    if HANGUL_FIRST <= last <= HANGUL_LAST and (last - HANGUL_FIRST) % JONGSEONG_COUNT == 0:
+        # 받침 없는 음절: 받침을 치는 중일 수 있다
+        return base + chr(last), base + chr(last + JONGSEONG_COUNT)
+    return prefix, prefix + MAX_CHAR
+
+
+def covering_ranges(key: str):
+    # key 로 시작하는 이름이 걸리는 모든 접두어 구간 (변경을 미리 만든 top-k 에 반영할 때)
+    for end in range(1, len(key) + 1):
+        prefix = key[:end]
+        yield prefix, prefix + MAX_CHAR
+        code = ord(key[end - 1])
+        if HANGUL_FIRST <= code <= HANGUL_LAST:
+            base = key[:end - 1]
+            offset = code - HANGUL_FIRST
+            first = HANGUL_FIRST + offset - offset % SYLLABLES_PER_CHOSEONG
+            yield base + chr(first), base + chr(first + SYLLABLES_PER_CHOSEONG)
+            first = code - offset % JONGSEONG_COUNT
+            yield base + chr(first), base + chr(first + JONGSEONG_COUNT)
+
+
+def word_offsets(key: str) -> list:
+    offsets = [0]
+    for i in range(1, min(len(key), OFFSET_MASK + 1)):
+        if len(offsets) == MAX_WORD_KEYS:
+            break
+        if key[i - 1] == " " and key[i] != " ":
+            offsets.append(i)
+    return offsets
+
+
+class PrefixIndex:
+    """정렬된 (id, 단어 위치) 배열 + 큰 구간의 top-k. 락 없음 (SearchIndex 가 감싼다)
+
+    search 는 여러 스레드가 같이 부른다. search 가 바꾸는 건 top 에 새 목록을 넣는 dict 대입 하나뿐이다.
+    """
+
+    def __init__(self):
+        self.names = {}             # id -> 표시용 이름
+        self.keys = {}              # id -> 정규화한 이름 (이름과 같으면 같은 객체)
+        self.popularity = {}        # id -> 판매 수량 (0 은 넣지 않는다)
+        self.entries = array("q")   # id << OFFSET_BITS | 위치, keys[id][위치:] 순
+        self.top = {}               # (low, high) -> 인기순 id 목록 (실제 순위의 앞부분과 항상 같다)
+        self._bulk = True           # 처음 만들 때는 정렬 없이 붙이고 finish() 에서 한번에
+
+    def _entry_key(self, entry: int) -> str:
+        return self.keys[entry >> OFFSET_BITS][entry & OFFSET_MASK:]
+
+    def _rank(self, doc_id: int) -> tuple:
+        return -self.popularity.get(doc_id, 0), len(self.names[doc_id]), doc_id
+
+    def _entries_of(self, doc_id: int):
+        return [doc_id << OFFSET_BITS | offset for offset in word_offsets(self.keys[doc_id])]
+
+    def add(self, doc_id: int, name, popularity=None):
+        name = name or ""
+        popularity = self.popularity.get(doc_id, 0) if popularity is None else int(popularity)
+        old = self.names.get(doc_id)
+        if old == name:
+            self._set_popularity(doc_id, popularity)
+            return
+        if old is not None:
+            self.remove(doc_id)
+        key = normalize(name)
+        self.names[doc_id] = name
+        self.keys[doc_id] = name if key == name else key
+        if popularity:
+            self.popularity[doc_id] = popularity
+        if self._bulk:
+            self.entries.extend(self._entries_of(doc_id))
+            return
+        for entry in self._entries_of(doc_id):
+            insort(self.entries, entry, key=self._entry_key)
+        self._promote(doc_id)
+
+    def remove(self, doc_id: int):
+        if doc_id not in self.names:
+            return
+        self._demote(doc_id, removed=True)
+        for entry in self._entries_of(doc_id):
+            key = self._entry_key(entry)
+            i = bisect_left(self.entries, key, key=self._entry_key)
+            while self.entries[i] != entry:
+                i += 1
+            del self.entries[i]
+        del self.names[doc_id], self.keys[doc_id]
+        self.popularity.pop(doc_id, None)
+
+    def apply(self, key, value):
+        if isinstance(key, tuple):
+            _, doc_id = key
+            if doc_id in self.names and value:
+                self._set_popularity(doc_id, self.popularity.get(doc_id, 0) + value)
+        elif value is None:
+            self.remove(key)
+        else:
+            self.add(key, *value)
+
+    def _set_popularity(self, doc_id: int, popularity: int):
+        previous = self.popularity.get(doc_id, 0)
+        if popularity == previous:
+            return
+        if popularity:
+            self.popularity[doc_id] = popularity
+        else:
+            self.popularity.pop(doc_id, None)
+        if popularity > previous:
+            self._promote(doc_id)
+        else:
+            self._demote(doc_id)
+
+    def _tops_of(self, doc_id: int):
+        key = self.keys[doc_id]
+        for offset in word_offsets(key):
+            for bounds in covering_ranges(key[offset:]):
+                top = self.top.get(bounds)
+                if top is not None:
+                    yield top
+
+    def _promote(self, doc_id: int):
+        # 순위가 올라갔거나 새로 생김: 목록 마지막보다 앞이면 끼워 넣는다 (목록 밖의 것은 모두 마지막보다 뒤)
+        rank = self._rank(doc_id)
+        for top in self._tops_of(doc_id):
+            if doc_id in top:
+                top.remove(doc_id)
+            elif not top or rank > self._rank(top[-1]):
+                continue
+            top.append(doc_id)
+            top.sort(key=self._rank)
+            del top[TOP_KEEP:]
+
+    def _demote(self, doc_id: int, removed: bool = False):
+        # 순위가 내려감: 여전히 목록 마지막보다 앞이면 자리만 바꾸고, 아니면 빼 둔다 (목록이 짧아지면 다시 훑는다)
+        for top in self._tops_of(doc_id):
+            if doc_id not in top:
+                continue
+            top.remove(doc_id)
+            if not removed and top and self._rank(doc_id) < self._rank(top[-1]):
+                top.append(doc_id)
+                top.sort(key=self._rank)
+
+    def finish(self):
+        # 처음 만들 때: 한번 정렬하고, 큰 구간의 top-k 를 아래부터 합쳐서 만든다
+        self.entries = array("q", sorted(self.entries, key=self._entry_key))
+        self._bulk = False
+        self._collect(0, len(self.entries), "")
+
+    def _scan(self, lo: int, hi: int, k: int) -> list:
+        ids = {entry >> OFFSET_BITS for entry in self.entries[lo:hi]}
+        return heapq.nsmallest(k, ids, key=self._rank)
+
+    def _collect(self, lo: int, hi: int, prefix: str) -> list:
+        # entries[lo:hi] 는 모두 prefix 로 시작한다. 작으면 훑고, 크면 다음 글자별로 나눠 합친 뒤 기억해 둔다
+        if hi - lo <= SUGGEST_SCAN_LIMIT:
+            return self._scan(lo, hi, TOP_KEEP)
+        depth = len(prefix)
+        candidates = set()
+        groups = {}         # 한글 초성 / 받침 없는 음절 구간 -> [시작, 끝, 후보]
+        i = lo
+        while i < hi and len(self._entry_key(self.entries[i])) == depth:
+            candidates.add(self.entries[i] >> OFFSET_BITS)      # 이름이 prefix 로 끝나는 것
+            i += 1
+        while i < hi:
+            char = self._entry_key(self.entries[i])[depth]
+            end = bisect_left(self.entries, prefix + chr(ord(char) + 1), i, hi, key=self._entry_key)
+            child = self._collect(i, end, prefix + char)
+            candidates.update(child)
+            code = ord(char)
+            if HANGUL_FIRST <= code <= HANGUL_LAST:
+                offset = code - HANGUL_FIRST
+                for first, size in ((code - offset % SYLLABLES_PER_CHOSEONG, SYLLABLES_PER_CHOSEONG),
+                                    (code - offset % JONGSEONG_COUNT, JONGSEONG_COUNT)):
+                    group = groups.setdefault((prefix + chr(first), prefix + chr(first + size)), [i, end, set()])
+                    group[1] = end
+                    group[2].update(child)
+            i = end
+        for bounds, (start, end, ids) in groups.items():
+            if end - start > SUGGEST_SCAN_LIMIT:
+                self.top[bounds] = heapq.nsmallest(TOP_KEEP, ids, key=self._rank)
+        top = heapq.nsmallest(TOP_KEEP, candidates, key=self._rank)
+        if prefix:
+            self.top[(prefix, prefix + MAX_CHAR)] = top
+        return top
+
+    def search(self, prefix: str, limit: int = SUGGEST_TOP_K) -> list:
+        # [(id, 이름), ...] 인기순
+        prefix = normalize(prefix).lstrip()
+        if not prefix:
+            return []
+        bounds = prefix_range(prefix)
+        lo = bisect_left(self.entries, bounds[0], key=self._entry_key)
+        hi = bisect_left(self.entries, bounds[1], lo, key=self._entry_key)
+        if hi - lo <= SUGGEST_SCAN_LIMIT:
+            ids = self._scan(lo, hi, limit)
+        else:
+            top = self.top.get(bounds)
+            if top is None or len(top) < limit:
+                top = self.top[bounds] = self._scan(lo, hi, TOP_KEEP)
+            ids = top[:limit]
+        return [(doc_id, self.names[doc_id]) for doc_id in ids]
+
+    def stats(self) -> dict:
+        return {"documents": len(self.names), "entries": len(self.entries), "cached_prefixes": len(self.top)}
+
+
+def item_suggest_rows(db):
+    sold = (
+        select(OrderItem.item_id, func.sum(OrderItem.count).label("sold"))
+        .group_by(OrderItem.item_id)
+        .subquery()
+    )
+    stmt = select(Item.id, Item.name, func.coalesce(sold.c.sold, 0)).outerjoin(sold, sold.c.item_id == Item.id)
+    yield from db.execute(stmt.execution_options(stream_results=True, yield_per=BUILD_YIELD_PER))
+
+
+def category_suggest_rows(db):
+    # 카테고리 인기 = 바로 연결된 상품들의 판매 수량 합 (재생성 때만 다시 센다)
+    sold = (
+        select(CategoryItem.category_id, func.sum(OrderItem.count).label("sold"))
+        .join(OrderItem, OrderItem.item_id == CategoryItem.item_id)
+        .group_by(CategoryItem.category_id)
+        .subquery()
+    )
+    stmt = (
+        select(Category.id, Category.name, func.coalesce(sold.c.sold, 0))
+        .outerjoin(sold, sold.c.category_id == Category.id)
+    )
+    yield from db.execute(stmt.execution_options(stream_results=True, yield_per=BUILD_YIELD_PER))
+
+
+item_suggest = SearchIndex("item-suggest", item_suggest_rows, index_class=PrefixIndex)
+category_suggest = SearchIndex("category-suggest", category_suggest_rows, index_class=PrefixIndex)
+
+
+@event.listens_for(Item, "after_insert", propagate=True)
+@event.listens_for(Item, "after_update", propagate=True)
+def _stage_item(mapper, connection, target):
+    item_suggest.stage(object_session(target), target.id, (target.name,))
+
+
+@event.listens_for(Item, "after_delete", propagate=True)
+def _stage_item_delete(mapper, connection, target):
+    item_suggest.stage(object_session(target), target.id, None)
+
+
+@event.listens_for(Category, "after_insert")
+@event.listens_for(Category, "after_update")
+def _stage_category(mapper, connection, target):
+    category_suggest.stage(object_session(target), target.id, (target.name,))
+
+
+@event.listens_for(Category, "after_delete")
+def _stage_category_delete(mapper, connection, target):
+    category_suggest.stage(object_session(target), target.id, None)
+
+
+def _stage_sold(target, delta: int):
+    # 판매 수량 증감은 같은 세션 안에서 합쳐 두었다가 커밋되면 한번에.
+    # 다시 만드는 중에 커밋되면 새 색인에 한번 더 더해질 수 있다 (다음 재생성 때 맞춰진다)
+    pending = item_suggest.pending(object_session(target))
+    key = (SOLD, target.item_id)
+    pending[key] = pending.get(key, 0) + delta
+
+
+@event.listens_for(OrderItem, "after_insert")
+def _stage_order_item(mapper, connection, target):
+    _stage_sold(target, target.count)
+
+
+@event.listens_for(OrderItem, "after_delete")
+def _stage_order_item_delete(mapper, connection, target):
+    # 주문 취소는 주문을 지우면서 order_items 도 같이 지운다
+    _stage_sold(target, -target.count)
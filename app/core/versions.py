@@ -0,0 +1,204 @@
+import asyncio
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from db.session import SessionLocal
+from models.catalog_version import CatalogVersion, VERSIONED_TABLES
+
+load_dotenv()
+
+# 조회 API 의 ETag 재료가 되는 테이블 이름
+ITEMS = "items"
+CATEGORIES = "categories"
+CATEGORY_ITEMS = "category_items"
+
+PENDING_KEY = "pending_versions"
+BUMPED_KEY = "bumped_versions"
+
+# 다른 워커가 커밋한 쓰기가 이 워커의 ETag / 상품 캐시 / 트리 캐시에 보이기까지 걸리는 최대 시간
+VERSION_CACHE_SECONDS = float(os.getenv("VERSION_CACHE_SECONDS", "1"))
+
+_TABLE_NAMES = {table: CatalogVersion.names((table,)) for table in VERSIONED_TABLES}
+
+
+class VersionRegistry:
+    """테이블 / 행 단위 변경 카운터 (조건부 GET 의 ETag 용)
+
+    카운터는 DB 의 catalog_versions 표(models/catalog_version.py)에 있어서 모든 워커가 같은 값을 본다.
+    repository 가 쓰기를 하면서 touch() 로 세션에 표시해 두면 커밋 직전(before_commit) 같은 트랜잭션 안에서
+    카운터를 올린다. 롤백되면 카운터도 같이 되돌아간다.
+    읽을 때는 워커마다 전체 카운터를 SELECT 한번으로 가져와 VERSION_CACHE_SECONDS 동안 쓴다.
+    그래서 다른 워커의 쓰기는 최대 그만큼 늦게 보이고 (그 사이에는 옛 ETag 로 304 가 나갈 수 있다),
+    같은 워커의 쓰기는 커밋 직후 다시 읽는다.
+    이벤트 루프 위(비동기 라우트)에서는 DB 를 읽지 않고 들고 있는 값만 쓴다. 비동기 라우트는 먼저 refresh() 로
+    스레드풀에서 다시 읽어 둔다.
+    행 버전은 id % VERSION_BUCKETS 버킷 단위라 같은 버킷의 다른 행이 바뀌어도 올라간다 (덜 맞을 뿐 틀리지는 않는다).
+    """
+
+    def __init__(self, cache_seconds: float = VERSION_CACHE_SECONDS):
+        self.cache_seconds = cache_seconds
+        self.session_factory = SessionLocal
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()   # DB 에서 다시 읽는 건 한 스레드만
+        self._values = None                     # 이름 -> 버전
+        self._changed = {}                      # 이름 -> 바뀐 걸 본 시각
+        self._fresh_until = 0.0
+        self._generation = 0                    # 이 워커가 커밋할 때마다 +1 (읽는 도중 커밋되면 캐시하지 않게)
+
+    def touch(self, db: Session, table: str, *ids):
+        # 커밋되면 (ids 가 있으면) 그 행들의 버킷, 없으면 테이블 카운터를 올린다. 테이블 버전은 둘의 합
+        pending = db.info.setdefault(PENDING_KEY, set())
+        if ids:
+            pending.update(CatalogVersion.bucket(table, row_id) for row_id in ids)
+        else:
+            pending.add(table)
+
+    def bump(self, table: str, *ids):
+        # 요청 트랜잭션과 상관없이 바로 올린다
+        with self.session_factory() as db:
+            self.touch(db, table, *ids)
+            db.commit()
+
+    def reset(self):
+        # 다른 DB 를 보게 됐을 때 (테스트) 들고 있던 값을 버린다
+        with self._lock:
+            self._values = None
+            self._changed = {}
+            self._fresh_until = 0.0
+            self._generation += 1
+
+    def _committed(self, names):
+        now = time.monotonic()
+        with self._lock:
+            for name in names:
+                self._changed[name] = now
+            self._fresh_until = 0.0
+            self._generation += 1
+
+    def _stale(self) -> bool:
+        return self._values is None or time.monotonic() >= self._fresh_until
+
+    async def refresh(self):
+        # 비동기 라우트용: 오래됐으면 스레드풀에서 다시 읽어 둔다 (이벤트 루프를 막지 않게)
+        if self._stale():
+            await run_in_threadpool(self._current)
+
+    def _current(self) -> dict:
+        values = self._values
+        if values is not None and (time.monotonic() < self._fresh_until or _on_event_loop()):
+            return values
+        # 다른 스레드가 읽는 중이면 기다리지 않고 이전 값을 쓴다 (처음 한번만 기다린다)
+        if not self._refresh_lock.acquire(blocking=values is None):
+            return values
+        try:
+            with self._lock:
+                values, generation = self._values, self._generation
+                if values is not None and time.monotonic() < self._fresh_until:
+                    return values
+            started = time.monotonic()
+            with self.session_factory() as db:
+                loaded = CatalogVersion.read_all(db)
+            now = time.monotonic()
+            with self._lock:
+                previous = self._values
+                for name, version in loaded.items():
+                    if previous is None or previous.get(name) != version:
+                        self._changed[name] = now
+                self._values = loaded
+                if generation == self._generation:
+                    self._fresh_until = started + self.cache_seconds
+            return loaded
+        finally:
+            self._refresh_lock.release()
+
+    @staticmethod
+    def _names(tables=(), rows=()):
+        names = [name for table in tables for name in _TABLE_NAMES.get(table) or CatalogVersion.names((table,))]
+        return names + [CatalogVersion.bucket(table, row_id) for table, row_id in rows]
+
+    def table(self, table: str) -> int:
+        values = self._current()
+        return sum(values.get(name, 0) for name in self._names((table,)))
+
+    def row(self, table: str, row_id) -> int:
+        return self._current().get(CatalogVersion.bucket(table, row_id), 0)
+
+    def changed_within(self, seconds: float, tables=(), rows=()) -> bool:
+        # replica 가 아직 못 따라왔을 수 있는 최근 변경인지 (다른 워커의 변경은 이 워커가 본 시각 기준)
+        if seconds <= 0:
+            return False
+        self._current()
+        since = time.monotonic() - seconds
+        changed = self._changed
+        return any(changed.get(name, 0.0) > since for name in self._names(tables, rows))
+
+    def etag(self, tables=(), rows=(), settle: float = 0):
+        # settle 초 안에 바뀐 게 있으면 None (replica 에서 읽으면 옛 데이터에 새 ETag 가 붙을 수 있어서)
+        if self.changed_within(settle, tables, rows):
+            return None
+        values = self._current()
+        parts = [f"{t}.{sum(values.get(name, 0) for name in self._names((t,)))}" for t in tables]
+        parts += [f"{t}:{row_id}.{values.get(CatalogVersion.bucket(t, row_id), 0)}" for t, row_id in rows]
+        return f'W/"{"-".join(parts)}"'
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+versions = VersionRegistry()
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_pending(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        CatalogVersion.bump(session, pending)
+        session.info.setdefault(BUMPED_KEY, set()).update(pending)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_bumped(session):
+    bumped = session.info.pop(BUMPED_KEY, None)
+    if bumped:
+        versions._committed(bumped)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    # savepoint 롤백이면 바깥 트랜잭션 표시까지 버리면 안 된다 (덜 올리는 쪽이 위험)
+    if not previous_transaction.nested:
+        session.info.pop(PENDING_KEY, None)
+        session.info.pop(BUMPED_KEY, None)
+
+
+def etag_matches(request, etag: str) -> bool:
+    # If-None-Match 는 여러 개 / * / 약한 비교(W/) 가능
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def conditional(request, response, etag):
+    # If-None-Match 가 맞으면 304 응답을 반환, 아니면 response 에 ETag 를 달고 None
+    if etag is None:
+        return None
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
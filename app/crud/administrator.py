@@ -5,8 +5,7 @@ from models.administrator import Administrator
 class AdministratorRepository:
     def create(self, db: Session, admin: Administrator):
         db.add(admin)
-        db.commit()
-        db.refresh(admin)
+        db.flush()
         return admin
 
     def find_by_id(self, db: Session, admin_id: int):
@@ -29,13 +28,12 @@ class AdministratorRepository:
                 update_admin.password = update_content['password']
             if 'email' in update_content.keys():
                 update_admin.email = update_content['email']
-            db.commit()
-            db.refresh(update_admin)
+            db.flush()
         return update_admin
 
     def delete(self, db: Session, admin_id: int):
         db_admin = self.find_by_id(db, admin_id)
         if db_admin:
             db.delete(db_admin)
-            db.commit()
+            db.flush()
         return db_admin
@@ -0,0 +1,36 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.category_tree import category_tree_cache, build_snapshot
+from models.category import Category
+from models.category_item import CategoryItem
+
+
+class AsyncCategoryRepository:
+    async def find_by_id(self, db:AsyncSession, id:int):
+        return await db.get(Category, id)
+
+    async def find_all(self, db:AsyncSession):
+        return (await db.scalars(select(Category))).all()
+
+    async def find_tree(self, db:AsyncSession):
+        # 캐시 lock 을 잡은 채로 await 하면 이벤트 루프가 멈추므로, 만드는 건 lock 밖에서
+        snapshot = category_tree_cache.current()
+        if snapshot is None:
+            snapshot = await db.run_sync(build_snapshot, category_tree_cache.version)
+            category_tree_cache.store(snapshot)
+        return snapshot
+
+    async def find_by_ids(self, db:AsyncSession, ids) -> dict:
+        if not ids:
+            return {}
+        return {category.id: category for category in await db.scalars(select(Category).where(Category.id.in_(ids)))}
+
+    async def search_by_name(self, db:AsyncSession, keyword:str):
+        return (await db.scalars(select(Category).where(Category.name.contains(keyword)))).all()
+
+    async def find_by_item(self, db:AsyncSession, item_id:int):
+        stmt = select(Category).join(CategoryItem, CategoryItem.category_id == Category.id).where(
+            CategoryItem.item_id == item_id
+        )
+        return (await db.scalars(stmt)).all()
@@ -0,0 +1,47 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, joinedload
+
+from crud.item import AnyItem, item_page_select, item_like_select, item_categories_select, group_item_categories
+from models.category_item import CategoryItem
+from models.category_closure import CategoryClosure
+
+# 비동기 세션에서는 lazy loading 이 안되므로 카테고리까지 미리 같이 가져온다
+WITH_CATEGORIES = selectinload(AnyItem.category_items).joinedload(CategoryItem.category)
+
+
+class AsyncItemRepository:
+    async def find_by_id(self, db:AsyncSession, item_id:int):
+        stmt = select(AnyItem).options(WITH_CATEGORIES).where(AnyItem.id == item_id)
+        return (await db.scalars(stmt)).first()
+
+    async def find_all(self, db:AsyncSession):
+        return (await db.scalars(select(AnyItem).options(WITH_CATEGORIES))).all()
+
+    async def find_by_category(self, db:AsyncSession, category_id:int, item_type:str=None):
+        stmt = select(AnyItem).options(WITH_CATEGORIES).where(
+            AnyItem.id.in_(
+                select(CategoryItem.item_id).where(
+                    CategoryItem.category_id.in_(CategoryClosure.descendants_select(category_id))
+                )
+            )
+        )
+        if item_type:
+            stmt = stmt.where(AnyItem.type == item_type)
+        return (await db.scalars(stmt)).all()
+
+    async def find_page(self, db:AsyncSession, limit:int, **filters):
+        return (await db.scalars(item_page_select(limit, **filters))).all()
+
+    async def find_by_ids(self, db:AsyncSession, item_ids) -> dict:
+        if not item_ids:
+            return {}
+        return {item.id: item for item in await db.scalars(select(AnyItem).where(AnyItem.id.in_(item_ids)))}
+
+    async def search_like(self, db:AsyncSession, keyword:str, limit:int):
+        return (await db.scalars(item_like_select(keyword, limit))).all()
+
+    async def find_categories_by_item_ids(self, db:AsyncSession, item_ids):
+        if not item_ids:
+            return {}
+        return group_item_categories(item_ids, await db.execute(item_categories_select(item_ids)))
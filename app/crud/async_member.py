@@ -0,0 +1,35 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.member import Member
+
+
+class AsyncMemberRepository:
+    async def create(self, db:AsyncSession, member:Member):
+        db.add(member)
+        await db.commit()
+        return member
+
+    async def find_by_id(self, db:AsyncSession, member_id:int):
+        return await db.get(Member, member_id)
+
+    async def find_by_email(self, db:AsyncSession, email:str):
+        return (await db.scalars(select(Member).where(Member.email == email).limit(1))).first()
+
+    async def find_all(self, db:AsyncSession):
+        return (await db.scalars(select(Member))).all()
+
+    async def update(self, db:AsyncSession, member_id:int, update_content:dict):
+        updateMember = await self.find_by_id(db, member_id)
+        if updateMember:
+            for key in ("name", "password", "zip", "addr1", "addr2", "email"):
+                if key in update_content.keys():
+                    setattr(updateMember, key, update_content[key])
+            await db.commit()
+        return updateMember
+
+    async def delete(self, db:AsyncSession, member_id:int):
+        db_member = await self.find_by_id(db, member_id)
+        if db_member:
+            await db.delete(db_member)
+            await db.commit()
+        return db_member
@@ -0,0 +1,20 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, joinedload
+
+from crud.order import order_history_select
+from models.order import Order
+from models.order_item import OrderItem
+
+
+class AsyncOrderRepository:
+    async def find_by_member_id(self, db:AsyncSession, member_id:int):
+        stmt = (
+            select(Order)
+            .options(selectinload(Order.order_items).joinedload(OrderItem.item))
+            .where(Order.member_id == member_id)
+        )
+        return (await db.scalars(stmt)).all()
+
+    async def find_history(self, db:AsyncSession, member_id:int, limit:int, **filters):
+        return (await db.scalars(order_history_select(member_id, limit, **filters))).all()
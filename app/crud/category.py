@@ -1,12 +1,18 @@
+from sqlalchemy import select, and_
 from sqlalchemy.orm import Session
+from core.versions import versions, CATEGORIES, CATEGORY_ITEMS
 from models.category import Category
+from models.category_closure import CategoryClosure
+from models.category_item_count import CategoryItemCount
 
 
 class CategoryRepository:
     def create(self, db:Session, category:Category):
         db.add(category)
-        db.commit()
-        db.refresh(category)
+        db.flush()
+        CategoryClosure.add_node(db, category.id)
+        CategoryItemCount.add_node(db, category.id)
+        versions.touch(db, CATEGORIES)
         return category
 
     def find_by_name(self, db:Session, category_name:str):
@@ -15,6 +21,11 @@ class CategoryRepository:
     def find_by_id(self, db:Session, id:int):
         return db.query(Category).filter(Category.id==id).first()
 
+    def find_by_ids(self, db:Session, ids) -> dict:
+        if not ids:
+            return {}
+        return {category.id: category for category in db.query(Category).filter(Category.id.in_(ids))}
+
     def find_all(self, db:Session):
         return db.query(Category).all()
 
@@ -27,8 +38,8 @@ class CategoryRepository:
         if updateCategory:
             updateCategory.name = name
             updateCategory.description = des
-            db.commit()
-            db.refresh(updateCategory)
+            db.flush()
+            versions.touch(db, CATEGORIES)
         return updateCategory
 
 
@@ -36,10 +47,45 @@ class CategoryRepository:
         db_category = self.find_by_name(db, category_name)
         if not db_category:
             return False
+        ancestor_ids = CategoryClosure.ancestor_ids(db, db_category.id)
+        CategoryClosure.remove_node(db, db_category.id)
+        CategoryItemCount.remove_node(db, db_category.id)
         db.delete(db_category)
-        db.commit()
+        db.flush()
+        CategoryItemCount.recount(db, ancestor_ids)
+        versions.touch(db, CATEGORIES)
+        versions.touch(db, CATEGORY_ITEMS)
         return True
 
+    def find_ids_by_names(self, db:Session, names) -> dict:
+        # {name: id}, 같은 이름이 여러개면 먼저 만든 것
+        result = {}
+        rows = db.query(Category.name, Category.id).filter(Category.name.in_(names)).order_by(Category.id)
+        for name, category_id in rows:
+            result.setdefault(name, category_id)
+        return result
+
+    def find_descendant_ids(self, db:Session, category_id:int):     #자기 자신 포함
+        return CategoryClosure.descendant_ids(db, category_id)
+
+    def find_names_by_prefix(self, db:Session, prefix:str, limit:int):
+        stmt = select(Category.id, Category.name).where(Category.name.startswith(prefix, autoescape=True))
+        return db.execute(stmt.order_by(Category.id).limit(limit)).all()
+
+    def find_facets(self, db:Session):
+        # (id, name, parent_id, item_type, item_count) 카테고리당 상품이 있는 타입 수만큼 행
+        stmt = select(
+            Category.id, Category.name, Category.parent_id, CategoryItemCount.item_type, CategoryItemCount.item_count,
+        ).outerjoin(CategoryItemCount, and_(
+            CategoryItemCount.category_id == Category.id, CategoryItemCount.item_count > 0,
+        )).order_by(Category.id)
+        return db.execute(stmt).all()
+
+    def rebuild_facets(self, db:Session) -> int:
+        count = CategoryItemCount.rebuild(db)
+        versions.touch(db, CATEGORY_ITEMS)
+        return count
+
     def search_by_name(self, db: Session, keyword: str):
         return db.query(Category).filter(Category.name.contains(keyword)).all()
 
@@ -1,5 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import update, select, insert, delete, or_, and_, exists, tuple_, bindparam, func
+from sqlalchemy.orm import Session, with_polymorphic, selectinload, joinedload
 
+from core.versions import versions, ITEMS, CATEGORY_ITEMS
+from core.search_index import item_search, ITEM_SEARCH_FIELDS
+from core.suggest import item_suggest
 from crud.category import CategoryRepository
 from schemas.dto import ItemBaseModel
 from models.item.item import Item
@@ -8,26 +12,89 @@ from models.item.album import Album
 from models.item.movie import Movie
 from models.category import Category
 from models.category_item import CategoryItem
+from models.category_closure import CategoryClosure
+from models.category_item_count import CategoryItemCount
 from models.order import Order
 from models.order_item import OrderItem
 from models.member import Member
 cr= CategoryRepository()
 
+LINK_DELETE_CHUNK = 500     # (item_id, category_id) IN 한번에 넣는 쌍 수
+
+# 하위 타입 컬럼(author, artist, director ...)까지 한번에 가져오기 위한 polymorphic 엔티티
+AnyItem = with_polymorphic(Item, "*")
+
+def item_page_select(limit:int, sort:str="id", after:tuple=None, item_type:str=None,
+                     min_price:int=None, max_price:int=None, category_id:int=None):
+    # keyset 페이지네이션: OFFSET 없이 (id) 또는 (price, id) 다음 값부터 limit 개
+    stmt = select(AnyItem)
+    if item_type:
+        stmt = stmt.where(AnyItem.type == item_type)
+    if min_price is not None:
+        stmt = stmt.where(AnyItem.price >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(AnyItem.price <= max_price)
+    if category_id is not None:
+        stmt = stmt.where(exists().where(
+            CategoryItem.item_id == AnyItem.id,
+            CategoryItem.category_id.in_(CategoryClosure.descendants_select(category_id)),
+        ))
+
+    if sort == "price":
+        if after is not None:
+            last_price, last_id = after
+            stmt = stmt.where(or_(
+                AnyItem.price > last_price,
+                and_(AnyItem.price == last_price, AnyItem.id > last_id),
+            ))
+        stmt = stmt.order_by(AnyItem.price, AnyItem.id)
+    else:
+        if after is not None:
+            stmt = stmt.where(AnyItem.id > after[0])
+        stmt = stmt.order_by(AnyItem.id)
+    return stmt.limit(limit)
+
+
+def item_like_select(keyword:str, limit:int):
+    # 검색 색인이 아직 없을 때 쓰는 LIKE 검색 (이름 + 저자/가수/감독/배우)
+    columns = Item.__table__.c
+    return (
+        select(AnyItem)
+        .where(or_(*(columns[field].contains(keyword) for field in ("name",) + ITEM_SEARCH_FIELDS)))
+        .order_by(AnyItem.id)
+        .limit(limit)
+    )
+
+
+def item_categories_select(item_ids):
+    return (
+        select(CategoryItem.item_id, Category.id, Category.name)
+        .join(Category, Category.id == CategoryItem.category_id)
+        .where(CategoryItem.item_id.in_(item_ids))
+        .order_by(CategoryItem.id)
+    )
+
+
+def group_item_categories(item_ids, rows):
+    result = {item_id: [] for item_id in item_ids}
+    for item_id, ca_id, ca_name in rows:
+        result[item_id].append({"id": ca_id, "name": ca_name})
+    return result
+
+
 class ItemRepository:
     def get_self_and_descendants(self,db:Session, category_id: int):
-        temp = [category_id]
-        category = cr.find_by_id(db, category_id)
-        if category.children is not None:
-            for child in category.children:
-                temp.extend(self.get_self_and_descendants(db,child.id))
+        # closure table 한번 조회로 하위 카테고리 전체를 가져온다
+        temp = cr.find_descendant_ids(db, category_id)
+        if category_id not in temp:
+            temp.append(category_id)
         return temp
 
 
 
     def find_by_category(self, db:Session, category_id:int, item_type:str=None):
-        self_and_descendants_ids = self.get_self_and_descendants(db,category_id=category_id)
         query=db.query(Item).join(CategoryItem).filter(
-            CategoryItem.category_id.in_(self_and_descendants_ids)
+            CategoryItem.category_id.in_(CategoryClosure.descendants_select(category_id))
         )
         if item_type:
             query = query.filter(Item.type == item_type)     #카테고리뿐만 아니라 아이템 타입또한 고려해서 거름ㅇㅇ
@@ -35,15 +102,201 @@ class ItemRepository:
 
     def create(self, db:Session, item:Item):
         db.add(item)
-        db.commit()
-        db.refresh(item)
+        db.flush()
+        versions.touch(db, ITEMS, item.id)
         return item
 
     def find_by_id(self, db:Session, item_id:int):
         return db.query(Item).filter(Item.id==item_id).first()
 
+    def find_by_ids(self, db:Session, item_ids):
+        # IN (...) 한번으로 여러 상품을 가져와서 {id: item} 으로 반환
+        if not item_ids:
+            return {}
+        items = db.query(Item).filter(Item.id.in_(item_ids)).all()
+        return {item.id: item for item in items}
+
+    def find_names_by_prefix(self, db:Session, prefix:str, limit:int):
+        # [(id, name), ...] 자동완성 색인이 아직 없을 때
+        stmt = select(Item.id, Item.name).where(Item.name.startswith(prefix, autoescape=True)).order_by(Item.id)
+        return db.execute(stmt.limit(limit)).all()
+
+    def search_like(self, db:Session, keyword:str, limit:int):
+        return db.scalars(item_like_select(keyword, limit)).all()
+
     def find_all(self, db:Session):
-        return db.query(Item).all()
+        return (
+            db.query(AnyItem)
+            .options(selectinload(AnyItem.category_items).joinedload(CategoryItem.category))
+            .all()
+        )
+
+    def find_page(self, db:Session, limit:int, sort:str="id", after:tuple=None, item_type:str=None,
+                  min_price:int=None, max_price:int=None, category_id:int=None):
+        stmt = item_page_select(limit, sort=sort, after=after, item_type=item_type,
+                                min_price=min_price, max_price=max_price, category_id=category_id)
+        return db.scalars(stmt).all()
+
+    def find_categories_by_item_ids(self, db:Session, item_ids):
+        # 페이지에 들어있는 상품들의 카테고리를 한번에 -> {item_id: [{"id", "name"}, ...]}
+        if not item_ids:
+            return {}
+        return group_item_categories(item_ids, db.execute(item_categories_select(item_ids)))
+
+    def supports_bulk_returning(self, db:Session) -> bool:
+        # executemany + RETURNING 으로 새 id 를 돌려받을 수 있는지 (sqlite, postgres, mariadb O / mysql X)
+        return db.get_bind().dialect.insert_executemany_returning
+
+    def bulk_insert(self, db:Session, rows:list[dict], returning:bool=False):
+        # items 테이블에 executemany 한번. 행마다 같은 컬럼을 가져야 한다 (하위 타입 컬럼은 None 으로 채워서)
+        stmt = insert(Item.__table__)
+        if returning:
+            stmt = stmt.returning(Item.__table__.c.id, sort_by_parameter_order=True)
+            ids = db.execute(stmt, rows).scalars().all()
+            self._stage_inserted(db, ids, rows)
+            return ids
+        db.execute(stmt, rows)
+        versions.touch(db, ITEMS)
+        # 새 id 를 모르니 커밋되면 색인을 다시 만든다
+        item_search.invalidate(db)
+        item_suggest.invalidate(db)
+        return None
+
+    def bulk_insert_with_ids(self, db:Session, rows:list[dict]) -> list:
+        # RETURNING 이 없는 DB(mysql)에서 새 id 까지 필요할 때: executemany 한번 + 같은 트랜잭션 안에서 SELECT 한번
+        # 넣기 전 max(id) 보다 큰 행 중 (name, type) 이 같은 것을 id 순서대로 넣은 순서에 맞춘다
+        # (같은 트랜잭션의 읽기라 그 사이 다른 트랜잭션이 넣은 행은 보이지 않는다)
+        after = db.scalar(select(func.max(Item.id))) or 0
+        db.execute(insert(Item.__table__), rows)
+        found = db.execute(
+            select(Item.id, Item.name, Item.type)
+            .where(Item.id > after, Item.name.in_({row["name"] for row in rows}))
+            .order_by(Item.id)
+        ).all()
+        ids, position = [], 0
+        for row in rows:
+            while (found[position].name, found[position].type) != (row["name"], row["type"]):
+                position += 1
+            ids.append(found[position].id)
+            position += 1
+        self._stage_inserted(db, ids, rows)
+        return ids
+
+    @staticmethod
+    def _stage_inserted(db:Session, ids:list, rows:list[dict]):
+        versions.touch(db, ITEMS, *ids)
+        for item_id, row in zip(ids, rows):
+            item_search.stage(db, item_id, (row["name"], tuple(row.get(field) for field in ITEM_SEARCH_FIELDS)))
+            item_suggest.stage(db, item_id, (row["name"],))
+
+    def find_types_for_update(self, db:Session, item_ids) -> dict:
+        # {id: type}. 연결을 바꾸는 동안 같은 상품의 다른 연결 변경을 막는다 (facet 수 계산이 엇갈리지 않게)
+        if not item_ids:
+            return {}
+        stmt = select(Item.id, Item.type).where(Item.id.in_(item_ids)).with_for_update()
+        return dict(db.execute(stmt).all())
+
+    def bulk_link_categories(self, db:Session, links:list[dict], types:dict | None = None):
+        # [{"item_id", "category_id"}, ...] 이미 있는 연결은 unique 제약으로 건너뛴다
+        links = list({(link["item_id"], link["category_id"]): link for link in links}.values())
+        if not links:
+            return
+        item_ids = {link["item_id"] for link in links}
+        if types is None:
+            types = self.find_types_for_update(db, item_ids)
+        before = CategoryItemCount.links_of(db, item_ids)
+        after = {item_id: set(category_ids) for item_id, category_ids in before.items()}
+        for link in links:
+            after.setdefault(link["item_id"], set()).add(link["category_id"])
+        # 수 행을 연결 INSERT 보다 먼저 잠근다 (recount 와 같은 잠금 순서, CategoryItemCount 참고)
+        CategoryItemCount.relink(db, [(types[i], before[i], after[i]) for i in item_ids if i in types])
+        stmt = insert(CategoryItem.__table__).prefix_with("OR IGNORE", dialect="sqlite").prefix_with("IGNORE", dialect="mysql")
+        db.execute(stmt, links)
+        versions.touch(db, CATEGORY_ITEMS)
+        versions.touch(db, ITEMS, *item_ids)
+
+    def bulk_unlink_categories(self, db:Session, pairs, types:dict | None = None):
+        # [(item_id, category_id), ...] 를 (item_id, category_id) IN (...) 로 나눠서 지운다
+        pairs = list(set(pairs))
+        if not pairs:
+            return
+        item_ids = {item_id for item_id, _ in pairs}
+        if types is None:
+            types = self.find_types_for_update(db, item_ids)
+        before = CategoryItemCount.links_of(db, item_ids)
+        after = {item_id: set(category_ids) for item_id, category_ids in before.items()}
+        for item_id, category_id in pairs:
+            after[item_id].discard(category_id)
+        CategoryItemCount.relink(db, [(types[i], before[i], after[i]) for i in item_ids if i in types])
+        for start in range(0, len(pairs), LINK_DELETE_CHUNK):
+            db.execute(delete(CategoryItem).where(
+                tuple_(CategoryItem.item_id, CategoryItem.category_id).in_(pairs[start:start + LINK_DELETE_CHUNK])
+            ).execution_options(synchronize_session=False))
+        versions.touch(db, CATEGORY_ITEMS)
+        versions.touch(db, ITEMS, *item_ids)
+
+    def decrease_stock(self, db:Session, item_id:int, count:int) -> bool:
+        # 조건부 UPDATE 한번으로 확인+차감 -> 동시 주문에서도 재고가 음수가 되거나 덮어써지지 않음
+        # 다른 사람이 결제 대기로 잡아 둔 수량(reserved)은 건드리지 않는다
+        if count <= 0:
+            return False
+        result = db.execute(
+            update(Item)
+            .where(Item.id == item_id, Item.stock - Item.reserved >= count)
+            .values(stock=Item.stock - count)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return False
+        versions.touch(db, ITEMS, item_id)
+        return True
+
+    def reserve_stock(self, db:Session, item_id:int, count:int) -> bool:
+        # 판매 가능 수량(stock - reserved) 안에서만 잡는다. decrease_stock 과 같은 조건부 UPDATE
+        result = db.execute(
+            update(Item)
+            .where(Item.id == item_id, Item.stock - Item.reserved >= count)
+            .values(reserved=Item.reserved + count)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return False
+        versions.touch(db, ITEMS, item_id)
+        return True
+
+    def release_reserved(self, db:Session, counts:dict):
+        # {item_id: 수량} 잡아 둔 수량을 돌려준다. item_id 순서로 (잠금 순서를 주문/결제와 같게)
+        if not counts:
+            return
+        db.execute(
+            update(Item.__table__)
+            .where(Item.id == bindparam("item_id"))
+            .values(reserved=Item.reserved - bindparam("count")),
+            [{"item_id": item_id, "count": counts[item_id]} for item_id in sorted(counts)],
+        )
+        versions.touch(db, ITEMS, *counts)
+
+    def commit_reserved(self, db:Session, item_id:int, count:int) -> bool:
+        # 잡아 둔 수량을 실제 재고에서 뺀다 (관리자가 그 사이 재고를 줄였으면 실패)
+        result = db.execute(
+            update(Item)
+            .where(Item.id == item_id, Item.stock >= count, Item.reserved >= count)
+            .values(stock=Item.stock - count, reserved=Item.reserved - count)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return False
+        versions.touch(db, ITEMS, item_id)
+        return True
+
+    def increase_stock(self, db:Session, item_id:int, count:int):
+        db.execute(
+            update(Item)
+            .where(Item.id == item_id)
+            .values(stock=Item.stock + count)
+            .execution_options(synchronize_session=False)
+        )
+        versions.touch(db, ITEMS, item_id)
 
     def update(self, db:Session, item_id:int, update_content:ItemBaseModel):
         #update_content 는 name, price, stock_quantity, addr1, addr2 이렇게 구성
@@ -54,14 +307,18 @@ class ItemRepository:
             updateItem.price = update_content.price
             if update_content.image_url is not None:
                 updateItem.image_url = update_content.image_url
-            db.commit()
-            db.refresh(updateItem)
+            db.flush()
+            versions.touch(db, ITEMS, item_id)
         return updateItem
 
 
     def delete(self, db: Session, item_id: int):
-        db_item = self.find_by_id(db, item_id)
+        # 연결 변경과 마찬가지로 상품을 먼저 잠근다 (facet 수를 같이 고치므로)
+        db_item = db.query(Item).filter(Item.id == item_id).with_for_update().populate_existing().first()
         if db_item:
+            if db_item.reserved:
+                # stock_holds 가 상품을 가리키고 있다 (지우면 FK 오류)
+                raise ValueError("결제 대기 중인 수량이 있는 상품은 삭제할 수 없습니다.")
             # 삭제 전에 반환할 데이터 저장
             result = {
                 "id": db_item.id,
@@ -84,7 +341,11 @@ class ItemRepository:
             if hasattr(db_item, 'actor') and db_item.actor is not None:
                 result["actor"] = db_item.actor
 
+            category_ids = CategoryItemCount.links_of(db, [item_id])[item_id]
+            CategoryItemCount.relink(db, [(db_item.type, category_ids, set())])
             db.delete(db_item)
-            db.commit()
+            db.flush()
+            versions.touch(db, ITEMS, item_id)
+            versions.touch(db, CATEGORY_ITEMS)
             return result
         return None
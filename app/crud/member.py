@@ -6,8 +6,7 @@ from models.member import Member
 class MemberRepository:
     def create(self, db:Session, member:Member):
         db.add(member)
-        db.commit()
-        db.refresh(member)
+        db.flush()
         return member
 
     def find_by_id(self, db:Session, member_id:int):
@@ -34,8 +33,7 @@ class MemberRepository:
                 updateMember.addr2 = update_content['addr2']
             if 'email' in update_content.keys():
                 updateMember.email=update_content['email']
-            db.commit()
-            db.refresh(updateMember)
+            db.flush()
         return updateMember
 
 
@@ -43,5 +41,5 @@ class MemberRepository:
         db_member = self.find_by_id(db, member_id)
         if db_member:
             db.delete(db_member)
-            db.commit()
+            db.flush()
         return db_member
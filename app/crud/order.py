@@ -1,19 +1,49 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_, select
+from sqlalchemy.orm import Session, selectinload, joinedload
 from models.order import Order
+from models.order_item import OrderItem
+
+
+def order_history_select(member_id:int, limit:int, before:tuple=None, date_from=None, date_to=None):
+    # 최신순 (order_date, id) keyset 페이지네이션, ix_orders_member_id_order_date 인덱스 사용
+    stmt = (
+        select(Order)
+        .options(selectinload(Order.order_items).joinedload(OrderItem.item))
+        .where(Order.member_id == member_id)
+    )
+    if date_from is not None:
+        stmt = stmt.where(Order.order_date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(Order.order_date < date_to)
+    if before is not None:
+        last_date, last_id = before
+        stmt = stmt.where(or_(
+            Order.order_date < last_date,
+            and_(Order.order_date == last_date, Order.id < last_id),
+        ))
+    return stmt.order_by(Order.order_date.desc(), Order.id.desc()).limit(limit)
 
 
 class OrderRepository:
     def create(self, db:Session, order:Order):
         db.add(order)
-        db.commit()
-        db.refresh(order)
+        db.flush()
         return order
 
     def find_by_id(self, db:Session, order_id:int):
         return db.query(Order).filter(Order.id==order_id).first()
 
     def find_by_member_id(self, db:Session, member_id:int):
-        return db.query(Order).filter(Order.member_id == member_id).all()
+        return (
+            db.query(Order)
+            .options(selectinload(Order.order_items).joinedload(OrderItem.item))
+            .filter(Order.member_id == member_id)
+            .all()
+        )
+
+    def find_history(self, db:Session, member_id:int, limit:int, before:tuple=None, date_from=None, date_to=None):
+        stmt = order_history_select(member_id, limit, before=before, date_from=date_from, date_to=date_to)
+        return db.scalars(stmt).all()
 
     def update(self, db:Session, order_id:int, update_content:dict):
         #update_content 는 name, password, zip, addr1, addr2 이렇게 구성
@@ -23,8 +53,7 @@ class OrderRepository:
         if 'order_date' in update_content.keys():
             updateOrder.order_date = update_content['order_date']
 
-        db.commit()
-        db.refresh(updateOrder)
+        db.flush()
         return updateOrder
 
 
@@ -33,5 +62,5 @@ class OrderRepository:
         if not db_order:
             return False
         db.delete(db_order)
-        db.commit()
+        db.flush()
         return True
@@ -0,0 +1,32 @@
+from sqlalchemy import select, delete, insert
+from sqlalchemy.orm import Session
+from models.stock_hold import StockHold
+
+
+class StockHoldRepository:
+    def create_many(self, db:Session, holds:list[dict]):
+        # [{"checkout_id", "member_id", "item_id", "count", "expires_at"}, ...] executemany 한번
+        if holds:
+            db.execute(insert(StockHold.__table__), holds)
+
+    def find_by_checkout_for_update(self, db:Session, checkout_id:str):
+        stmt = (
+            select(StockHold).where(StockHold.checkout_id == checkout_id)
+            .order_by(StockHold.item_id).with_for_update()
+        )
+        return list(db.scalars(stmt))
+
+    def find_expired_for_update(self, db:Session, now, limit:int, item_id:int | None = None):
+        # 확정/해제 중이라 잠긴 hold 는 건너뛴다 -> 여러 워커의 정리 작업이 서로 기다리지 않는다
+        stmt = select(StockHold).where(StockHold.expires_at <= now)
+        if item_id is not None:
+            stmt = stmt.where(StockHold.item_id == item_id)
+        stmt = stmt.order_by(StockHold.expires_at).limit(limit).with_for_update(skip_locked=True)
+        return list(db.scalars(stmt))
+
+    def delete(self, db:Session, holds):
+        if holds:
+            db.execute(
+                delete(StockHold).where(StockHold.id.in_([hold.id for hold in holds]))
+                .execution_options(synchronize_session=False)
+            )
@@ -0,0 +1,35 @@
+import os
+from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from db.session import SQLALCHEMY_DATABASE_URL
+from db.pool_metrics import engine_options, register_engine
+
+load_dotenv()
+
+# DB_ASYNC=true 일 때만 main.py 에서 import 된다 (aiomysql / aiosqlite + greenlet 필요)
+ASYNC_DRIVERS = {
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(SQLALCHEMY_DATABASE_URL))
+
+# async 엔진은 전용 풀 클래스(AsyncAdaptedQueuePool)를 쓰므로 크기 관련 설정만 같이 쓴다
+_options = engine_options(ASYNC_DATABASE_URL)
+_options.pop("poolclass", None)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_options)
+register_engine("async", async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
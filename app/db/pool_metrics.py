@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+load_dotenv()
+
+# 커넥션 체크아웃 대기시간 히스토그램 구간 (ms, 누적 아님)
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))     # MySQL wait_timeout(기본 8시간)보다 짧게
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.overflow_connects = 0
+        self.peak_checked_out = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe_checkout(self, seconds: float, checked_out: int):
+        ms = seconds * 1000
+        index = len(WAIT_BUCKETS_MS)
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_buckets[index] += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            buckets = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+            buckets["inf"] = self.wait_buckets[-1]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "overflow_connects": self.overflow_connects,
+                "peak_checked_out": self.peak_checked_out,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_histogram": buckets,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """체크아웃 대기시간 / 타임아웃을 재는 QueuePool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _create_connection(self):
+        # pool_size 를 넘어서 새로 여는 커넥션 = overflow
+        self.metrics.count("connects")
+        if self.overflow() > 0:
+            self.metrics.count("overflow_connects")
+        return super()._create_connection()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.count("timeouts")
+            raise
+        self.metrics.observe_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
+
+
+def engine_options(url: str) -> dict:
+    # sqlite 메모리 DB 는 SingletonThreadPool 을 써야해서 풀 설정을 건드리지 않는다
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith("sqlite:")):
+        return {}
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+    }
+
+
+_engines = {}
+
+
+def register_engine(name: str, engine):
+    _engines[name] = engine
+
+
+def pool_stats() -> dict:
+    result = {}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        stats = {"pool_class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        if isinstance(pool, InstrumentedQueuePool):
+            stats.update(pool.metrics.snapshot())
+        result[name] = stats
+    return result
@@ -0,0 +1,169 @@
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+# dev 면 응답 헤더로 쿼리 수 / DB 시간을 내려준다 (운영은 /metrics/queries 로만)
+APP_ENV = os.getenv("APP_ENV", "production")
+# 같은 모양의 쿼리가 요청 하나에서 이 횟수 이상 나오면 N+1 로 본다
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+# IN (?, ?, ?) 처럼 값 개수만 다른 쿼리는 같은 모양으로 친다
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s)\s*,)+\s*(?:\?|%s|%\(\w+\)s)\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("(?...)", _SPACES.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """요청 하나(또는 count_queries 블록 하나) 동안 실행된 쿼리 기록"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list:
+        # [(쿼리 모양, 횟수)] 많이 나온 순
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    @property
+    def milliseconds(self) -> float:
+        return round(self.seconds * 1000, 3)
+
+
+_current: ContextVar = ContextVar("query_stats", default=None)
+_captures = []      # count_queries() 로 잡고 있는 수집기들 (스레드/요청 상관없이 전부 기록)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    for capture in _captures:
+        capture.record(statement, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # 실패한 쿼리는 after_cursor_execute 가 안 불리므로 시작 시각만 치운다
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+@contextmanager
+def track_queries():
+    # 현재 컨텍스트(요청)에서 실행되는 쿼리만 기록. 동기 엔드포인트는 스레드풀에서 돌지만 컨텍스트가 복사되어 같이 잡힌다
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def count_queries():
+    # 어느 스레드에서 실행되든 블록 안의 쿼리를 전부 기록 (TestClient 는 앱을 다른 스레드에서 돌린다)
+    stats = QueryStats()
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+
+class QueryMetrics:
+    """라우트별 누적 쿼리 수 / DB 시간 / N+1 발생 횟수"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route: str, stats: QueryStats):
+        repeated = stats.repeated()
+        with self._lock:
+            m = self._routes.setdefault(route, {
+                "requests": 0, "queries": 0, "queries_max": 0, "db_time_ms": 0.0,
+                "n_plus_one_requests": 0, "last_repeated": None,
+            })
+            m["requests"] += 1
+            m["queries"] += stats.count
+            m["queries_max"] = max(m["queries_max"], stats.count)
+            m["db_time_ms"] += stats.seconds * 1000
+            if repeated:
+                shape, n = repeated[0]
+                m["n_plus_one_requests"] += 1
+                m["last_repeated"] = {"statement": shape[:300], "count": n}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                route: dict(
+                    m,
+                    db_time_ms=round(m["db_time_ms"], 3),
+                    queries_avg=round(m["queries"] / m["requests"], 2),
+                )
+                for route, m in self._routes.items()
+            }
+
+
+query_metrics = QueryMetrics()
+
+
+class QueryStatsMiddleware:
+    """요청마다 쿼리 수 / DB 시간 / 반복 쿼리를 모은다 (순수 ASGI 미들웨어)
+
+    headers=True 면 X-DB-Query-Count, X-DB-Time-Ms, X-DB-Repeated-Queries 헤더를 붙인다.
+    """
+
+    def __init__(self, app, headers: bool = False):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with track_queries() as stats:
+            async def send_with_stats(message):
+                if self.headers and message["type"] == "http.response.start":
+                    repeated = stats.repeated()
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-time-ms", str(stats.milliseconds).encode()),
+                        (b"x-db-repeated-queries", str(sum(n for _, n in repeated)).encode()),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                # 라우팅 후 scope 에 route 가 들어있으면 /item/show/{id} 같은 템플릿으로 묶는다
+                route = scope.get("route")
+                path = getattr(route, "path", None) or "unmatched"
+                query_metrics.observe(f"{scope['method']} {path}", stats)
@@ -0,0 +1,86 @@
+import os
+import random
+import time
+
+from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+
+from db.pool_metrics import engine_options, register_engine
+from db.session import engine, SessionLocal
+
+load_dotenv()
+
+# 쉼표로 구분한 읽기 전용 replica 주소들. 비어 있으면 조회도 primary 로 간다
+REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# 쓰기 요청 후 이 시간(초) 동안은 같은 클라이언트의 조회를 primary 에서 읽는다 (read-your-writes)
+READ_AFTER_WRITE_SECONDS = float(os.getenv("DB_READ_AFTER_WRITE_SECONDS", "5"))
+LAST_WRITE_COOKIE = "last_write_at"
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+replica_engines = []
+for i, url in enumerate(REPLICA_URLS):
+    replica_engines.append(create_engine(url, **engine_options(url)))
+    register_engine(f"replica-{i}", replica_engines[-1])
+
+
+class RoutingSession(Session):
+    """조회는 replica 중 하나로, flush / insert·update·delete 는 primary 로 보내는 세션
+
+    한 번이라도 쓰기가 일어나면 그 뒤의 조회도 primary 에 고정한다.
+    """
+
+    def __init__(self, primary=None, replicas=(), **kwargs):
+        super().__init__(**kwargs)
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.pinned = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.pinned = True
+        if self.pinned or not self.replicas:
+            return self.primary
+        return random.choice(self.replicas)
+
+
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession, primary=engine, replicas=replica_engines,
+    autocommit=False, autoflush=False, expire_on_commit=False,
+)
+
+
+def replicas_enabled() -> bool:
+    return bool(replica_engines)
+
+
+def replica_lag_seconds() -> float:
+    # 쓰기 직후 replica 가 뒤처져 있을 수 있는 시간 (replica 가 없으면 0)
+    return READ_AFTER_WRITE_SECONDS if replica_engines else 0
+
+
+def wrote_recently(request: Request) -> bool:
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, 0))
+    except ValueError:
+        return False
+    return time.time() - last_write < READ_AFTER_WRITE_SECONDS
+
+
+def mark_write(response):
+    # 쓰기 응답에 시각을 남겨두면 다음 조회가 replica 지연을 피해 primary 로 간다
+    response.set_cookie(
+        LAST_WRITE_COOKIE, f"{time.time():.3f}",
+        max_age=max(1, int(READ_AFTER_WRITE_SECONDS)), httponly=True, samesite="lax",
+    )
+
+
+def get_read_db(request: Request):
+    # 목록/상세 조회용. 방금 쓰기를 한 클라이언트면 primary 세션을 준다
+    db = SessionLocal() if wrote_recently(request) else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
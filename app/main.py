@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
@@ -6,18 +7,48 @@ from api.member_api import router as memberRouter
 from api.item_api import router as itemRouter
 from api.order_api import router as orderRouter
 from api.category_api import router as CategoryRouter
+from api.metrics_api import router as MetricsRouter
 from fastapi.middleware.cors import CORSMiddleware
+from db.session import DB_ASYNC
+from db.routing import READ_METHODS, replicas_enabled, mark_write
+from db.query_stats import APP_ENV, QueryStatsMiddleware
+from core.stock_holds import hold_sweeper
 
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # 만료된 결제 대기 재고 정리 (워커마다)
+    hold_sweeper.start()
+    yield
+    hold_sweeper.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+if DB_ASYNC:
+    # 같은 경로는 먼저 등록된 라우트가 처리 -> 회원/조회 API 는 AsyncSession 버전이 받는다
+    from api.async_member_api import router as AsyncMemberRouter
+    from api.async_read_api import item_router, category_router, order_router
+    app.include_router(AsyncMemberRouter)
+    app.include_router(item_router)
+    app.include_router(category_router)
+    app.include_router(order_router)
+
 app.include_router(memberRouter)
 app.include_router(itemRouter)
 app.include_router(orderRouter)
 app.include_router(CategoryRouter)
+app.include_router(MetricsRouter)
+
+@app.middleware("http")
+async def read_your_writes(request, call_next):
+    # 쓰기에 성공한 클라이언트는 잠시 동안 조회도 primary 로 (db/routing.py)
+    response = await call_next(request)
+    if replicas_enabled() and request.method not in READ_METHODS and response.status_code < 400:
+        mark_write(response)
+    return response
 
 @app.get("/")
 def root():
@@ -25,6 +56,9 @@ def root():
 
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
 
+# 요청별 쿼리 수 / DB 시간 / N+1 감지 (dev 는 응답 헤더, 운영은 /metrics/queries)
+app.add_middleware(QueryStatsMiddleware, headers=APP_ENV == "dev")
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, select, update, insert, bindparam, event
+from sqlalchemy.orm import Session
+from db.session import Base
+
+# 행 버전은 id % VERSION_BUCKETS 로 묶어서 센다 (행마다 두면 표가 상품 수만큼 커지므로)
+VERSION_BUCKETS = 64
+# 카운터를 두는 테이블 (core/versions.py 의 ITEMS / CATEGORIES / CATEGORY_ITEMS)
+VERSIONED_TABLES = ("items", "categories", "category_items")
+
+
+class CatalogVersion(Base):
+    """조회 API ETag 용 변경 카운터 (core/versions.py). 모든 워커가 같은 값을 본다.
+
+    테이블마다 "items" 같은 테이블 행 하나와 "items#0" ~ "items#63" 버킷 행을 미리 만들어 두고
+    쓰기 트랜잭션 안에서 UPDATE version = version + 1 만 한다.
+    """
+    __tablename__ = "catalog_versions"
+
+    name = Column(String(40), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    @staticmethod
+    def bucket(table: str, row_id) -> str:
+        return f"{table}#{row_id % VERSION_BUCKETS}"
+
+    @classmethod
+    def names(cls, tables) -> list:
+        return [name for table in tables for name in (table, *(cls.bucket(table, b) for b in range(VERSION_BUCKETS)))]
+
+    @classmethod
+    def seed(cls, connection):
+        connection.execute(insert(cls.__table__), [{"name": name, "version": 0} for name in cls.names(VERSIONED_TABLES)])
+
+    @classmethod
+    def bump(cls, db: Session, names):
+        # 이름 순서대로 잠가야 동시에 여러 행을 올리는 트랜잭션끼리 데드락이 안 난다
+        db.execute(
+            update(cls.__table__).where(cls.name == bindparam("n")).values(version=cls.version + 1),
+            [{"n": name} for name in sorted(names)],
+        )
+
+    @classmethod
+    def read_all(cls, db: Session) -> dict:
+        return dict(db.execute(select(cls.name, cls.version)).all())
+
+
+@event.listens_for(CatalogVersion.__table__, "after_create")
+def _seed(target, connection, **kw):
+    # create_all 로 만든 DB (테스트 / 벤치마크) 에도 미리 행을 넣어 둔다. 운영 DB 는 마이그레이션이 넣는다
+    CatalogVersion.seed(connection)
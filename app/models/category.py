@@ -1,6 +1,8 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy.orm import relationship, backref, object_session
 from db.session import Base
+from models.category_closure import CategoryClosure
+from models.category_item_count import CategoryItemCount
 
 class Category(Base):
     __tablename__ = "categories"
@@ -25,6 +27,10 @@ class Category(Base):
 
 
     def has_ancestor(self, category:"Category"):
+        db = object_session(self)
+        if db is not None and self.id is not None and category.id is not None:
+            return CategoryClosure.is_ancestor(db, ancestor_id=category.id, descendant_id=self.id)
+
         current = self.parent
         while current is not None:
             if current==category:
@@ -38,6 +44,7 @@ class Category(Base):
         if self.has_ancestor(child):
             raise ValueError("circular structure occurred")
 
+        self._move_closure(child, self)
         self.children.append(child)
 
     def add_parent(self, parent:"Category"):
@@ -45,6 +52,16 @@ class Category(Base):
             raise ValueError("자기 자신을 부모로 선택할수 없습니다.")
         if parent.has_ancestor(self):
             raise ValueError("순환 구조 발생!")
+        self._move_closure(self, parent)
         self.parent= parent
 
+    @staticmethod
+    def _move_closure(node:"Category", parent:"Category"):
+        db = object_session(node) or object_session(parent)
+        if db is not None and node.id is not None and parent.id is not None:
+            old_ancestors = CategoryClosure.ancestor_ids(db, node.id)
+            CategoryClosure.move_subtree(db, node.id, parent.id)
+            # 옮긴 서브트리의 상품이 빠지거나 들어오는 조상들만 다시 센다
+            CategoryItemCount.recount(db, set(old_ancestors) | set(CategoryClosure.ancestor_ids(db, node.id)))
+
 
@@ -0,0 +1,88 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index, select, delete, insert, literal, true
+from sqlalchemy.orm import Session, aliased
+from db.session import Base
+
+
+class CategoryClosure(Base):
+    """카테고리 트리의 조상/자손 쌍을 모두 저장하는 closure table.
+
+    자기 자신과의 쌍(depth=0)도 저장하므로 ancestor_id 로 한번만 조회하면
+    해당 카테고리 + 모든 하위 카테고리를 얻을 수 있다.
+    """
+    __tablename__ = "category_closure"
+    __table_args__ = (
+        Index("ix_category_closure_descendant", "descendant_id", "ancestor_id"),
+    )
+
+    ancestor_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False, default=0)
+
+    @classmethod
+    def add_node(cls, db: Session, category_id: int):
+        db.execute(insert(cls).values(ancestor_id=category_id, descendant_id=category_id, depth=0))
+
+    @classmethod
+    def descendants_select(cls, category_id: int):
+        return select(cls.descendant_id).where(cls.ancestor_id == category_id)
+
+    @classmethod
+    def descendant_ids(cls, db: Session, category_id: int):
+        return list(db.scalars(cls.descendants_select(category_id)))
+
+    @classmethod
+    def ancestor_ids(cls, db: Session, category_id: int):     #자기 자신 제외
+        return list(db.scalars(select(cls.ancestor_id).where(cls.descendant_id == category_id, cls.depth > 0)))
+
+    @classmethod
+    def is_ancestor(cls, db: Session, ancestor_id: int, descendant_id: int) -> bool:
+        stmt = select(literal(1)).where(
+            cls.ancestor_id == ancestor_id,
+            cls.descendant_id == descendant_id,
+            cls.depth > 0,
+        ).limit(1)
+        return db.execute(stmt).first() is not None
+
+    @classmethod
+    def detach_subtree(cls, db: Session, category_id: int):
+        # 서브트리(자기 포함)와 기존 조상들 사이의 연결만 끊는다. 서브트리 내부 연결은 유지
+        subtree_ids = cls.descendant_ids(db, category_id)
+        ancestor_ids = cls.ancestor_ids(db, category_id)
+        if subtree_ids and ancestor_ids:
+            db.execute(delete(cls).where(
+                cls.descendant_id.in_(subtree_ids),
+                cls.ancestor_id.in_(ancestor_ids),
+            ))
+
+    @classmethod
+    def attach_subtree(cls, db: Session, category_id: int, parent_id: int):
+        # parent 의 모든 조상(자기 포함) x category 의 모든 자손(자기 포함)
+        supertree = aliased(cls)
+        subtree = aliased(cls)
+        rows = select(
+            supertree.ancestor_id,
+            subtree.descendant_id,
+            supertree.depth + subtree.depth + 1,
+        ).select_from(supertree).join(subtree, true()).where(
+            supertree.descendant_id == parent_id,
+            subtree.ancestor_id == category_id,
+        )
+        db.execute(insert(cls).from_select(["ancestor_id", "descendant_id", "depth"], rows))
+
+    @classmethod
+    def move_subtree(cls, db: Session, category_id: int, parent_id: int | None):
+        cls.detach_subtree(db, category_id)
+        if parent_id is not None:
+            cls.attach_subtree(db, category_id, parent_id)
+
+    @classmethod
+    def remove_node(cls, db: Session, category_id: int):
+        # 삭제되는 카테고리의 자식들은 parent_id 가 NULL 이 되어 최상위로 올라간다
+        child_ids = list(db.scalars(
+            select(cls.descendant_id).where(cls.ancestor_id == category_id, cls.depth == 1)
+        ))
+        for child_id in child_ids:
+            cls.detach_subtree(db, child_id)
+        db.execute(delete(cls).where(
+            (cls.ancestor_id == category_id) | (cls.descendant_id == category_id)
+        ))
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from db.session import Base
 
 class CategoryItem(Base):
     __tablename__ = "category_items"
+    __table_args__ = (
+        UniqueConstraint("item_id", "category_id", name="uq_category_items_item_category"),     # 같은 연결 중복 금지
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
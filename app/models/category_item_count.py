@@ -0,0 +1,162 @@
+from collections import Counter, defaultdict
+
+from sqlalchemy import Column, Integer, String, ForeignKey, select, delete, update, insert, func, bindparam
+from sqlalchemy.orm import Session
+from db.session import Base
+from models.category_closure import CategoryClosure
+from models.category_item import CategoryItem
+from models.item.item import Item
+
+
+class CategoryItemCount(Base):
+    """카테고리별(하위 카테고리 포함) 상품 수를 Item.type 별로 미리 세어 둔 표 (facet).
+
+    한 상품이 같은 서브트리의 여러 카테고리에 연결돼 있어도 조상 카테고리에서는 한번만 센다.
+    연결/해제, 상품 삭제, 트리 이동 때 같은 트랜잭션 안에서 바뀐 조상들만 고친다.
+    잠금 순서: 연결을 바꾸는 쪽은 상품 -> 기존 연결(공유) -> 수 행 -> 연결 INSERT/DELETE,
+    다시 세는 쪽은 수 행 -> 연결(공유) 순서라 서로 기다려도 데드락 없이 한쪽이 끝난 뒤 최신 값을 본다.
+    """
+    __tablename__ = "category_item_counts"
+
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    item_type = Column(String(20), primary_key=True)
+    item_count = Column(Integer, nullable=False, default=0)
+
+    @staticmethod
+    def item_types():
+        return sorted(Item.__mapper__.polymorphic_map)
+
+    @classmethod
+    def add_node(cls, db: Session, category_id: int):
+        # 타입별 0 행을 미리 만들어 두면 이후에는 UPDATE 만 하면 된다
+        db.execute(insert(cls), [
+            {"category_id": category_id, "item_type": item_type, "item_count": 0}
+            for item_type in cls.item_types()
+        ])
+
+    @classmethod
+    def remove_node(cls, db: Session, category_id: int):
+        db.execute(delete(cls).where(cls.category_id == category_id))
+
+    @classmethod
+    def links_of(cls, db: Session, item_ids) -> dict:
+        # {item_id: {category_id, ...}}. 수를 고치기 직전에 읽으므로 잠그는 읽기로
+        # (스냅샷이 아니라 최신 커밋 값을 보고, 끝날 때까지 다른 트랜잭션이 그 연결을 못 바꾼다)
+        # 공유 잠금이라 recount 의 집계와는 서로 막지 않는다
+        result = defaultdict(set)
+        if item_ids:
+            rows = db.execute(
+                select(CategoryItem.item_id, CategoryItem.category_id)
+                .where(CategoryItem.item_id.in_(item_ids)).with_for_update(read=True)
+            )
+            for item_id, category_id in rows:
+                result[item_id].add(category_id)
+        return result
+
+    @classmethod
+    def relink(cls, db: Session, changes):
+        """[(item_type, 이전 카테고리 ids, 이후 카테고리 ids), ...] 만큼 조상 카테고리 수를 고친다."""
+        changes = [(item_type, set(before), set(after)) for item_type, before, after in changes if before != after]
+        if not changes:
+            return
+        category_ids = set().union(*(before | after for _, before, after in changes))
+        ancestors = defaultdict(set)
+        rows = db.execute(
+            select(CategoryClosure.descendant_id, CategoryClosure.ancestor_id)
+            .where(CategoryClosure.descendant_id.in_(category_ids))
+        )
+        for descendant_id, ancestor_id in rows:
+            ancestors[descendant_id].add(ancestor_id)
+
+        deltas = Counter()
+        for item_type, before, after in changes:
+            old = set().union(*(ancestors[c] for c in before))
+            new = set().union(*(ancestors[c] for c in after))
+            for category_id in new - old:
+                deltas[category_id, item_type] += 1
+            for category_id in old - new:
+                deltas[category_id, item_type] -= 1
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        cls._ensure_rows(db, deltas)
+        db.execute(
+            update(cls.__table__)
+            .where(cls.category_id == bindparam("c"), cls.item_type == bindparam("t"))
+            .values(item_count=cls.item_count + bindparam("d")),
+            [{"c": c, "t": t, "d": d} for (c, t), d in sorted(deltas.items())],
+        )
+
+    @classmethod
+    def _aggregate(cls, db: Session, ancestor_ids=None, lock: bool = False) -> dict:
+        # {(category_id, item_type): 서브트리의 서로 다른 상품 수}
+        # lock 이면 잠그는 읽기 (mysql REPEATABLE READ 에서 트랜잭션 스냅샷이 아니라 최신 커밋된 연결을 센다)
+        stmt = (
+            select(CategoryClosure.ancestor_id, Item.type, func.count(func.distinct(Item.id)))
+            .join(CategoryItem, CategoryItem.category_id == CategoryClosure.descendant_id)
+            .join(Item, Item.id == CategoryItem.item_id)
+            .group_by(CategoryClosure.ancestor_id, Item.type)
+        )
+        if ancestor_ids is not None:
+            stmt = stmt.where(CategoryClosure.ancestor_id.in_(ancestor_ids))
+        if lock:
+            stmt = stmt.with_for_update(read=True)
+        return {(category_id, item_type): count for category_id, item_type, count in db.execute(stmt)}
+
+    @classmethod
+    def recount(cls, db: Session, category_ids):
+        # 트리 이동처럼 어떤 상품이 빠지고 들어오는지 알기 어려운 경우: 해당 조상들만 다시 센다
+        category_ids = list(category_ids)
+        if not category_ids:
+            return
+        # 절대값으로 덮어쓰므로 세는 동안 relink 의 +d 가 끼어들면 사라진다 -> 수 행을 먼저 잠근다
+        cls._lock_rows(db, category_ids)
+        counts = cls._aggregate(db, category_ids, lock=True)
+        db.execute(update(cls).where(cls.category_id.in_(category_ids)).values(item_count=0))
+        cls._store(db, counts)
+
+    @classmethod
+    def rebuild(cls, db: Session) -> int:
+        # 전체를 집계 쿼리 한번으로 다시 만든다
+        category_ids = list(db.scalars(select(CategoryClosure.ancestor_id).where(CategoryClosure.depth == 0)))
+        cls._lock_rows(db)
+        counts = cls._aggregate(db, lock=True)
+        db.execute(delete(cls))
+        for start in range(0, len(category_ids), 1000):
+            db.execute(insert(cls), [
+                {"category_id": category_id, "item_type": item_type, "item_count": 0}
+                for category_id in category_ids[start:start + 1000] for item_type in cls.item_types()
+            ])
+        cls._store(db, counts)
+        return len(category_ids)
+
+    @classmethod
+    def _lock_rows(cls, db: Session, category_ids=None):
+        # relink 의 UPDATE 와 같은 (category_id, item_type) 순서로 잠근다
+        stmt = select(cls.category_id).order_by(cls.category_id, cls.item_type).with_for_update()
+        if category_ids is not None:
+            stmt = stmt.where(cls.category_id.in_(category_ids))
+        db.execute(stmt).all()
+
+    @classmethod
+    def _store(cls, db: Session, counts: dict):
+        if not counts:
+            return
+        cls._ensure_rows(db, counts)
+        db.execute(
+            update(cls.__table__)
+            .where(cls.category_id == bindparam("c"), cls.item_type == bindparam("t"))
+            .values(item_count=bindparam("n")),
+            [{"c": c, "t": t, "n": n} for (c, t), n in counts.items()],
+        )
+
+    @classmethod
+    def _ensure_rows(cls, db: Session, keys):
+        # 미리 만든 타입 행이 없는 경우(새 타입, 이전에 만든 카테고리)만 0 으로 추가
+        category_ids = {category_id for category_id, _ in keys}
+        existing = {tuple(row) for row in db.execute(
+            select(cls.category_id, cls.item_type).where(cls.category_id.in_(category_ids))
+        )}
+        missing = [key for key in keys if key not in existing]
+        if missing:
+            db.execute(insert(cls), [{"category_id": c, "item_type": t, "item_count": 0} for c, t in missing])
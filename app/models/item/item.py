@@ -1,14 +1,18 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from sqlalchemy.orm import relationship
 from db.session import Base
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        Index("ix_items_price_id", "price", "id"),      # (price, id) keyset 페이지네이션용
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     price = Column(Integer, default=0)
     stock = Column(Integer, default=0)
+    reserved = Column(Integer, nullable=False, default=0, server_default="0")    # 아직 주문 안 된 결제 대기(hold) 수량 합
     type = Column(String(20))
     image_url = Column(String(255),nullable=True)
 
@@ -28,6 +32,10 @@ class Item(Base):
         back_populates="item"
     )
 
+    @property
+    def available(self):        # 판매 가능 수량 = 재고 - 결제 대기 중인 수량
+        return (self.stock or 0) - (self.reserved or 0)
+
     def remove_stock(self, count:int):
         rest_stock = self.stock - count
         if rest_stock < 0:
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer,ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer,ForeignKey, Enum, DateTime, Index
 from sqlalchemy.orm import relationship
 from db.session import Base
 from models.member import Member
@@ -13,7 +13,10 @@ from models.status.order_status import  OrderStatus
 
 class Order(Base):
     __tablename__ = "orders"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_orders_member_id_order_date", "member_id", "order_date"),   # 회원별 주문내역 최신순 조회용
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     total_price = Column(Integer, default=0)
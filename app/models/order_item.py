@@ -16,7 +16,8 @@ class OrderItem(Base):
     order_id = Column(Integer, ForeignKey("orders.id"))
     order = relationship("Order", back_populates="order_items")
 
-#생성 메서드 -> order 의 total price 업데이트,  item의 개수 줄이기 (확인하면서)
+#생성 메서드 -> order 의 total price 업데이트
+#재고 차감은 ItemRepository.decrease_stock 에서 DB 에 조건부 UPDATE 로 먼저 처리한다
     @classmethod
     def create_order_item(cls, order, item, count):
         order_item = cls(
@@ -24,10 +25,6 @@ class OrderItem(Base):
             item=item,
             count=count
         )
-        if item.stock >= count:
-            item.stock -= count
-            order.total_price += count * item.price
-            return order_item
-        else:
-            return None
+        order.total_price += count * item.price
+        return order_item
 
@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from db.session import Base
+
+
+class StockHold(Base):
+    """결제 시작(checkout) 때 잡아 두는 재고. 만료 전에 확정하면 주문이 되고, 아니면 풀린다.
+
+    잡은 수량은 items.reserved 에도 더해 두므로 판매 가능 수량은 stock - reserved 한번으로 계산된다.
+    """
+    __tablename__ = "stock_holds"
+    __table_args__ = (
+        Index("ix_stock_holds_expires_at", "expires_at"),      # 만료된 hold 정리용
+    )
+
+    id = Column(Integer, primary_key=True)
+    checkout_id = Column(String(32), nullable=False, index=True)
+    member_id = Column(Integer, ForeignKey("members.id"), nullable=False)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+    expires_at = Column(DateTime, nullable=False)
@@ -35,6 +35,13 @@ class BookBaseModel(ItemBaseModel):
     isbn: int
 
 
+# ============ Category Models ============
+
+class CategoryLinkModel(BaseModel):
+    item_id: int
+    ca_name: str
+
+
 # ============ Member Models ============
 
 class MemberBaseModel(BaseModel):
@@ -79,3 +86,13 @@ class OrderBaseModel(BaseModel):
     addr1: str
     addr2: str
     items: list[Item_count]
+
+
+class CheckoutBaseModel(BaseModel):
+    items: list[Item_count]
+
+
+class CheckoutConfirmModel(BaseModel):
+    zip: str
+    addr1: str
+    addr2: str
@@ -0,0 +1,132 @@
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel
+
+# 조회 API 응답 모양 (OpenAPI 문서용).
+# 라우트는 api/serializers.py 로 미리 만든 JSON bytes 를 바로 돌려주므로 응답 때 검증/변환은 하지 않는다.
+
+# ============ Category Views ============
+
+class CategoryRefView(BaseModel):
+    id: int
+    name: str
+
+
+class CategoryView(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    parent_id: Optional[int] = None
+
+
+class CategoryFacetView(BaseModel):
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+    total: int                      # 하위 카테고리 포함, 서로 다른 상품 수
+    types: Dict[str, int]           # {"BOOK": 3, ...} 0 인 타입은 빠진다
+
+
+class CategoryLinkResultView(BaseModel):
+    item_id: int
+    ca_name: str
+    status: str     # linked / exists / unlinked / not_linked / item_not_found / category_not_found
+
+
+class CategoryLinkReportView(BaseModel):
+    counts: Dict[str, int]          # status 별 쌍 수
+    results: List[CategoryLinkResultView]
+
+
+# ============ Item Views ============
+
+class ItemView(BaseModel):
+    id: int
+    name: str
+    price: int
+    stock: int
+    available: Optional[int] = None     # stock - 결제 대기 중인 수량
+    type: Optional[str] = None
+    image_url: Optional[str] = None
+    categories: Optional[List[CategoryRefView]] = None
+
+
+class BookView(ItemView):
+    author: Optional[str] = None
+    isbn: Optional[int] = None
+
+
+class AlbumView(ItemView):
+    artist: Optional[str] = None
+    etc: Optional[str] = None
+
+
+class MovieView(ItemView):
+    director: Optional[str] = None
+    actor: Optional[str] = None
+
+
+AnyItemView = Union[BookView, AlbumView, MovieView, ItemView]
+
+
+class ItemPageView(BaseModel):
+    items: List[AnyItemView]
+    next_cursor: Optional[str] = None
+
+
+class ItemSearchView(BaseModel):
+    items: List[AnyItemView]
+    total: Optional[int] = None     # 색인이 준비되기 전(LIKE 검색)에는 None
+
+
+class SuggestionView(BaseModel):
+    id: int
+    name: str
+
+
+class SuggestView(BaseModel):
+    items: List[SuggestionView]
+    categories: List[SuggestionView]
+
+
+# ============ Member Views ============
+
+class MemberView(BaseModel):
+    id: int
+    name: str
+    email: str
+    zip: Optional[str] = None
+    addr1: Optional[str] = None
+    addr2: Optional[str] = None
+
+
+# ============ Order Views ============
+
+class OrderItemView(BaseModel):
+    item_id: int
+    count: int
+    item_name: str
+
+
+class OrderView(BaseModel):
+    id: int
+    total_price: int
+    order_date: str
+    status: str
+    member_id: int
+    order_items: List[OrderItemView]
+
+
+class OrderHistoryView(BaseModel):
+    orders: List[OrderView]
+    next_cursor: Optional[str] = None
+
+
+class CheckoutItemView(BaseModel):
+    item_id: int
+    count: int
+
+
+class CheckoutView(BaseModel):
+    checkout_id: str
+    expires_at: str         # 이 시각까지 confirm 해야 주문이 된다
+    items: List[CheckoutItemView]
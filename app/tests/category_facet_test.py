@@ -0,0 +1,100 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from main import app
+from models.category_item_count import CategoryItemCount
+from models.item.album import Album
+from models.item.book import Book
+from models.item.movie import Movie
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def shop(sqlite_app):
+    Session = sqlite_app(
+        Book(name="반지의 제왕", price=1000, stock=10, author="a", isbn=1),
+        Book(name="호빗", price=1000, stock=10, author="a", isbn=2),
+        Album(name="OST", price=1000, stock=10, artist="b"),
+        Movie(name="반지의 제왕 영화", price=1000, stock=10, director="c", actor="d"),
+    )
+    for name in ("도서", "소설", "판타지", "음반"):
+        assert client.post("/category/create", json={"name": name, "des": name}).status_code == 200
+    client.patch("/category/add_child", json={"ca_name": "도서", "child_name": "소설"})
+    client.patch("/category/add_child", json={"ca_name": "소설", "child_name": "판타지"})
+    return Session
+
+
+def facets():
+    return {facet["name"]: (facet["total"], facet["types"]) for facet in client.get("/category/facets").json()}
+
+
+def assert_matches_rebuild(Session):
+    # 조금씩 고친 값이 처음부터 다시 센 값과 같아야 한다
+    with Session() as db:
+        expected = CategoryItemCount._aggregate(db)
+        stored = {(row.category_id, row.item_type): row.item_count for row in db.query(CategoryItemCount)}
+    assert {key: count for key, count in stored.items() if count} == expected
+
+
+def connect(item_id, ca_name):
+    assert client.patch("/category/connect", json={"item_id": item_id, "ca_name": ca_name}).json() is True
+
+
+def test_facets_roll_up_and_follow_changes(shop):
+    connect(1, "소설")
+    connect(1, "판타지")             # 같은 서브트리에 두번 연결돼도 조상에서는 하나
+    connect(2, "판타지")
+    connect(3, "판타지")
+    connect(3, "음반")
+    connect(4, "도서")
+    assert facets() == {
+        "도서": (4, {"BOOK": 2, "ALBUM": 1, "MOVIE": 1}),
+        "소설": (3, {"BOOK": 2, "ALBUM": 1}),
+        "판타지": (3, {"BOOK": 2, "ALBUM": 1}),
+        "음반": (1, {"ALBUM": 1}),
+    }
+    assert_matches_rebuild(shop)
+
+    # 연결 해제 / 상품 삭제
+    client.patch("/category/disconnect", json={"item_id": 1, "ca_name": "판타지"})
+    assert facets()["도서"] == (4, {"BOOK": 2, "ALBUM": 1, "MOVIE": 1})
+    assert facets()["판타지"] == (2, {"BOOK": 1, "ALBUM": 1})
+    assert client.delete("/item/delete/2").status_code == 200
+    assert facets()["소설"] == (2, {"BOOK": 1, "ALBUM": 1})
+    assert_matches_rebuild(shop)
+
+    # 트리 이동: 판타지를 음반 아래로
+    client.patch("/category/add_parent", json={"ca_name": "판타지", "parent_name": "음반"})
+    result = facets()
+    assert result["도서"] == (2, {"BOOK": 1, "MOVIE": 1})
+    assert result["음반"] == (1, {"ALBUM": 1})
+    assert_matches_rebuild(shop)
+
+    # 한번에 다시 만들어도 같다 + ETag 가 바뀐다
+    etag = client.get("/category/facets").headers["ETag"]
+    assert client.post("/category/facets/rebuild").json() == {"categories": 4}
+    assert facets() == result
+    assert client.get("/category/facets", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_recount_locks_count_rows_before_counting(shop):
+    # 다시 세는 동안 relink 의 +d 가 끼어들어 덮어써지지 않게, 수 행 잠금이 집계보다 먼저
+    connect(1, "판타지")
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = shop.kw["bind"]
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        client.patch("/category/add_child", json={"ca_name": "음반", "child_name": "판타지"})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    lock = next(i for i, s in enumerate(statements) if s.startswith("SELECT category_item_counts.category_id"))
+    count = next(i for i, s in enumerate(statements) if "count(distinct" in s)
+    assert lock < count
+    assert facets()["음반"] == (1, {"BOOK": 1})
+    assert_matches_rebuild(shop)
@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from db.query_stats import count_queries
+from main import app
+from models.category_item import CategoryItem
+from models.item.book import Book
+
+client = TestClient(app)
+BOOKS = 40
+
+
+@pytest.fixture
+def shop(sqlite_app):
+    Session = sqlite_app(*(Book(name=f"book-{i}", price=1000, stock=10, author="a", isbn=i) for i in range(BOOKS)))
+    for name in ("소설", "판타지"):
+        client.post("/category/create", json={"name": name, "des": name})
+    client.patch("/category/add_child", json={"ca_name": "소설", "child_name": "판타지"})
+    return Session
+
+
+def statuses(response):
+    return [result["status"] for result in response.json()["results"]]
+
+
+def test_bulk_link_and_unlink(shop):
+    assert client.patch("/category/connect", json={"item_id": 1, "ca_name": "판타지"}).json() is True
+    pairs = [
+        {"item_id": 1, "ca_name": "판타지"},        # 이미 연결됨
+        {"item_id": 2, "ca_name": "판타지"},
+        {"item_id": 2, "ca_name": "판타지"},        # 요청 안에서 중복
+        {"item_id": 2, "ca_name": "소설"},
+        {"item_id": 999, "ca_name": "소설"},
+        {"item_id": 3, "ca_name": "없는카테고리"},
+    ]
+    response = client.patch("/category/connect/bulk", json=pairs)
+    assert statuses(response) == ["exists", "linked", "exists", "linked", "item_not_found", "category_not_found"]
+    assert response.json()["counts"] == {"exists": 2, "linked": 2, "item_not_found": 1, "category_not_found": 1}
+    facets = {facet["name"]: facet["total"] for facet in client.get("/category/facets").json()}
+    assert facets == {"소설": 2, "판타지": 2}
+
+    response = client.patch("/category/disconnect/bulk", json=[
+        {"item_id": 2, "ca_name": "판타지"}, {"item_id": 2, "ca_name": "판타지"}, {"item_id": 3, "ca_name": "소설"},
+    ])
+    assert statuses(response) == ["unlinked", "not_linked", "not_linked"]
+    facets = {facet["name"]: facet["total"] for facet in client.get("/category/facets").json()}
+    assert facets == {"소설": 2, "판타지": 1}       # 2번은 소설에 직접 연결돼 있다
+    assert client.patch("/category/disconnect", json={"item_id": 2, "ca_name": "판타지"}).json() is False
+
+    with shop() as db:
+        db.add(CategoryItem(item_id=1, category_id=2))
+        with pytest.raises(IntegrityError):
+            db.commit()
+
+
+def test_bulk_link_query_count_does_not_grow(shop):
+    # 쌍이 많아져도 쿼리 수는 그대로 (이름/id/기존 연결 확인을 IN 으로 한번에)
+    def run(item_ids):
+        with count_queries() as stats:
+            response = client.patch("/category/connect/bulk",
+                                    json=[{"item_id": i, "ca_name": "소설"} for i in item_ids])
+        assert set(statuses(response)) == {"linked"}
+        return stats.count
+
+    assert run(range(1, 3)) == run(range(3, BOOKS + 1))
+
+
+def test_item_lock_comes_first(shop):
+    # mysql 에서는 첫 SELECT 가 스냅샷 시점이 되므로 상품 잠금(FOR UPDATE)이 가장 먼저 나가야 한다
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = shop.kw["bind"]
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        client.patch("/category/connect/bulk", json=[{"item_id": 1, "ca_name": "소설"}])
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements[0].startswith("SELECT items.id, items.type")
@@ -0,0 +1,38 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from core.versions import versions, CATEGORIES
+from main import app
+from models.catalog_version import CatalogVersion
+from models.category import Category
+from models.category_closure import CategoryClosure
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def seeded(sqlite_app):
+    Session = sqlite_app()
+    with Session() as db:
+        category = Category(name="cat-0", description="")
+        db.add(category)
+        db.flush()
+        CategoryClosure.add_node(db, category.id)
+        db.commit()
+    return Session
+
+
+def test_category_tree_follows_other_workers(seeded, monkeypatch):
+    monkeypatch.setattr(versions, "cache_seconds", 0.2)
+    versions.reset()
+    assert client.get("/category/show/all").json()[0]["name"] == "cat-0"
+    # 다른 워커가 이름을 바꾸고 커밋: DB 의 카운터만 올라간다
+    with seeded() as db:
+        db.execute(update(Category).where(Category.id == 1).values(name="renamed"))
+        CatalogVersion.bump(db, [CATEGORIES])
+        db.commit()
+    time.sleep(0.3)
+    assert client.get("/category/show/all").json()[0]["name"] == "renamed"
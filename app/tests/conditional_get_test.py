@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from api.async_read_api import item_router, category_router
+from core.versions import versions, ITEMS, _on_event_loop
+from crud.item import ItemRepository
+from db.async_session import get_async_db
+from db.query_stats import count_queries
+from main import app
+from models.catalog_version import CatalogVersion
+from models.item.book import Book
+from models.member import Member
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def seeded(sqlite_app):
+    return sqlite_app(Book(name="b1", price=1000, stock=10, author="a", isbn=1),
+                      Book(name="b2", price=2000, stock=10, author="a", isbn=2),
+                      Member(name="m", email="m@test.com", password="x", zip="1", addr1="a", addr2="b"))
+
+
+def get(url, etag=None):
+    return client.get(url, headers={"If-None-Match": etag} if etag else {})
+
+
+def test_not_modified_without_touching_the_database(seeded):
+    etag = get("/item/show/all").headers["etag"]
+    with count_queries() as stats:
+        response = get("/item/show/all", etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert stats.count == 0
+
+
+def test_writes_change_only_affected_etags(seeded):
+    b1, b2 = get("/item/show/1").headers["etag"], get("/item/show/2").headers["etag"]
+    listing = get("/item/show/all").headers["etag"]
+    tree = get("/category/show/all").headers["etag"]
+
+    # 주문으로 재고가 바뀌면 그 상품과 목록만
+    order = {"zip": "1", "addr1": "a", "addr2": "b", "items": [{"item_id": 1, "count": 1}]}
+    assert client.post("/order/create/1", json=order).status_code == 200
+    assert get("/item/show/1", b1).status_code == 200
+    assert get("/item/show/2", b2).status_code == 304
+    assert get("/item/show/all", listing).status_code == 200
+    assert get("/category/show/all", tree).status_code == 304
+
+    client.post("/category/create", json={"name": "c", "des": ""})
+    assert get("/category/show/all", tree).status_code == 200
+    assert get("/item/show/2", b2).status_code == 200      # 상품 응답에 카테고리 이름이 들어가므로
+
+
+def test_rolled_back_writes_do_not_bump(seeded):
+    before = versions.row(ITEMS, 1)
+    with seeded() as db:
+        assert ItemRepository().decrease_stock(db, 1, 1)
+        db.rollback()
+        db.commit()
+    assert versions.row(ITEMS, 1) == before
+
+
+def test_other_workers_writes_show_up_after_cache_seconds(seeded, monkeypatch):
+    monkeypatch.setattr(versions, "cache_seconds", 0.2)
+    etag = get("/item/show/1").headers["etag"]
+    # 다른 워커의 커밋: 카운터는 DB 에서만 올라가고 이 워커의 after_commit 은 안 불린다
+    with seeded() as db:
+        CatalogVersion.bump(db, [CatalogVersion.bucket(ITEMS, 1)])
+        db.commit()
+    assert get("/item/show/1", etag).status_code == 304      # 캐시해 둔 카운터로는 아직 모른다
+    time.sleep(0.3)
+    assert get("/item/show/1", etag).status_code == 200
+    assert get("/item/show/2").headers["etag"] != get("/item/show/1").headers["etag"]
+
+
+@pytest.fixture
+def async_client(seeded):
+    # DB_ASYNC=true 일 때 쓰는 조회 라우터만 올린 앱
+    engine = create_async_engine(str(seeded.kw["bind"].url).replace("sqlite://", "sqlite+aiosqlite://"))
+    AsyncSession = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def session():
+        async with AsyncSession() as db:
+            yield db
+
+    async_app = FastAPI()
+    async_app.include_router(item_router)
+    async_app.include_router(category_router)
+    async_app.dependency_overrides[get_async_db] = session
+    yield TestClient(async_app)
+    asyncio.run(engine.dispose())
+
+
+def test_async_read_routes_send_the_same_etags(async_client):
+    # DB_ASYNC=true 일 때 쓰는 조회 라우터도 sync 라우터와 같은 ETag / 304
+    for url in ("/item/show/page", "/item/show/by-category/1", "/category/show/all/flat"):
+        etag = get(url).headers["etag"]
+        response = async_client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304, url
+
+
+def test_async_read_routes_refresh_versions_off_the_loop(seeded, async_client, monkeypatch):
+    # 버전 카운터 SELECT 가 이벤트 루프 스레드에서 돌면 안 된다
+    monkeypatch.setattr(versions, "cache_seconds", 0)
+    on_loop = []
+
+    def record(conn, cursor, statement, *args):
+        if "catalog_versions" in statement:
+            on_loop.append(_on_event_loop())
+
+    engine = seeded.kw["bind"]
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for url in ("/item/show/all", "/item/show/1", "/category/show/all", "/category/show/all/flat"):
+            versions.reset()
+            assert async_client.get(url).headers["etag"] == get(url).headers["etag"], url
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert on_loop and not any(on_loop)
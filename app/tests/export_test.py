@@ -0,0 +1,59 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import core.export_service as export_service
+from db.session import Base
+from main import app
+from models.item.album import Album
+from models.item.book import Book
+from models.member import Member
+from models.order import Order
+from models.order_item import OrderItem
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def seeded(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/export.db")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        book = Book(name="책", price=1000, stock=1, author="저자", isbn=7)
+        album = Album(name="앨범", price=2000, stock=2, artist="가수", etc="한정판")
+        member = Member(name="m", email="m@test.com", password="x", zip="1", addr1="a", addr2="b")
+        order = Order(member=member, total_price=3000)
+        order.order_items = [OrderItem(item=book, count=1), OrderItem(item=album, count=1)]
+        db.add_all([book, album, Order(member=member, total_price=0), order])
+        db.commit()
+    # 내보내기는 자기 세션을 generator 안에서 연다
+    monkeypatch.setattr(export_service, "ReadSessionLocal", Session)
+    yield
+    engine.dispose()
+
+
+def test_item_export_ndjson_gzip(seeded):
+    response = client.get("/item/export?gzip=true")
+    assert response.headers["content-type"] == "application/gzip"
+    docs = [json.loads(line) for line in gzip.decompress(response.content).decode().splitlines()]
+    assert docs[0] == {"id": 1, "type": "BOOK", "name": "책", "price": 1000, "stock": 1, "image_url": None,
+                       "author": "저자", "isbn": 7}
+    assert docs[1]["artist"] == "가수" and "author" not in docs[1]
+
+
+def test_order_export_groups_line_items(seeded):
+    docs = [json.loads(line) for line in client.get("/order/export").text.splitlines()]
+    assert sorted(len(doc["order_items"]) for doc in docs) == [0, 2]
+    full = next(doc for doc in docs if doc["order_items"])
+    assert full["order_items"][1] == {"item_id": 2, "item_name": "앨범", "count": 1}
+
+    rows = list(csv.DictReader(io.StringIO(client.get("/order/export?format=csv").text)))
+    assert len(rows) == 3       # 주문상품 한 줄에 한 행, 빈 주문도 한 행
+    assert sum(row["order_id"] == str(full["id"]) for row in rows) == 2
@@ -0,0 +1,37 @@
+import io
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.image_store import image_store
+from main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_store, "directory", str(tmp_path))
+    monkeypatch.setattr(image_store, "max_bytes", 1024 * 1024)
+    return tmp_path
+
+
+def upload(name, data):
+    return client.post("/item/upload/image", files={"file": (name, io.BytesIO(data), "image/png")})
+
+
+def test_same_image_is_stored_once(store):
+    data = os.urandom(300 * 1024)
+    first = upload("a.png", data).json()
+    second = upload("b.PNG", data).json()
+
+    assert first["created"] is True
+    assert second == {"url": first["url"], "created": False}
+    assert os.listdir(store) == [first["url"].rsplit("/", 1)[1]]
+
+
+def test_too_large_image_is_rejected(store):
+    response = upload("big.png", os.urandom(1024 * 1024 + 1))
+    assert response.status_code == 413
+    assert os.listdir(store) == []
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import struct
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import api.item_api as item_api
+from core.image_variants import ImageVariants, render_variant
+from main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def variants(tmp_path, monkeypatch):
+    source_dir = tmp_path / "items"
+    source_dir.mkdir()
+    Image.new("RGB", (1000, 500), "red").save(source_dir / "abc.png")
+    store = ImageVariants(source_dir=str(source_dir), cache_dir=str(tmp_path / "cache"), workers=1)
+    monkeypatch.setattr(item_api, "image_variants", store)
+    yield store
+    if store._executor:
+        store._executor.shutdown()
+
+
+def test_variant_is_resized_and_cached(variants):
+    response = client.get("/item/image/abc.png?w=200&fmt=webp")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["etag"] == '"abc-w200.webp"'
+    assert "immutable" in response.headers["cache-control"]
+    with Image.open(os.path.join(variants.cache_dir, "abc-w200.webp")) as image:
+        assert image.size == (200, 100)
+
+    again = client.get("/item/image/abc.png?w=200&fmt=webp")
+    assert again.content == response.content
+    assert variants.stats()["generated"] == 1 and variants.stats()["hits"] == 1
+
+    not_modified = client.get("/item/image/abc.png?w=200&fmt=webp", headers={"If-None-Match": '"abc-w200.webp"'})
+    assert not_modified.status_code == 304
+
+
+def test_bad_requests(variants):
+    assert client.get("/item/image/abc.png?w=123").status_code == 400
+    assert client.get("/item/image/missing.png?w=200").status_code == 404
+    assert client.get("/item/image/..%2Fabc.png?w=200").status_code == 404
+    # 원본이 없으면 ETag 가 맞아도 304 가 아니라 404
+    stale = client.get("/item/image/missing.png?w=200", headers={"If-None-Match": '"missing-w200.webp"'})
+    assert stale.status_code == 404
+
+
+def test_decompression_bomb_is_rejected(variants):
+    # 헤더만 있는 거대한 PNG: 열 때 Pillow 가 DecompressionBombError 를 낸다
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", 50000, 50000, 8, 2, 0, 0, 0)
+    with open(os.path.join(variants.source_dir, "bomb.png"), "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IEND", b""))
+    assert client.get("/item/image/bomb.png?w=200").status_code == 422
+
+
+def test_least_recently_used_variant_is_evicted(variants, tmp_path):
+    client.get("/item/image/abc.png?w=100")
+    client.get("/item/image/abc.png?w=200")
+    client.get("/item/image/abc.png?w=100")       # 100 을 최근에 씀
+    w100 = os.path.getsize(os.path.join(variants.cache_dir, "abc-w100.webp"))
+    w400 = render_variant(os.path.join(variants.source_dir, "abc.png"), str(tmp_path / "w400.webp"), 400, "webp")
+    variants.max_bytes = w100 + w400      # 200 하나만 빠지면 들어간다
+    client.get("/item/image/abc.png?w=400")
+
+    assert sorted(os.listdir(variants.cache_dir)) == ["abc-w100.webp", "abc-w400.webp"]
+    assert variants.stats()["evicted"] == 1
+
+
+def test_variant_being_served_is_not_evicted(variants):
+    # 응답으로 나가는 중인 변형은 캐시가 넘쳐도 release 전까지 지우지 않는다
+    path = asyncio.run(variants.get("abc.png", 100, "webp"))
+    variants.max_bytes = 1
+    client.get("/item/image/abc.png?w=200")
+    assert os.path.exists(path)
+    assert variants.stats()["pinned"] == 1
+
+    variants.release(os.path.basename(path))
+    client.get("/item/image/abc.png?w=400")
+    assert not os.path.exists(path)
+    assert variants.stats()["pinned"] == 0
+
+
+def test_hits_update_mtime_for_restart_order(variants):
+    client.get("/item/image/abc.png?w=100")
+    client.get("/item/image/abc.png?w=200")
+    w100 = os.path.join(variants.cache_dir, "abc-w100.webp")
+    os.utime(w100, (0, 0))
+    client.get("/item/image/abc.png?w=100")       # hit
+    restarted = ImageVariants(source_dir=variants.source_dir, cache_dir=variants.cache_dir, workers=1)
+    assert list(restarted._entries) == ["abc-w200.webp", "abc-w100.webp"]
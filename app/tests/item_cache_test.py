@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.item_cache import ItemCache, item_cache
+from core.versions import versions, ITEMS
+from db.query_stats import count_queries
+from main import app
+from models.item.book import Book
+from models.member import Member
+
+client = TestClient(app)
+
+
+def test_hit_and_invalidation_on_version_change(sqlite_app):
+    sqlite_app()        # 버전 카운터는 DB 에 있다
+    cache = ItemCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return {"id": 9001, "stock": len(loads)}
+
+    assert cache.get_or_load(9001, load) == {"id": 9001, "stock": 1}
+    assert cache.get_or_load(9001, load)["stock"] == 1
+    versions.bump(ITEMS, 9001)      # 커밋된 쓰기
+    assert cache.get_or_load(9001, load)["stock"] == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["loads"], stats["invalidated"]) == (1, 2, 1)
+
+
+def test_concurrent_misses_load_once(sqlite_app):
+    sqlite_app()
+    cache = ItemCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        time.sleep(0.2)
+        return {"id": 9002}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load(9002, load))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+    assert results == [{"id": 9002}] * 8
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_lru_eviction_and_ttl(sqlite_app):
+    sqlite_app()
+    cache = ItemCache(max_entries=2)
+    for item_id in (9003, 9004):
+        cache.get_or_load(item_id, lambda: {"id": item_id})
+    cache.get(9003)                                     # 9003 을 최근에 씀
+    cache.get_or_load(9005, lambda: {"id": 9005})
+    assert cache.get(9004) is None and cache.get(9003) is not None
+    assert cache.stats()["evictions"] == 1
+
+    expired = ItemCache(ttl=0)
+    expired.get_or_load(9006, lambda: {"id": 9006})
+    assert expired.get(9006) is None and expired.stats()["expired"] == 1
+
+
+def test_version_is_read_outside_the_lock(sqlite_app):
+    # 버전 조회가 DB 를 다시 읽는 동안 다른 상품 조회가 캐시 락에서 기다리면 안 된다
+    sqlite_app()
+    cache = ItemCache()
+    held = []
+
+    def version(item_id):
+        held.append(cache._lock.locked())
+        return ItemCache._version(item_id)
+
+    cache._version = version
+    cache.get_or_load(9007, lambda: {"id": 9007})
+    assert cache.get(9007) == {"id": 9007}
+    assert held and not any(held)
+
+
+@pytest.fixture
+def seeded(sqlite_app):
+    return sqlite_app(Book(name="b1", price=1000, stock=10, author="a", isbn=1),
+                      Member(name="m", email="m@test.com", password="x", zip="1", addr1="a", addr2="b"))
+
+
+def test_order_stock_change_invalidates(seeded):
+    assert client.get("/item/show/1").json()["stock"] == 10
+    with count_queries() as stats:
+        assert client.get("/item/show/1").json()["stock"] == 10
+    assert stats.count == 0
+
+    order = {"zip": "1", "addr1": "a", "addr2": "b", "items": [{"item_id": 1, "count": 3}]}
+    assert client.post("/order/create/1", json=order).status_code == 200
+    assert client.get("/item/show/1").json()["stock"] == 7
+    assert item_cache.stats()["invalidated"] >= 1
@@ -0,0 +1,101 @@
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import core.item_import_service as item_import
+from main import app
+from models.category import Category
+from models.category_item import CategoryItem
+from models.item.book import Book
+from models.item.item import Item
+
+client = TestClient(app)
+
+CSV = """type,name,price,stock,author,isbn,artist,director,actor,categories
+book,책1,1000,10,저자,1,,,,소설
+album,앨범1,2000,5,,,가수,,,소설|음반
+movie,영화1,3000,1,,,,감독,배우,
+book,가격오류,abc,1,저자,2,,,,
+gadget,타입오류,1,1,,,,,,
+book,카테고리오류,1000,1,저자,3,,,,없는카테고리
+"""
+
+
+@pytest.fixture
+def db(sqlite_app):
+    Session = sqlite_app(Category(name="소설"), Category(name="음반"))
+    with Session() as session:
+        yield session
+
+
+def post_csv(batch_size=2):
+    return client.post(f"/item/import?batch_size={batch_size}",
+                       files={"file": ("feed.csv", io.BytesIO(CSV.encode()), "text/csv")})
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_import_csv(db, monkeypatch, returning):
+    # returning=False 는 mysql 처럼 executemany RETURNING 이 없는 경우 (넣은 뒤 SELECT 로 id 를 찾는다)
+    monkeypatch.setattr(item_import.ir, "supports_bulk_returning", lambda _: returning)
+    report = post_csv().json()
+
+    assert report["inserted"] == 3
+    assert report["failed"] == 3
+    assert report["batches"] == 2     # 검증 통과 4행 (카테고리 오류 행은 flush 할 때 걸러짐)
+    assert sorted(e["row"] for e in report["errors"]) == [5, 6, 7]
+    assert db.query(Item).count() == 3
+    assert db.query(CategoryItem).count() == report["linked"] == 3
+    album = db.query(Item).filter(Item.name == "앨범1").one()
+    assert album.type == "ALBUM" and album.artist == "가수"
+
+
+def test_categorized_rows_are_batched_without_returning(db, monkeypatch):
+    # 카테고리가 있는 행도 batch 마다 INSERT 한번, 같은 이름이 여러 번 나와도 각자 제 카테고리에 연결
+    monkeypatch.setattr(item_import.ir, "supports_bulk_returning", lambda _: False)
+    lines = [json.dumps({"type": "book", "name": name, "price": 1, "stock": 1, "author": "a", "isbn": i,
+                         "categories": [category]}, ensure_ascii=False)
+             for i, (name, category) in enumerate([("같은책", "소설"), ("다른책", "음반"), ("같은책", "음반")])]
+    inserts = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.startswith("INSERT INTO items"):
+            inserts.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        body = "\n".join(lines).encode()
+        report = client.post("/item/import", files={"file": ("feed.ndjson", io.BytesIO(body))}).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert report["inserted"] == 3 and len(inserts) == 1
+    linked = db.query(Book.isbn, Category.name).join(CategoryItem, CategoryItem.item_id == Book.id) \
+        .join(Category, Category.id == CategoryItem.category_id).order_by(Book.id).all()
+    assert linked == [(0, "소설"), (1, "음반"), (2, "음반")]
+
+
+def test_import_ndjson(db):
+    lines = [
+        json.dumps({"type": "book", "name": "n1", "price": 1, "stock": 1, "author": "a", "isbn": 1,
+                    "categories": ["소설"]}, ensure_ascii=False),
+        "{broken",
+        json.dumps({"type": "movie", "name": "m1", "price": 1, "stock": 1, "director": "d", "actor": "a"}),
+    ]
+    body = "\n".join(lines).encode()
+    report = client.post("/item/import", files={"file": ("feed.ndjson", io.BytesIO(body))}).json()
+
+    assert report["inserted"] == 2
+    assert report["errors"][0]["row"] == 2
+    assert db.query(CategoryItem).count() == 1
+
+
+def test_error_report_is_capped(db, monkeypatch):
+    monkeypatch.setattr(item_import, "IMPORT_MAX_ERRORS", 1)
+    report = post_csv(batch_size=100).json()
+    assert report["failed"] == 3
+    assert len(report["errors"]) == 1
+    assert report["errors_truncated"] is True
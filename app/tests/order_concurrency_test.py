@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from core.order_service import OrderService
+from db.session import SessionLocal
+from models.item.book import Book
+from models.member import Member
+from models.order import Order
+from models.order_item import OrderItem
+from schemas.dto import Item_count
+
+# 재고보다 훨씬 많은 주문을 동시에 넣어서 초과 판매 / 재고 유실이 없는지 확인
+INITIAL_STOCK = 150
+ORDER_COUNT = 300
+WORKERS = 16
+
+
+def _place_order(member_id: int, item_id: int):
+    db = SessionLocal()
+    try:
+        order = OrderService(db).create_order(
+            member_id, "12345", "서울시", "강남구", [Item_count(item_id=item_id, count=1)]
+        )
+        return order is not None
+    except Exception:
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+def test_concurrent_orders_do_not_oversell():
+    db = SessionLocal()
+    member = Member(name="동시성", email="concurrency@test.com", password="x", zip="12345", addr1="a", addr2="b")
+    item = Book(name="동시성 테스트 책", price=1000, stock=INITIAL_STOCK, author="tester", isbn=1)
+    db.add_all([member, item])
+    db.commit()
+    member_id, item_id = member.id, item.id
+
+    try:
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            results = list(pool.map(lambda _: _place_order(member_id, item_id), range(ORDER_COUNT)))
+        success = sum(results)
+
+        db.expire_all()
+        stock = db.query(Book).filter(Book.id == item_id).one().stock
+        sold = sum(oi.count for oi in db.query(OrderItem).filter(OrderItem.item_id == item_id))
+
+        assert stock >= 0
+        assert sold == success                      # 성공한 주문만큼만 주문 아이템이 생김
+        assert stock == INITIAL_STOCK - success     # 차감이 덮어써져서 사라진 재고가 없음
+        assert success <= INITIAL_STOCK
+    finally:
+        orders = db.query(Order).filter(Order.member_id == member_id).all()
+        for order in orders:
+            db.delete(order)
+        db.flush()
+        db.query(Book).filter(Book.id == item_id).delete()
+        db.query(Member).filter(Member.id == member_id).delete()
+        db.commit()
+        db.close()
@@ -0,0 +1,93 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from core.category_tree import category_tree_cache
+from core.versions import versions, CATEGORIES
+from db.query_stats import count_queries
+from db.session import get_db
+from main import app
+from models.category import Category
+from models.category_closure import CategoryClosure
+from models.category_item import CategoryItem
+from models.item.book import Book
+from models.member import Member
+from models.order import Order
+from models.order_item import OrderItem
+
+# 목록 API 가 데이터 양과 상관없이 정해진 쿼리 수 안에서 끝나는지 (lazy load N+1 이 다시 생기면 실패)
+client = TestClient(app)
+ITEMS = 30
+
+
+@pytest.fixture
+def seeded(sqlite_app, monkeypatch):
+    Session = sqlite_app()
+    db = Session()
+    categories = [Category(name=f"cat-{i}", description="") for i in range(3)]
+    db.add_all(categories)
+    db.flush()
+    for category in categories:
+        CategoryClosure.add_node(db, category.id)
+    items = [Book(name=f"book-{i}", price=1000 + i, stock=100, author="a", isbn=i) for i in range(ITEMS)]
+    db.add_all(items)
+    db.add_all(CategoryItem(item=item, category=categories[i % 3]) for i, item in enumerate(items))
+    member = Member(name="m", email="m@test.com", password="x", zip="1", addr1="a", addr2="b")
+    db.add(member)
+    for i in range(10):
+        order = Order(member=member, total_price=0)
+        order.order_items = [OrderItem(item=items[(i + j) % ITEMS], count=1) for j in range(3)]
+        db.add(order)
+    db.commit()
+    member_id = member.id
+    db.close()
+
+    category_tree_cache.bump()
+    # 버전 카운터 읽기(워커마다 VERSION_CACHE_SECONDS 에 한번)는 예산에서 뺀다
+    monkeypatch.setattr(versions, "cache_seconds", 60)
+    versions.table(CATEGORIES)
+    yield member_id
+    category_tree_cache.bump()
+
+
+def test_item_list_query_budget(seeded, query_budget):
+    with query_budget(2):
+        response = client.get("/item/show/all")
+    assert len(response.json()) == ITEMS
+    assert all(item["categories"] for item in response.json())
+
+    with query_budget(2):
+        response = client.get("/item/show/page?limit=20")
+    assert len(response.json()["items"]) == 20
+
+
+def test_order_list_query_budget(seeded, query_budget):
+    with query_budget(3):
+        response = client.get(f"/order/show/member/{seeded}")
+    assert len(response.json()) == 10
+    assert all(order["order_items"][0]["item_name"] for order in response.json())
+
+
+def test_category_tree_query_budget(seeded, query_budget):
+    with query_budget(1):
+        client.get("/category/show/all")
+    with query_budget(0):   # 두번째부터는 스냅샷 캐시
+        client.get("/category/show/all")
+
+
+def test_repeated_statements_are_reported(seeded):
+    # item_to_dict 에 lazy load 를 그대로 태우면 같은 모양의 쿼리가 상품 수만큼 반복된다
+    db = next(app.dependency_overrides[get_db]())
+    with count_queries() as stats:
+        for item in db.query(Book).all():
+            [ci.category.name for ci in item.category_items]
+    db.close()
+    shape, n = stats.repeated()[0]
+    assert n >= ITEMS
+    assert "category_items" in shape
+
+
+def test_metrics_group_queries_by_route(seeded):
+    client.get("/item/show/1")
+    metrics = client.get("/metrics/queries").json()
+    assert metrics["GET /item/show/{id}"]["queries"] >= 1
+
@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+import db.routing as routing
+from core.versions import versions
+from db.routing import RoutingSession
+from db.session import Base, get_db
+from main import app
+from models.item.item import Item
+from models.item.book import Book
+
+# primary / replica 를 sqlite 파일 두 개로 흉내낸다. 같은 id 의 상품 이름을 다르게 넣어서 어디서 읽었는지 구분
+client = TestClient(app)
+
+
+@pytest.fixture
+def stand_ins(tmp_path, monkeypatch):
+    primary = create_engine(f"sqlite:///{tmp_path}/primary.db")
+    replica = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(Book(id=1, name=name, price=1000, stock=10, author="a", isbn=1))
+            db.commit()
+
+    PrimarySession = sessionmaker(bind=primary, autoflush=False)
+    ReadSession = sessionmaker(class_=RoutingSession, primary=primary, replicas=[replica], autoflush=False)
+    monkeypatch.setattr(routing, "SessionLocal", PrimarySession)
+    monkeypatch.setattr(routing, "ReadSessionLocal", ReadSession)
+    monkeypatch.setattr(routing, "replica_engines", [replica])
+    monkeypatch.setattr(versions, "session_factory", PrimarySession)   # 버전 카운터는 primary 에
+    versions.reset()
+
+    def primary_db():
+        db = PrimarySession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = primary_db
+    client.cookies.clear()
+    yield ReadSession
+    client.cookies.clear()
+    app.dependency_overrides.clear()
+    versions.reset()
+    primary.dispose()
+    replica.dispose()
+
+
+def test_reads_go_to_replica_and_writes_to_primary(stand_ins):
+    db = stand_ins()
+    assert db.get(Item, 1).name == "replica"
+
+    db.execute(update(Item).where(Item.id == 1).values(stock=5))
+    db.commit()
+    # 쓰기 뒤에는 같은 세션의 조회도 primary 로 고정
+    db.expire_all()
+    item = db.get(Item, 1)
+    assert item.name == "primary"
+    assert item.stock == 5
+    db.close()
+
+
+def test_show_routes_read_from_replica(stand_ins):
+    response = client.get("/item/show/1")
+    assert response.status_code == 200
+    assert response.json()["name"] == "replica"
+
+
+def test_read_your_writes_after_write(stand_ins):
+    response = client.patch("/item/update/1", json={"name": "updated", "price": 2000, "stock": 3})
+    assert response.status_code == 200
+    assert routing.LAST_WRITE_COOKIE in response.cookies
+
+    # 쿠키가 살아 있는 동안은 방금 쓴 primary 에서 읽는다
+    response = client.get("/item/show/1")
+    assert response.json()["name"] == "updated"
+
+    client.cookies.clear()
+    assert client.get("/item/show/1").json()["name"] == "replica"
@@ -0,0 +1,128 @@
+import threading
+import time
+from contextlib import nullcontext
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.search_index import NgramIndex, SearchIndex, item_search, category_search
+from main import app
+from models.category import Category
+from models.item.album import Album
+from models.item.book import Book
+from models.item.movie import Movie
+
+client = TestClient(app)
+
+
+def test_korean_and_latin_partial_match():
+    index = NgramIndex()
+    index.add(1, "해리포터와 마법사의 돌", ("J.K. 롤링",))
+    index.add(2, "아이폰15 케이스")
+    index.add(3, "Harry Potter Box Set", ("Rowling",))
+    index.add(4, "클래식 재즈 베스트")
+
+    assert index.search("포터")[0] == [1]
+    assert index.search("폰")[0] == [2]           # gram(2) 보다 짧은 한글 검색어
+    assert index.search("폰15")[0] == [2]         # 한글/숫자 경계를 넘는 검색어
+    assert index.search("HARRY pot")[0] == [3]    # 대소문자 무시, 단어마다 AND
+    assert index.search("po")[0] == [3]           # gram(3) 보다 짧은 영문 검색어
+    assert index.search("롤링")[0] == [1]          # 저자로도 찾는다
+    assert index.search("재즈 케이스") == ([], 0)
+
+    index.remove(2)
+    assert index.search("폰") == ([], 0)
+    assert "폰" not in index.short
+
+
+def test_ranking():
+    index = NgramIndex()
+    index.add(1, "재즈 피아노 모음", ("재즈",))
+    index.add(2, "재즈")
+    index.add(3, "피아노", ("재즈 트리오",))
+    index.add(4, "재즈 피아노")
+    ids, total = index.search("재즈")
+    # 이름 일치 > 다른 필드 일치, 이름이 같으면 최고점, 그 다음 짧은 이름
+    assert ids == [2, 4, 1, 3] and total == 4
+    assert index.search("재즈", limit=2) == ([2, 4], 4)
+
+
+def test_stale_mark_during_build_is_kept():
+    # 만드는 도중에 커밋된 대량 쓰기(invalidate)는 그 색인에 없을 수 있으니 표시가 남아야 한다
+    def rows(db):
+        yield 1, "a", ()
+        index.mark_stale()
+        yield 2, "b", ()
+
+    index = SearchIndex("test", rows)
+    index.session_factory = nullcontext     # load_rows 가 db 를 안 쓴다
+    index.rebuild()
+    assert index.stats()["stale"] is True
+    index.load_rows = lambda db: iter([(1, "a", ())])
+    index.rebuild()
+    assert index.stats()["stale"] is False
+
+
+def test_searches_do_not_wait_for_each_other():
+    class SlowIndex(NgramIndex):
+        def search(self, query, limit=20):
+            time.sleep(0.2)
+            return super().search(query, limit)
+
+    index = SearchIndex("test", lambda db: iter([(1, "해리포터", ())]), index_class=SlowIndex)
+    index.session_factory = nullcontext
+    index.rebuild()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=index.search, args=(f"해리{'포' * i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - started < 0.6         # 한번에 하나씩이면 0.8 초
+    index.apply([(2, ("해리 단편집", ()))])
+    assert index.search("해리") == ([1, 2], 2)
+
+
+@pytest.fixture
+def seeded(sqlite_app):
+    Session = sqlite_app(
+        Book(name="해리포터와 마법사의 돌", price=1000, stock=10, author="롤링", isbn=1),
+        Album(name="Kind of Blue", price=2000, stock=5, artist="Miles Davis", etc="jazz"),
+        Movie(name="기생충", price=3000, stock=3, director="봉준호", actor="송강호"),
+        Category(name="재즈 음반"),
+        Category(name="한국 영화"),
+    )
+    for index in (item_search, category_search):
+        index.session_factory = Session
+        index.rebuild()
+    yield Session
+    for index in (item_search, category_search):
+        index.clear()
+
+
+def test_search_api_follows_commits(seeded):
+    body = client.get("/item/search", params={"q": "봉준"}).json()
+    assert [item["name"] for item in body["items"]] == ["기생충"] and body["total"] == 1
+
+    for _ in range(2):
+        assert client.get("/item/search", params={"q": "해리포터"}).json()["total"] == 1
+    assert item_search.stats()["result_cache_hits"] == 1
+
+    # 커밋되면 바로 색인에 반영 (캐시된 결과도 버린다)
+    book = {"name": "해리포터와 비밀의 방", "price": 1000, "stock": 1, "author": "롤링", "isbn": 2}
+    new_id = client.post("/item/create/book", json=book).json()["id"]
+    body = client.get("/item/search", params={"q": "해리포터"}).json()
+    assert body["total"] == 2 and new_id in [item["id"] for item in body["items"]]
+
+    # 롤백된 쓰기는 색인에 들어가지 않는다
+    with seeded() as db:
+        db.add(Book(name="해리포터 롤백", price=1, stock=1, author="x", isbn=3))
+        db.flush()
+        db.rollback()
+    assert client.get("/item/search", params={"q": "해리포터"}).json()["total"] == 2
+
+    assert client.delete(f"/item/delete/{new_id}").status_code == 200
+    assert client.get("/item/search", params={"q": "비밀"}).json()["total"] == 0
+
+    assert [c["name"] for c in client.get("/category/search", params={"keyword": "영화"}).json()] == ["한국 영화"]
+    assert item_search.stats()["documents"] == 3
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from core.stock_holds import hold_sweeper
+from main import app
+from models.item.book import Book
+from models.item.item import Item
+from models.member import Member
+from models.stock_hold import StockHold
+
+client = TestClient(app)
+ADDRESS = {"zip": "1", "addr1": "a", "addr2": "b"}
+
+
+@pytest.fixture
+def shop(sqlite_app):
+    return sqlite_app(Book(name="한정판", price=1000, stock=3, author="a", isbn=1),
+                      Member(name="m", email="m@test.com", password="x", **ADDRESS))
+
+
+def checkout(count):
+    return client.post("/order/checkout/1", json={"items": [{"item_id": 1, "count": count}]})
+
+
+def stock(Session):
+    with Session() as db:
+        item = db.get(Item, 1)
+        return item.stock, item.reserved
+
+
+def test_hold_confirm_and_release(shop):
+    first = checkout(2)
+    assert first.status_code == 200
+    assert client.get("/item/show/1").json()["available"] == 1
+    assert checkout(2).status_code == 409                      # 잡힌 수량은 다른 사람이 못 가져간다
+    order = {**ADDRESS, "items": [{"item_id": 1, "count": 2}]}
+    assert client.post("/order/create/1", json=order).status_code == 404
+
+    checkout_id = first.json()["checkout_id"]
+    assert client.post(f"/order/checkout/{checkout_id}/confirm", json=ADDRESS).status_code == 200
+    assert stock(shop) == (1, 0)
+    assert client.post(f"/order/checkout/{checkout_id}/confirm", json=ADDRESS).status_code == 410
+
+    second = checkout(1).json()["checkout_id"]
+    assert stock(shop) == (1, 1)
+    assert client.delete(f"/order/checkout/{second}").json() is True
+    assert stock(shop) == (1, 0)
+    assert client.delete(f"/order/checkout/{second}").status_code == 404
+    assert client.delete("/order/checkout/unknown").status_code == 404
+
+
+def test_expired_holds_are_released(shop):
+    stale = checkout(2).json()["checkout_id"]
+    assert hold_sweeper.sweep() == 0
+    assert hold_sweeper.sweep(now=datetime.now() + timedelta(days=1)) == 1
+    assert stock(shop) == (3, 0)
+    assert client.post(f"/order/checkout/{stale}/confirm", json=ADDRESS).status_code == 410
+
+    # 정리 스레드가 아직 못 돈 만료 hold 는 재고가 모자랄 때 checkout 이 먼저 푼다
+    stale = checkout(3).json()["checkout_id"]
+    with shop() as db:
+        db.execute(update(StockHold).values(expires_at=datetime.now() - timedelta(seconds=1)))
+        db.commit()
+    fresh = checkout(2)
+    assert fresh.status_code == 200
+    assert stock(shop) == (3, 2)
+    assert client.post(f"/order/checkout/{stale}/confirm", json=ADDRESS).status_code == 410
+    assert client.post(f"/order/checkout/{fresh.json()['checkout_id']}/confirm", json=ADDRESS).status_code == 200
+    assert stock(shop) == (1, 0)
+
+
+def test_order_releases_expired_holds(shop):
+    # 정리 스레드가 아직 못 돈 만료 hold 때문에 바로 주문이 막히지 않는다
+    checkout(3)
+    with shop() as db:
+        db.execute(update(StockHold).values(expires_at=datetime.now() - timedelta(seconds=1)))
+        db.commit()
+    order = {**ADDRESS, "items": [{"item_id": 1, "count": 2}]}
+    created = client.post("/order/create/1", json=order)
+    assert created.status_code == 200
+    assert stock(shop) == (1, 0)
+    with shop() as db:
+        assert db.query(StockHold).count() == 0
+
+    assert client.delete(f"/order/delete/{created.json()['id']}").json() is True
+    assert stock(shop) == (3, 0)
+    assert client.delete(f"/order/delete/{created.json()['id']}").status_code == 404
+
+
+def test_item_with_active_hold_is_not_deleted(shop):
+    checkout(1)
+    response = client.delete("/item/delete/1")
+    assert response.status_code == 409
+    assert stock(shop) == (3, 1)
+
+    # 만료된 hold 는 정리 스레드를 기다리지 않고 삭제할 때 푼다
+    with shop() as db:
+        db.execute(update(StockHold).values(expires_at=datetime.now() - timedelta(seconds=1)))
+        db.commit()
+    assert client.delete("/item/delete/1").status_code == 200
+    with shop() as db:
+        assert db.query(StockHold).count() == 0
+
+
+@pytest.mark.parametrize("count", [0, -2])
+def test_order_counts_must_be_positive(shop, count):
+    order = {**ADDRESS, "items": [{"item_id": 1, "count": count}]}
+    assert client.post("/order/create/1", json=order).status_code == 400
+    assert stock(shop) == (3, 0)
@@ -0,0 +1,82 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from core.suggest import PrefixIndex, SOLD, item_suggest, category_suggest
+from crud.item import ItemRepository
+from main import app
+from models.category import Category
+from models.item.book import Book
+from models.member import Member
+
+client = TestClient(app)
+
+
+def names(results):
+    return [name for _, name in results]
+
+
+def test_prefix_popularity_and_partial_hangul():
+    index = PrefixIndex()
+    index.add(1, "해리포터와 마법사의 돌", 5)
+    index.add(2, "해리포터와 비밀의 방", 30)
+    index.add(3, "해변의 카프카", 10)
+    index.add(4, "Harry Potter", 1)
+    index.finish()
+
+    assert names(index.search("해리")) == ["해리포터와 비밀의 방", "해리포터와 마법사의 돌"]
+    assert names(index.search("해")) == ["해리포터와 비밀의 방", "해변의 카프카", "해리포터와 마법사의 돌"]
+    assert names(index.search("해리ㅍ")) == names(index.search("해리"))      # 초성만 친 상태
+    assert names(index.search("ㅎ", limit=1)) == ["해리포터와 비밀의 방"]
+    assert names(index.search("비밀")) == ["해리포터와 비밀의 방"]           # 단어 시작
+    assert names(index.search("harry p")) == ["Harry Potter"]
+    assert index.search("리포") == []                                  # 단어 중간은 아니다
+
+    # 커밋된 변경: 판매 수량 / 이름 변경 / 삭제
+    index.apply((SOLD, 1), 40)
+    assert names(index.search("해리"))[0] == "해리포터와 마법사의 돌"
+    index.apply(3, ("해리 단편집",))
+    assert "해리 단편집" in names(index.search("해리"))
+    index.apply(1, None)
+    assert names(index.search("해리")) == ["해리포터와 비밀의 방", "해리 단편집"]
+
+
+@pytest.fixture
+def seeded(sqlite_app):
+    Session = sqlite_app(
+        Book(name="파이썬 입문", price=1000, stock=10, author="a", isbn=1),
+        Book(name="파이썬 고급", price=1000, stock=10, author="b", isbn=2),
+        Category(name="파이썬"),
+        Member(name="m", email="m@test.com", password="x", zip="1", addr1="a", addr2="b"),
+    )
+    for index in (item_suggest, category_suggest):
+        index.session_factory = Session
+        index.rebuild()
+    yield Session
+    for index in (item_suggest, category_suggest):
+        index.clear()
+
+
+def test_suggest_follows_orders(seeded):
+    body = client.get("/item/suggest", params={"prefix": "파이"}).json()
+    assert [item["name"] for item in body["items"]] == ["파이썬 입문", "파이썬 고급"]
+    assert body["categories"] == [{"id": 1, "name": "파이썬"}]
+
+    # 주문이 커밋되면 판매 수량이 바로 반영된다
+    order = {"zip": "1", "addr1": "a", "addr2": "b", "items": [{"item_id": 2, "count": 3}]}
+    assert client.post("/order/create/1", json=order).status_code == 200
+    body = client.get("/item/suggest", params={"prefix": "ㅍ"}).json()
+    assert [item["name"] for item in body["items"]] == ["파이썬 고급", "파이썬 입문"]
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_bulk_insert_reaches_suggest(seeded, returning):
+    # 가져오기(bulk insert)는 ORM 이벤트를 안 타므로 repository 가 직접 표시한다
+    with seeded() as db:
+        ItemRepository().bulk_insert(db, [{"type": "BOOK", "name": "파이썬 실전", "price": 1000, "stock": 1}],
+                                     returning=returning)
+        db.commit()
+    if not returning:
+        assert item_suggest.stats()["stale"] is True      # 새 id 를 모르니 다시 만든다
+        item_suggest.rebuild()
+    body = client.get("/item/suggest", params={"prefix": "파이썬 실"}).json()
+    assert [item["name"] for item in body["items"]] == ["파이썬 실전"]